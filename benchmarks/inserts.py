@@ -0,0 +1,107 @@
+"""Measure the throughput of appending events to hot todos.
+
+This runs against a temporary database, so it never touches real data. Run it
+from the root of the repository:
+
+    python benchmarks/inserts.py --events 5000 --no-sync
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import django
+
+
+def _append_events(n_events: int, n_todos: int) -> float:
+    from vote_on_todos.django_back_end.unit_of_work import DjangoCommitter
+    from vote_on_todos.todos.domain import todos
+
+    timestamp = datetime.datetime(2023, 1, 2, 3, 4, 5, tzinfo=datetime.UTC)
+    committer = DjangoCommitter()
+    todo_ids = [f'todo-{i}' for i in range(n_todos)]
+
+    for todo_id in todo_ids:
+        with committer.atomic():
+            committer.handle(
+                todos.TodoCreatedV1(
+                    timestamp=timestamp, todo_id=todo_id, index=1,
+                    list_id='list-1', title='Something I must do',
+                    description='A very important thing', created_by='me',
+                ),
+            )
+
+    start = time.perf_counter()
+    for i in range(n_events):
+        for todo_id in todo_ids:
+            # alternate between upvoting and removing the upvote, so the
+            # state of the todo stays small
+            event: todos.Event
+            if i % 2 == 0:
+                event = todos.TodoUpvotedV1(
+                    timestamp=timestamp, todo_id=todo_id, index=i + 2,
+                    upvoted_by='me',
+                )
+            else:
+                event = todos.TodoUpvoteRemovedV1(
+                    timestamp=timestamp, todo_id=todo_id, index=i + 2,
+                    removed_by='me',
+                )
+            with committer.atomic():
+                committer.handle(event)
+
+    return time.perf_counter() - start
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--events', type=int, default=2_000,
+        help='The number of events to append to each todo.',
+    )
+    parser.add_argument(
+        '--todos', type=int, default=1,
+        help='The number of todos to append events to.',
+    )
+    parser.add_argument(
+        '--no-sync', action='store_true',
+        help=(
+            "Don't wait for commits to reach the disk, so that the cost of "
+            'the writes themselves is not hidden.'
+        ),
+    )
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+    os.environ.setdefault(
+        'DJANGO_SETTINGS_MODULE', 'vote_on_todos.website.settings.local',
+    )
+    django.setup()
+    from django.db import connection
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        connection.settings_dict['TEST']['NAME'] = os.path.join(
+            tmpdir, 'benchmark.sqlite3',
+        )
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False,
+        )
+        try:
+            if args.no_sync:
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA synchronous = OFF;')
+            elapsed = _append_events(args.events, args.todos)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(f'{args.events * args.todos / elapsed:,.0f} events/s')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -12,10 +12,15 @@ from vote_on_todos.todos.domain import todos
 @attrs.frozen
 class TodoRepo:
     _todos: dict[str, todos.TodoItem] = attrs.field(factory=dict)
+    # (todo_id, user_id) pairs
+    _votes: set[tuple[str, str]] = attrs.field(factory=set)
 
     def get_todo(self, todo_id: str) -> todos.TodoItem | None:
         return self._todos.get(todo_id)
 
+    def has_voted(self, todo_id: str, user_id: str) -> bool:
+        return (todo_id, user_id) in self._votes
+
 
 # Factories
 # =========
@@ -52,6 +57,22 @@ class TodoUpvotedV1(Event):
     upvoted_by = 'me'
 
 
+class TodoUpvoteRemovedV1(Event):
+    class Meta:
+        model = todos.TodoUpvoteRemovedV1
+
+    todo_id: str
+    removed_by = 'me'
+
+
+class TodoDoneV1(Event):
+    class Meta:
+        model = todos.TodoDoneV1
+
+    todo_id: str
+    recorded_by = 'me'
+
+
 class TodoItem(factory.Factory):
     class Meta:
         model = todos.TodoItem
@@ -65,4 +86,4 @@ class TodoItem(factory.Factory):
     creator = 'me'
     created_at = factory.LazyFunction(datetime.datetime.now)
 
-    upvotes = factory.LazyFunction(set)
+    vote_count = 0
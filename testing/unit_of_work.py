@@ -5,13 +5,19 @@ from contextlib import contextmanager
 
 import attrs
 
+from vote_on_todos.todos.application import unit_of_work
 from vote_on_todos.todos.domain import lists
 from vote_on_todos.todos.domain import todos
 
 
 @attrs.define
 class Committer:
-    """A fake committer for use in tests."""
+    """A fake committer for use in tests.
+
+    The first `conflicts` units of work raise StaleState instead of committing.
+    """
+    conflicts: int = 0
+
     committed: list[lists.Event | todos.Event] = attrs.field(
         init=False, factory=list,
     )
@@ -24,6 +30,9 @@ class Committer:
     def atomic(self) -> Iterator[None]:
         self.uncommitted_events: list[lists.Event | todos.Event] = []
         yield
+        if self.conflicts:
+            self.conflicts -= 1
+            raise unit_of_work.StaleState
         self.committed.extend(self.uncommitted_events)
         del self.uncommitted_events
 
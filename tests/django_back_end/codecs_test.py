@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import datetime
+import json
+
+import cattrs.preconf.json
+import pytest
+from django.core.management import call_command
+
+from testing import todos as todo_helpers
+from vote_on_todos.django_back_end import codecs
+from vote_on_todos.django_back_end import models
+
+_BACKENDS = [
+    backend
+    for backend in (codecs.STDLIB_JSON, codecs.ORJSON)
+    if backend is not None
+]
+
+
+@pytest.mark.parametrize('backend', _BACKENDS, ids=lambda b: b.name)
+def test_round_trip(backend):
+    registry = codecs.Registry(models.TODO_EVENT_TYPES, backend)
+    event = todo_helpers.TodoCreatedV1(
+        todo_id='todo-1', list_id='list-1', index=1,
+        timestamp=datetime.datetime(2023, 1, 2, 3, 4, 5, tzinfo=datetime.UTC),
+    )
+
+    codec = registry.for_event(event)
+    payload = codec.encode(event)
+
+    assert (codec.event_type, codec.event_type_version) == ('TodoCreated', 1)
+    assert registry.decode('TodoCreated', 1, payload) == event
+
+
+@pytest.mark.parametrize('backend', _BACKENDS, ids=lambda b: b.name)
+def test_decode_payload_from_generic_converter(backend):
+    registry = codecs.Registry(models.TODO_EVENT_TYPES, backend)
+    event = todo_helpers.TodoUpvotedV1(todo_id='todo-1', index=2)
+    payload = cattrs.preconf.json.make_converter().dumps(event)
+
+    assert registry.decode('TodoUpvoted', 1, payload) == event
+
+
+def test_benchmark_codecs(capsys):
+    call_command('benchmark_codecs', events=10)
+
+    assert 'payload_converter' in capsys.readouterr().out
+
+
+def test_columns_are_left_out_of_payloads():
+    event = todo_helpers.TodoUpvotedV1(
+        todo_id='todo-1', index=2, upvoted_by='user-1',
+    )
+
+    payload = models.TODO_CODECS.for_event(event).encode(event)
+
+    assert json.loads(payload) == {'upvoted_by': 'user-1'}
+    assert models.TODO_CODECS.decode(
+        'TodoUpvoted', 1, payload,
+        timestamp=event.timestamp, todo_id='todo-1', index=2,
+    ) == event
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import pytest
+
+from testing import lists as list_helpers
+from testing import todos as todo_helpers
+from vote_on_todos.django_back_end import event_log
+from vote_on_todos.django_back_end.unit_of_work import DjangoCommitter
+from vote_on_todos.todos.domain import lists
+from vote_on_todos.todos.domain import todos
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def _create_events() -> None:
+    committer = DjangoCommitter()
+    with committer.atomic():
+        committer.handle(list_helpers.ListCreatedV1(list_id='list-1', index=1))
+        committer.handle(
+            todo_helpers.TodoCreatedV1(
+                todo_id='todo-1', list_id='list-1', index=1,
+            ),
+        )
+        committer.handle(list_helpers.ListCreatedV1(list_id='list-2', index=1))
+        committer.handle(
+            todo_helpers.TodoUpvotedV1(
+                todo_id='todo-1', index=2, upvoted_by='user-1',
+            ),
+        )
+
+
+def test_empty_log():
+    assert event_log.head_position() == 0
+    assert event_log.read_after(0) == []
+
+
+def test_events_are_read_in_commit_order():
+    _create_events()
+
+    logged = event_log.read_after(0)
+
+    assert event_log.head_position() == 4
+    assert [entry.position for entry in logged] == [1, 2, 3, 4]
+    assert [type(entry.event) for entry in logged] == [
+        lists.ListCreatedV1,
+        todos.TodoCreatedV1,
+        lists.ListCreatedV1,
+        todos.TodoUpvotedV1,
+    ]
+
+
+def test_read_after_position():
+    _create_events()
+
+    logged = event_log.read_after(2, batch_size=1)
+
+    assert [entry.position for entry in logged] == [3]
+    assert isinstance(logged[0].event, lists.ListCreatedV1)
+    assert logged[0].event.list_id == 'list-2'
+
+
+def test_iter_batches_after():
+    _create_events()
+
+    batches = list(event_log.iter_batches_after(1, batch_size=2))
+
+    assert [[entry.position for entry in batch] for batch in batches] == [
+        [2, 3], [4],
+    ]
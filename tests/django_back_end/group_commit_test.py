@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Sequence
+
+import attrs
+import pytest
+from django.db import connection
+
+from testing import todos as todo_helpers
+from vote_on_todos.django_back_end import models
+from vote_on_todos.django_back_end.group_commit import CommitGroup
+from vote_on_todos.django_back_end.group_commit import GroupCommitter
+from vote_on_todos.django_back_end.unit_of_work import DjangoCommitter
+from vote_on_todos.todos.application import unit_of_work
+from vote_on_todos.todos.domain import lists
+from vote_on_todos.todos.domain import todos
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def _create_todo(todo_id: str) -> None:
+    committer = DjangoCommitter()
+    with committer.atomic():
+        committer.handle(
+            todo_helpers.TodoCreatedV1(
+                todo_id=todo_id, list_id='list-1', index=1,
+            ),
+        )
+
+
+def _upvote(committer: GroupCommitter, todo_id: str, index: int) -> None:
+    with unit_of_work.commit_on_success(committer) as new_events:
+        new_events.append(
+            todo_helpers.TodoUpvotedV1(
+                todo_id=todo_id, index=index, upvoted_by=f'user-{index}',
+            ),
+        )
+
+
+def test_commit():
+    _create_todo('todo-1')
+    group = CommitGroup(window=0)
+
+    _upvote(GroupCommitter(group), 'todo-1', 2)
+
+    assert models.TodoItem.objects.get().vote_count == 1
+    assert (group.flushes, group.units) == (1, 1)
+
+
+def test_commit_nothing():
+    group = CommitGroup(window=0)
+
+    with GroupCommitter(group).atomic():
+        pass
+
+    assert (group.flushes, group.units) == (0, 0)
+
+
+def test_handle_outside_atomic():
+    with pytest.raises(RuntimeError):
+        GroupCommitter(CommitGroup()).handle(
+            todo_helpers.TodoUpvotedV1(todo_id='todo-1', index=2),
+        )
+
+
+@attrs.frozen
+class _BlockingCommitter(DjangoCommitter):
+    """Blocks in `write()` until released, so that others queue up behind."""
+    writing: threading.Event = attrs.field(factory=threading.Event)
+    release: threading.Event = attrs.field(factory=threading.Event)
+
+    def write(self, events: Sequence[lists.Event | todos.Event]) -> None:
+        self.writing.set()
+        self.release.wait()
+        super().write(events)
+
+
+@attrs.frozen
+class _FailingCommitter(DjangoCommitter):
+    def write(self, events: Sequence[lists.Event | todos.Event]) -> None:
+        raise RuntimeError('the disk is full')
+
+
+def _start_upvote(
+        group: CommitGroup,
+        errors: dict[int, Exception | None],
+        i: int,
+        todo_id: str,
+        index: int,
+        committer: DjangoCommitter | None = None,
+) -> threading.Thread:
+    def upvote() -> None:
+        try:
+            _upvote(
+                GroupCommitter(group, committer or DjangoCommitter()),
+                todo_id, index,
+            )
+        except Exception as e:
+            errors[i] = e
+        else:
+            errors[i] = None
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=upvote)
+    thread.start()
+    return thread
+
+
+def _wait_for_queue(group: CommitGroup, size: int) -> None:
+    while True:
+        time.sleep(0.001)
+        if len(group._queue) >= size:  # pragma: no branch (timing)
+            return
+
+
+def test_concurrent_units_are_committed_together():
+    for todo_id in ('todo-1', 'todo-2', 'todo-3'):
+        _create_todo(todo_id)
+    group = CommitGroup(window=0)
+    errors: dict[int, Exception | None] = {}
+
+    # the first unit is committed alone, and the others queue up meanwhile
+    blocking = _BlockingCommitter()
+    threads = [_start_upvote(group, errors, 0, 'todo-3', 2, blocking)]
+    blocking.writing.wait()
+    threads += [
+        _start_upvote(group, errors, *args)
+        for args in ((1, 'todo-1', 2), (2, 'todo-2', 2), (3, 'todo-1', 2))
+    ]
+    _wait_for_queue(group, 3)
+    blocking.release.set()
+    for thread in threads:
+        thread.join()
+
+    # the two votes on todo-1 conflict, and only one of them is committed
+    assert sorted(
+        type(error).__name__ for error in errors.values() if error
+    ) == ['StaleState']
+    assert errors[0] is None
+    assert errors[2] is None
+    assert sorted(
+        models.TodoItem.objects.values_list('todo_id', 'vote_count'),
+    ) == [('todo-1', 1), ('todo-2', 1), ('todo-3', 1)]
+    assert (group.flushes, group.units) == (2, 4)
+
+
+def test_leader_hands_over_after_one_group():
+    _create_todo('todo-1')
+    _create_todo('todo-2')
+    group = CommitGroup(window=0)
+    errors: dict[int, Exception | None] = {}
+
+    first = _BlockingCommitter()
+    leader = _start_upvote(group, errors, 0, 'todo-1', 2, first)
+    first.writing.wait()
+    second = _BlockingCommitter()
+    follower = _start_upvote(group, errors, 1, 'todo-2', 2, second)
+    _wait_for_queue(group, 1)
+
+    first.release.set()
+    # the leader returns once its own group is committed, while the next unit
+    # is still being written by its own caller
+    second.writing.wait()
+    leader.join(timeout=10)
+    leader_returned = not leader.is_alive()
+
+    second.release.set()
+    follower.join()
+    leader.join()
+    assert leader_returned
+    assert errors == {0: None, 1: None}
+    assert (group.flushes, group.units) == (2, 2)
+
+
+def test_failed_write_fails_the_whole_group():
+    for todo_id in ('todo-1', 'todo-2', 'todo-3', 'todo-4'):
+        _create_todo(todo_id)
+    group = CommitGroup(window=0, max_size=2)
+    errors: dict[int, Exception | None] = {}
+
+    blocking = _BlockingCommitter()
+    threads = [_start_upvote(group, errors, 0, 'todo-1', 2, blocking)]
+    blocking.writing.wait()
+    threads.append(
+        _start_upvote(group, errors, 1, 'todo-2', 2, _FailingCommitter()),
+    )
+    _wait_for_queue(group, 1)
+    threads.append(_start_upvote(group, errors, 2, 'todo-3', 2))
+    _wait_for_queue(group, 2)
+    threads.append(_start_upvote(group, errors, 3, 'todo-4', 2))
+    _wait_for_queue(group, 3)
+    blocking.release.set()
+    for thread in threads:
+        thread.join()
+
+    # the failed group is rolled back, and the next unit still leads its own
+    assert errors[0] is None
+    assert isinstance(errors[1], RuntimeError)
+    assert errors[2] is errors[1]
+    assert errors[3] is None
+    assert sorted(
+        models.TodoItem.objects.values_list('todo_id', 'vote_count'),
+    ) == [('todo-1', 1), ('todo-2', 0), ('todo-3', 0), ('todo-4', 1)]
+    assert (group.flushes, group.units) == (2, 2)
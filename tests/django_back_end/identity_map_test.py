@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import pytest
+
+from testing import todos as todo_helpers
+from vote_on_todos.django_back_end import identity_map
+from vote_on_todos.django_back_end import queries
+from vote_on_todos.django_back_end.unit_of_work import DjangoCommitter
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def test_repositories_share_loaded_todos():
+    DjangoCommitter().handle(
+        todo_helpers.TodoCreatedV1(todo_id='todo-1', list_id='list-1', index=1),
+    )
+
+    with identity_map.scope() as loaded:
+        todo = queries.TodoRepo(identity_map=loaded).get_todo('todo-1')
+        again = queries.TodoRepo(identity_map=loaded).get_todo('todo-1')
+
+    assert again is todo
+    assert (loaded.hits, loaded.misses) == (1, 1)
+
+
+def test_read_models_and_streams_are_loaded_apart():
+    DjangoCommitter().handle(
+        todo_helpers.TodoCreatedV1(todo_id='todo-1', list_id='list-1', index=1),
+    )
+
+    with identity_map.scope() as loaded:
+        todo = queries.TodoRepo(identity_map=loaded).get_todo('todo-1')
+        stream_todo = queries.TodoStreamRepo(
+            identity_map=loaded,
+        ).get_todo('todo-1')
+
+    assert stream_todo is not todo
+    assert stream_todo == todo
+    assert (loaded.hits, loaded.misses) == (0, 2)
+
+
+def test_handled_events_invalidate_loaded_todos():
+    with identity_map.scope() as loaded:
+        repo = queries.TodoRepo(identity_map=loaded)
+        committer = DjangoCommitter(identity_map=loaded)
+
+        assert repo.get_todo('todo-1') is None
+
+        with committer.atomic():
+            committer.handle(
+                todo_helpers.TodoCreatedV1(
+                    todo_id='todo-1', list_id='list-1', index=1,
+                ),
+            )
+
+        todo = repo.get_todo('todo-1')
+
+    assert todo is not None
+    assert (loaded.hits, loaded.misses) == (0, 2)
+
+
+def test_scope():
+    assert identity_map.current() is None
+
+    with identity_map.scope() as loaded:
+        assert identity_map.current() is loaded
+
+    assert identity_map.current() is None
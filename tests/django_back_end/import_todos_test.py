@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from testing import lists as list_helpers
+from vote_on_todos.django_back_end import models
+from vote_on_todos.django_back_end import queries
+from vote_on_todos.django_back_end.unit_of_work import DjangoCommitter
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def todo_list() -> str:
+    committer = DjangoCommitter()
+    with committer.atomic():
+        committer.handle(list_helpers.ListCreatedV1(list_id='list-1', index=1))
+    return 'list-1'
+
+
+def test_import_todos(todo_list, tmp_path):
+    path = tmp_path / 'todos.jsonl'
+    path.write_text(
+        ''.join(f'{{"title": "Todo {i}"}}\n' for i in range(5)),
+    )
+    stdout = io.StringIO()
+
+    call_command(
+        'import_todos', todo_list, str(path),
+        '--created-by', 'user-1', '--batch-size', '2',
+        stdout=stdout,
+    )
+
+    assert 'imported 5 todos' in stdout.getvalue()
+    assert [
+        todo.title for todo in queries.TodoRepo().get_incomplete(todo_list)
+    ] == [f'Todo {i}' for i in range(5)]
+
+
+def test_import_todos_into_nonexistent_list(tmp_path):
+    path = tmp_path / 'todos.csv'
+    path.write_text('title\nTodo\n')
+
+    with pytest.raises(CommandError, match='there is no list list-5'):
+        call_command('import_todos', 'list-5', str(path), '--created-by', 'me')
+
+
+def test_import_todos_unknown_format(todo_list, tmp_path):
+    path = tmp_path / 'todos.txt'
+    path.write_text('Todo\n')
+
+    with pytest.raises(CommandError, match='use --format'):
+        call_command('import_todos', todo_list, str(path), '--created-by', 'me')
+
+
+def test_import_todos_left_to_the_projector(todo_list, tmp_path, settings):
+    settings.PROJECT_READ_MODELS_INLINE = False
+    path = tmp_path / 'todos.csv'
+    path.write_text('title\nTodo\n')
+
+    call_command(
+        'import_todos', todo_list, str(path), '--created-by', 'me',
+        stdout=io.StringIO(),
+    )
+
+    assert models.TodoEvent.objects.count() == 1
+    assert not models.TodoItem.objects.exists()
+
+
+@pytest.mark.parametrize(
+    ('args', 'match'),
+    (
+        (('--batch-size', '0'), '--batch-size must be at least 1'),
+        (('--format', 'csv'), 'No such file or directory'),
+    ),
+)
+def test_import_todos_bad_arguments(todo_list, tmp_path, args, match):
+    path = tmp_path / 'missing.csv'
+
+    with pytest.raises(CommandError, match=match):
+        call_command(
+            'import_todos', todo_list, str(path), '--created-by', 'me', *args,
+        )
+
+
+def test_import_invalid_todos(todo_list, tmp_path):
+    path = tmp_path / 'todos.csv'
+    path.write_text('name\nTodo\n')
+
+    with pytest.raises(
+        CommandError, match='todos.csv: line 1: the header has no title column',
+    ):
+        call_command('import_todos', todo_list, str(path), '--created-by', 'me')
+
+    assert not models.TodoEvent.objects.exists()
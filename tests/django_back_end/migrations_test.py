@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import datetime
+import importlib
+import json
+from collections.abc import Callable
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+_APP = 'django_back_end'
+
+_TIMESTAMP = datetime.datetime(2023, 1, 2, 3, 4, 5, tzinfo=datetime.UTC)
+
+
+@pytest.fixture
+def migrate() -> Iterator[Callable[[str], Any]]:
+    """Migrate the app to a migration, and get the models as of then.
+
+    The database is migrated back to the latest migration afterwards.
+    """
+    def migrate(name: str) -> Any:
+        executor = MigrationExecutor(connection)
+        executor.migrate([(_APP, name)])
+        return executor.loader.project_state([(_APP, name)]).apps
+
+    yield migrate
+
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes(_APP))
+
+
+def _create_todo_events(
+        apps: Any,
+        events: list[tuple[str, dict[str, Any]]],
+        *,
+        todo_id: str = 'todo-1',
+        start_position: int | None = None,
+) -> None:
+    """Create the events of a todo, a day apart, as of a past migration."""
+    TodoEvent = apps.get_model(_APP, 'TodoEvent')
+    TodoEventSequence = apps.get_model(_APP, 'TodoEventSequence')
+    for index, (event_type, payload) in enumerate(events, start=1):
+        fields = {}
+        if start_position is not None:
+            fields['position'] = start_position + index - 1
+        event = TodoEvent.objects.create(
+            event_type=event_type, event_type_version=1, todo_id=todo_id,
+            timestamp=_TIMESTAMP + datetime.timedelta(days=index),
+            payload=json.dumps(payload),
+            **fields,
+        )
+        TodoEventSequence.objects.create(
+            event=event, todo_id=todo_id, index=index,
+        )
+
+
+def test_0003_populates_todo_items(migrate):
+    apps = migrate('0002_ensure_index_always_increases')
+    payloads = [
+        ('TodoCreated', {
+            'list_id': 'list-1', 'title': 'Paint the fence',
+            'description': 'Before it rains', 'created_by': 'me',
+        }),
+        ('TodoUpvoted', {'upvoted_by': 'user-1'}),
+        ('TodoUpvoted', {'upvoted_by': 'user-2'}),
+        ('TodoUpvoteRemoved', {'removed_by': 'user-1'}),
+        ('TodoDone', {'recorded_by': 'user-2'}),
+    ]
+    _create_todo_events(apps, [
+        (event_type, {'todo_id': 'todo-1', 'index': index, **payload})
+        for index, (event_type, payload) in enumerate(payloads, start=1)
+    ])
+
+    apps = migrate('0003_todoitem')
+
+    TodoItem = apps.get_model(_APP, 'TodoItem')
+    item = TodoItem.objects.get()
+    assert (item.todo_id, item.list_id, item.title, item.creator) == (
+        'todo-1', 'list-1', 'Paint the fence', 'me',
+    )
+    assert item.next_index == 6
+    assert item.created_at == _TIMESTAMP + datetime.timedelta(days=1)
+    assert item.done_at == _TIMESTAMP + datetime.timedelta(days=5)
+    assert item.completor == 'user-2'
+    assert (item.upvotes, item.vote_count) == (['user-2'], 1)
+
+
+def test_0005_compacts_payloads_and_back(migrate):
+    apps = migrate('0004_snapshot')
+    ListEvent = apps.get_model(_APP, 'ListEvent')
+    ListEventSequence = apps.get_model(_APP, 'ListEventSequence')
+    TodoEvent = apps.get_model(_APP, 'TodoEvent')
+    TodoEventSequence = apps.get_model(_APP, 'TodoEventSequence')
+    list_payload = {
+        'timestamp': _TIMESTAMP.isoformat(), 'list_id': 'list-1', 'index': 1,
+        'name': 'My List', 'description': 'Things', 'created_by': 'me',
+    }
+    list_event = ListEvent.objects.create(
+        event_type='ListCreated', event_type_version=1, list_id='list-1',
+        timestamp=_TIMESTAMP, payload=json.dumps(list_payload),
+    )
+    ListEventSequence.objects.create(
+        event=list_event, list_id='list-1', index=1,
+    )
+    todo_payload = {
+        'timestamp': _TIMESTAMP.isoformat(), 'todo_id': 'todo-1', 'index': 1,
+        'list_id': 'list-1', 'title': 'T', 'description': 'D',
+        'created_by': 'me',
+    }
+    todo_event = TodoEvent.objects.create(
+        event_type='TodoCreated', event_type_version=1, todo_id='todo-1',
+        timestamp=_TIMESTAMP, payload=json.dumps(todo_payload),
+    )
+    TodoEventSequence.objects.create(
+        event=todo_event, todo_id='todo-1', index=1,
+    )
+
+    apps = migrate('0005_compact_payloads')
+
+    assert json.loads(
+        apps.get_model(_APP, 'ListEvent').objects.get().payload,
+    ) == {'name': 'My List', 'description': 'Things', 'created_by': 'me'}
+    assert json.loads(
+        apps.get_model(_APP, 'TodoEvent').objects.get().payload,
+    ) == {
+        'list_id': 'list-1', 'title': 'T', 'description': 'D',
+        'created_by': 'me',
+    }
+
+    apps = migrate('0004_snapshot')
+
+    assert json.loads(
+        apps.get_model(_APP, 'ListEvent').objects.get().payload,
+    ) == list_payload
+    assert json.loads(
+        apps.get_model(_APP, 'TodoEvent').objects.get().payload,
+    ) == todo_payload
+
+
+def test_0007_populates_todo_lists(migrate):
+    apps = migrate('0006_todoitem_rank_indexes')
+    ListEvent = apps.get_model(_APP, 'ListEvent')
+    ListEventSequence = apps.get_model(_APP, 'ListEventSequence')
+    event = ListEvent.objects.create(
+        event_type='ListCreated', event_type_version=1, list_id='list-1',
+        timestamp=_TIMESTAMP,
+        payload=json.dumps({
+            'name': 'My List', 'description': 'Things', 'created_by': 'me',
+        }),
+    )
+    ListEventSequence.objects.create(event=event, list_id='list-1', index=1)
+
+    apps = migrate('0007_todolist')
+
+    TodoList = apps.get_model(_APP, 'TodoList')
+    todo_list = TodoList.objects.get()
+    assert (
+        todo_list.list_id, todo_list.name, todo_list.description,
+        todo_list.creator,
+    ) == ('list-1', 'My List', 'Things', 'me')
+
+
+def test_0009_logs_events_in_the_order_they_happened(migrate):
+    apps = migrate('0008_stream_heads')
+    _create_todo_events(apps, [
+        ('TodoCreated', {
+            'list_id': 'list-1', 'title': 'T', 'description': 'D',
+            'created_by': 'me',
+        }),
+        ('TodoUpvoted', {'upvoted_by': 'me'}),
+        ('TodoUpvoted', {'upvoted_by': 'user-1'}),
+    ])
+    # between the todo's first and second events
+    ListEvent = apps.get_model(_APP, 'ListEvent')
+    ListEvent.objects.create(
+        event_type='ListCreated', event_type_version=1, list_id='list-1',
+        timestamp=_TIMESTAMP + datetime.timedelta(days=1, hours=1),
+        payload=json.dumps({
+            'name': 'My List', 'description': 'Things', 'created_by': 'me',
+        }),
+    )
+
+    apps = migrate('0009_event_log_position')
+
+    assert list(
+        apps.get_model(_APP, 'TodoEvent').objects.order_by(
+            'timestamp',
+        ).values_list('position', flat=True),
+    ) == [1, 3, 4]
+    assert apps.get_model(_APP, 'ListEvent').objects.get().position == 2
+    assert apps.get_model(_APP, 'EventLogHead').objects.get().position == 4
+
+
+def test_0011_populates_votes_and_barriers(migrate):
+    apps = migrate('0010_projection_checkpoint')
+    _create_todo_events(
+        apps,
+        [
+            ('TodoCreated', {
+                'list_id': 'list-1', 'title': 'T', 'description': 'D',
+                'created_by': 'me',
+            }),
+            ('TodoUpvoted', {'upvoted_by': 'user-1'}),
+            ('TodoUpvoted', {'upvoted_by': 'user-2'}),
+            ('TodoUpvoteRemoved', {'removed_by': 'user-1'}),
+        ],
+        start_position=1,
+    )
+    apps.get_model(_APP, 'TodoStream').objects.create(
+        todo_id='todo-1', version=4,
+    )
+
+    apps = migrate('0011_commutative_votes')
+
+    assert list(
+        apps.get_model(_APP, 'TodoVote').objects.values_list(
+            'todo_id', 'user_id',
+        ),
+    ) == [('todo-1', 'user-2')]
+    # only the creation is not a vote
+    assert apps.get_model(_APP, 'TodoStream').objects.get().barrier == 1
+
+
+def test_0012_populates_user_activity(migrate, monkeypatch):
+    # flush in the middle of the events too
+    monkeypatch.setattr(
+        importlib.import_module(
+            'vote_on_todos.django_back_end.migrations.0012_useractivity',
+        ),
+        '_BATCH_SIZE', 3,
+    )
+    apps = migrate('0011_commutative_votes')
+    _create_todo_events(
+        apps,
+        [
+            ('TodoCreated', {
+                'list_id': 'list-1', 'title': 'T', 'description': 'D',
+                'created_by': 'me',
+            }),
+            ('TodoUpvoted', {'upvoted_by': 'user-1'}),
+            ('TodoUpvoteRemoved', {'removed_by': 'user-1'}),
+            ('TodoDone', {'recorded_by': 'user-2'}),
+        ],
+        start_position=1,
+    )
+
+    apps = migrate('0012_useractivity')
+
+    UserActivity = apps.get_model(_APP, 'UserActivity')
+    assert list(
+        UserActivity.objects.order_by('index').values_list(
+            'user_id', 'kind', 'todo_id', 'index', 'timestamp',
+        ),
+    ) == [
+        ('me', 'created', 'todo-1', 1, _TIMESTAMP + datetime.timedelta(days=1)),
+        (
+            'user-1', 'upvoted', 'todo-1', 2,
+            _TIMESTAMP + datetime.timedelta(days=2),
+        ),
+        (
+            'user-1', 'upvote_removed', 'todo-1', 3,
+            _TIMESTAMP + datetime.timedelta(days=3),
+        ),
+        (
+            'user-2', 'completed', 'todo-1', 4,
+            _TIMESTAMP + datetime.timedelta(days=4),
+        ),
+    ]
+
+
+def test_0013_populates_list_stats(migrate):
+    apps = migrate('0012_useractivity')
+    _create_todo_events(
+        apps,
+        [
+            ('TodoCreated', {
+                'list_id': 'list-1', 'title': 'T', 'description': 'D',
+                'created_by': 'me',
+            }),
+            ('TodoUpvoted', {'upvoted_by': 'user-1'}),
+            ('TodoUpvoted', {'upvoted_by': 'user-2'}),
+        ],
+        start_position=1,
+    )
+    TodoItem = apps.get_model(_APP, 'TodoItem')
+    item_fields = {'title': 'T', 'description': 'D', 'creator': 'me'}
+    TodoItem.objects.create(
+        todo_id='todo-1', next_index=4, list_id='list-1', vote_count=2,
+        created_at=_TIMESTAMP + datetime.timedelta(days=1), **item_fields,
+    )
+    # todos without events fall back on when they were created
+    TodoItem.objects.create(
+        todo_id='todo-2', next_index=3, list_id='list-1',
+        created_at=_TIMESTAMP + datetime.timedelta(days=10),
+        done_at=_TIMESTAMP + datetime.timedelta(days=11), completor='me',
+        **item_fields,
+    )
+    TodoItem.objects.create(
+        todo_id='todo-3', next_index=2, list_id='list-2',
+        created_at=_TIMESTAMP, **item_fields,
+    )
+
+    apps = migrate('0013_liststats')
+
+    assert list(
+        apps.get_model(_APP, 'ListStats').objects.order_by(
+            'todo_list_id',
+        ).values_list(
+            'todo_list_id', 'open_count', 'done_count', 'vote_count',
+            'last_activity',
+        ),
+    ) == [
+        ('list-1', 1, 1, 2, _TIMESTAMP + datetime.timedelta(days=10)),
+        ('list-2', 1, 0, 0, _TIMESTAMP),
+    ]
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import io
+import time
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from testing import lists as list_helpers
+from testing import todos as todo_helpers
+from vote_on_todos.django_back_end import models
+from vote_on_todos.django_back_end import projections
+from vote_on_todos.django_back_end.unit_of_work import DjangoCommitter
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+TODO_ITEMS = projections.get_projection('todo_items')
+
+
+def _create_events() -> None:
+    committer = DjangoCommitter(project_inline=False)
+    with committer.atomic():
+        committer.handle(list_helpers.ListCreatedV1(list_id='list-1', index=1))
+        committer.handle(
+            todo_helpers.TodoCreatedV1(
+                todo_id='todo-1', list_id='list-1', index=1,
+            ),
+        )
+        committer.handle(
+            todo_helpers.TodoUpvotedV1(
+                todo_id='todo-1', index=2, upvoted_by='user-1',
+            ),
+        )
+
+
+def test_read_models_are_left_to_the_projector():
+    _create_events()
+
+    assert not models.TodoList.objects.exists()
+    assert not models.TodoItem.objects.exists()
+    assert projections.lag(TODO_ITEMS) == 3
+
+
+def test_inline_projection_advances_checkpoints():
+    committer = DjangoCommitter()
+    committer.handle(list_helpers.ListCreatedV1(list_id='list-1', index=1))
+    with committer.atomic():
+        committer.handle(
+            todo_helpers.TodoCreatedV1(
+                todo_id='todo-1', list_id='list-1', index=1,
+            ),
+        )
+        committer.handle(
+            todo_helpers.TodoUpvotedV1(
+                todo_id='todo-1', index=2, upvoted_by='user-1',
+            ),
+        )
+
+    for projection in projections.PROJECTIONS:
+        assert projections.checkpoint(projection) == 3
+        assert projections.lag(projection) == 0
+        assert projections.catch_up(projection) == 0
+
+
+def test_inline_projection_leaves_deferred_events_to_the_projector():
+    DjangoCommitter(project_inline=False).handle(
+        todo_helpers.TodoCreatedV1(todo_id='todo-1', list_id='list-1', index=1),
+    )
+    DjangoCommitter().handle(
+        todo_helpers.TodoCreatedV1(todo_id='todo-2', list_id='list-1', index=1),
+    )
+
+    assert projections.checkpoint(TODO_ITEMS) == 0
+    assert projections.lag(TODO_ITEMS) == 2
+
+    assert projections.catch_up(TODO_ITEMS) == 2
+    assert sorted(
+        models.TodoItem.objects.values_list('todo_id', flat=True),
+    ) == ['todo-1', 'todo-2']
+
+    DjangoCommitter().handle(
+        todo_helpers.TodoCreatedV1(todo_id='todo-3', list_id='list-1', index=1),
+    )
+
+    assert projections.checkpoint(TODO_ITEMS) == 3
+
+
+def test_catch_up():
+    _create_events()
+
+    assert projections.catch_up(TODO_ITEMS, batch_size=2) == 2
+    assert projections.checkpoint(TODO_ITEMS) == 2
+    assert models.TodoItem.objects.get().vote_count == 0
+
+    assert projections.catch_up(TODO_ITEMS, batch_size=2) == 1
+    assert projections.catch_up(TODO_ITEMS, batch_size=2) == 0
+    assert projections.lag(TODO_ITEMS) == 0
+    assert models.TodoItem.objects.get().vote_count == 1
+
+
+def test_replaying_events_is_idempotent():
+    _create_events()
+    projections.catch_up(TODO_ITEMS)
+
+    models.ProjectionCheckpoint.objects.update(position=0)
+    projections.catch_up(TODO_ITEMS)
+
+    item = models.TodoItem.objects.get()
+    assert item.next_index == 3
+    assert item.vote_count == 1
+    stats = models.ListStats.objects.get()
+    assert (stats.open_count, stats.vote_count) == (1, 1)
+
+
+def test_list_stats():
+    _create_events()
+    committer = DjangoCommitter(project_inline=False)
+    with committer.atomic():
+        committer.handle(
+            todo_helpers.TodoCreatedV1(
+                todo_id='todo-2', list_id='list-1', index=1,
+            ),
+        )
+        committer.handle(
+            todo_helpers.TodoUpvoteRemovedV1(
+                todo_id='todo-1', index=3, removed_by='user-1',
+            ),
+        )
+        committer.handle(todo_helpers.TodoDoneV1(todo_id='todo-1', index=4))
+
+    projections.catch_up(TODO_ITEMS, batch_size=3)
+    projections.catch_up(TODO_ITEMS, batch_size=3)
+
+    stats = models.ListStats.objects.get(todo_list_id='list-1')
+    assert stats.open_count == 1
+    assert stats.done_count == 1
+    assert stats.vote_count == 0
+
+
+def test_run_projector_once():
+    _create_events()
+
+    call_command('run_projector', '--once')
+
+    assert models.TodoList.objects.get().name == 'My List'
+    assert models.TodoItem.objects.get().vote_count == 1
+    assert all(
+        projections.lag(projection) == 0
+        for projection in projections.PROJECTIONS
+    )
+
+
+def test_run_projector_until_interrupted(monkeypatch):
+    _create_events()
+    naps = []
+
+    def sleep(seconds: float) -> None:
+        naps.append(seconds)
+        if len(naps) == 2:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(time, 'sleep', sleep)
+    stdout = io.StringIO()
+
+    call_command(
+        'run_projector', '--projection', 'todo_items', '--poll-interval', '5',
+        stdout=stdout,
+    )
+
+    assert naps == [5, 5]
+    # the first pass applies the events, and the second finds nothing new
+    assert stdout.getvalue().count('todo_items: applied 3 events') == 1
+    assert models.TodoItem.objects.get().vote_count == 1
+    assert not models.TodoList.objects.exists()
+
+
+def test_run_projector_bad_batch_size():
+    with pytest.raises(CommandError, match='--batch-size must be at least 1'):
+        call_command('run_projector', '--once', '--batch-size', '0')
+
+
+def test_get_unknown_projection():
+    with pytest.raises(KeyError):
+        projections.get_projection('todo_votes')
+
+
+def test_index_todos():
+    _create_events()
+
+    call_command('index_todos', stdout=io.StringIO())
+
+    document = models.TodoSearchDocument.objects.get()
+    assert document.todo_id == 'todo-1'
+    assert document.title == 'Something I must do'
+
+
+def test_index_todos_bad_batch_size():
+    with pytest.raises(CommandError, match='--batch-size must be at least 1'):
+        call_command('index_todos', '--batch-size', '0')
@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import datetime
+
+import pytest
+
+from testing import lists as list_helpers
+from testing import todos as todo_helpers
+from vote_on_todos.django_back_end import models
+from vote_on_todos.django_back_end import queries
+from vote_on_todos.django_back_end import snapshots
+from vote_on_todos.django_back_end.unit_of_work import DjangoCommitter
+from vote_on_todos.todos.domain import lists
+from vote_on_todos.todos.domain import todos
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def _create_lists(*names: str) -> None:
+    committer = DjangoCommitter()
+    with committer.atomic():
+        for i, name in enumerate(names, start=1):
+            committer.handle(
+                list_helpers.ListCreatedV1(
+                    list_id=f'list-{i}', index=1, name=name,
+                ),
+            )
+
+
+class TestListRepo:
+    def test_get_incomplete_on_list(self):
+        _create_lists('My List')
+
+        assert queries.ListRepo().get_list('list-1') == lists.TodoList(
+            id='list-1',
+            name='My List',
+            description='Things I need to do',
+            creator='me',
+        )
+
+    def test_get_list_before_it_is_projected(self):
+        committer = DjangoCommitter(project_inline=False)
+        committer.handle(list_helpers.ListCreatedV1(list_id='list-1', index=1))
+
+        assert queries.ListRepo().get_list('list-1').name == 'My List'
+
+    def test_get_list_from_snapshot(self):
+        _create_lists('My List')
+        snapshots.take_list_snapshot('list-1')
+        models.ListEventSequence.objects.all().delete()
+
+        assert queries.ListRepo().get_list('list-1').name == 'My List'
+
+    def test_get_nonexistent_list(self):
+        with pytest.raises(KeyError):
+            queries.ListRepo().get_list('list-1')
+
+    def test_is_list(self):
+        _create_lists('My List')
+
+        assert queries.ListRepo().is_list('list-1')
+        assert not queries.ListRepo().is_list('list-2')
+
+    def test_get_lists(self):
+        _create_lists('B', 'C', 'A')
+
+        todo_lists = queries.ListRepo().get_lists()
+
+        assert [lst.name for lst in todo_lists] == ['A', 'B', 'C']
+
+    def test_get_lists_page(self):
+        _create_lists('B', 'C', 'A')
+
+        todo_lists = queries.ListRepo().get_lists(limit=1, after='list-1')
+
+        assert [lst.name for lst in todo_lists] == ['C']
+
+    def test_get_lists_after_unknown_cursor(self):
+        _create_lists('B', 'C', 'A')
+
+        todo_lists = queries.ListRepo().get_lists(after='list-x')
+
+        assert [lst.name for lst in todo_lists] == ['A', 'B', 'C']
+
+    def test_get_summaries(self, django_assert_num_queries):
+        _create_lists('B', 'A')
+        _create_todos_for_ranking()
+
+        with django_assert_num_queries(1):
+            summaries = queries.ListRepo().get_summaries()
+
+        assert [s.todo_list.name for s in summaries] == ['A', 'B']
+        assert summaries[0].stats == queries.ListStats()
+        stats = summaries[1].stats
+        assert (stats.open_count, stats.done_count, stats.vote_count) == (
+            3, 2, 5,
+        )
+        assert stats.last_activity is not None
+
+
+class TestTodoRepo:
+    def test_get_todo(self):
+        committer = DjangoCommitter()
+        with committer.atomic():
+            committer.handle(
+                todo_helpers.TodoCreatedV1(
+                    todo_id='todo-1', list_id='list-1', index=1,
+                    timestamp=datetime.datetime(2023, 1, 2, tzinfo=datetime.UTC),
+                ),
+            )
+            committer.handle(
+                todo_helpers.TodoUpvotedV1(
+                    todo_id='todo-1', index=2, upvoted_by='user-1',
+                ),
+            )
+
+        todo = queries.TodoRepo().get_todo('todo-1')
+
+        assert todo == todos.TodoItem(
+            id='todo-1',
+            next_index=3,
+            list_id='list-1',
+            title='Something I must do',
+            description='A very important thing',
+            creator='me',
+            created_at=datetime.datetime(2023, 1, 2, tzinfo=datetime.UTC),
+            vote_count=1,
+        )
+
+    def test_get_nonexistent_todo(self):
+        assert queries.TodoRepo().get_todo('todo-1') is None
+
+    def test_get_incomplete_on_list(self):
+        committer = DjangoCommitter()
+        with committer.atomic():
+            committer.handle(
+                todo_helpers.TodoCreatedV1(
+                    todo_id='todo-1', list_id='list-1', index=1,
+                ),
+            )
+            committer.handle(
+                todo_helpers.TodoCreatedV1(
+                    todo_id='todo-2', list_id='list-2', index=1,
+                ),
+            )
+
+        todo_items = queries.TodoRepo().get_incomplete('list-1')
+
+        assert [todo.id for todo in todo_items] == ['todo-1']
+
+
+def _create_todos_for_ranking() -> None:
+    committer = DjangoCommitter()
+    with committer.atomic():
+        for i in range(1, 6):
+            committer.handle(
+                todo_helpers.TodoCreatedV1(
+                    todo_id=f'todo-{i}', list_id='list-1', index=1,
+                    timestamp=datetime.datetime(2023, 1, i, tzinfo=datetime.UTC),
+                ),
+            )
+        for todo_id, voters in (('todo-2', 2), ('todo-4', 1), ('todo-5', 2)):
+            for j in range(voters):
+                committer.handle(
+                    todo_helpers.TodoUpvotedV1(
+                        todo_id=todo_id, index=j + 2, upvoted_by=f'user-{j}',
+                    ),
+                )
+        for todo_id, day in (('todo-3', 10), ('todo-1', 9)):
+            committer.handle(
+                todo_helpers.TodoDoneV1(
+                    todo_id=todo_id, index=2,
+                    timestamp=datetime.datetime(2023, 1, day, tzinfo=datetime.UTC),
+                ),
+            )
+
+
+class TestTodoRanking:
+    def test_get_incomplete(self):
+        _create_todos_for_ranking()
+
+        todo_items = queries.TodoRepo().get_incomplete('list-1')
+
+        assert [todo.id for todo in todo_items] == ['todo-2', 'todo-5', 'todo-4']
+
+    def test_get_incomplete_top_k(self):
+        _create_todos_for_ranking()
+
+        todo_items = queries.TodoRepo().get_incomplete('list-1', limit=2)
+
+        assert [todo.id for todo in todo_items] == ['todo-2', 'todo-5']
+
+    @pytest.mark.parametrize(
+        ('after', 'expected'),
+        (
+            ('todo-2', ['todo-5', 'todo-4']),
+            ('todo-5', ['todo-4']),
+            ('todo-4', []),
+        ),
+    )
+    def test_get_incomplete_next_page(self, after, expected):
+        _create_todos_for_ranking()
+
+        todo_items = queries.TodoRepo().get_incomplete('list-1', after=after)
+
+        assert [todo.id for todo in todo_items] == expected
+
+    def test_get_completed(self):
+        _create_todos_for_ranking()
+
+        todo_items = queries.TodoRepo().get_completed('list-1')
+
+        assert [todo.id for todo in todo_items] == ['todo-1', 'todo-3']
+
+    def test_get_completed_next_page(self):
+        _create_todos_for_ranking()
+
+        todo_items = queries.TodoRepo().get_completed('list-1', after='todo-1')
+
+        assert [todo.id for todo in todo_items] == ['todo-3']
+
+    @pytest.mark.parametrize('after', ('todo-2', 'todo-6', 'todo-x'))
+    def test_get_completed_after_foreign_cursor(self, after):
+        _create_todos_for_ranking()
+        DjangoCommitter().handle(
+            todo_helpers.TodoCreatedV1(
+                todo_id='todo-6', list_id='list-2', index=1,
+            ),
+        )
+
+        todo_items = queries.TodoRepo().get_completed('list-1', after=after)
+
+        assert [todo.id for todo in todo_items] == ['todo-1', 'todo-3']
+
+
+class TestTodoStreamRepo:
+    def test_get_todo(self):
+        committer = DjangoCommitter()
+        with committer.atomic():
+            committer.handle(
+                todo_helpers.TodoCreatedV1(
+                    todo_id='todo-1', list_id='list-1', index=1,
+                ),
+            )
+            committer.handle(
+                todo_helpers.TodoCreatedV1(
+                    todo_id='todo-2', list_id='list-1', index=1,
+                ),
+            )
+            committer.handle(
+                todo_helpers.TodoUpvotedV1(
+                    todo_id='todo-1', index=2, upvoted_by='user-1',
+                ),
+            )
+
+        todo = queries.TodoStreamRepo().get_todo('todo-1')
+
+        assert todo is not None
+        assert todo.id == 'todo-1'
+        assert todo.next_index == 3
+        assert todo.vote_count == 1
+
+    def test_get_nonexistent_todo(self):
+        assert queries.TodoStreamRepo().get_todo('todo-1') is None
+
+
+class TestVoteRepo:
+    def test_has_voted(self):
+        _create_todos_for_ranking()
+
+        assert queries.VoteRepo().has_voted('todo-2', 'user-1')
+        assert not queries.VoteRepo().has_voted('todo-4', 'user-1')
+
+    def test_voted_on(self):
+        _create_todos_for_ranking()
+
+        voted = queries.VoteRepo().voted_on(
+            'user-0', ['todo-1', 'todo-2', 'todo-3', 'todo-5'],
+        )
+
+        assert voted == {'todo-2', 'todo-5'}
+
+
+class TestActivityRepo:
+    def test_get_activity(self):
+        _create_todos_for_ranking()
+
+        activity = queries.ActivityRepo().get_activity('user-1')
+
+        assert [(a.kind, a.todo and a.todo.id) for a in activity] == [
+            ('upvoted', 'todo-5'), ('upvoted', 'todo-2'),
+        ]
+
+    def test_get_activity_page(self):
+        _create_todos_for_ranking()
+        first, *_ = queries.ActivityRepo().get_activity('me', limit=1)
+
+        activity = queries.ActivityRepo().get_activity('me', after=first.id)
+
+        assert [a.kind for a in activity] == [
+            'completed', 'created', 'created', 'created', 'created', 'created',
+        ]
+
+    @pytest.mark.parametrize('after', ('999', 'not-an-id'))
+    def test_get_activity_after_unknown_cursor(self, after):
+        _create_todos_for_ranking()
+
+        activity = queries.ActivityRepo().get_activity('user-1', after=after)
+
+        assert [a.todo and a.todo.id for a in activity] == ['todo-5', 'todo-2']
+
+
+def _create_todos_for_search() -> None:
+    committer = DjangoCommitter()
+    with committer.atomic():
+        committer.handle(
+            list_helpers.ListCreatedV1(list_id='list-1', index=1, name='Home'),
+        )
+        for i, (title, description) in enumerate(
+            (
+                ('Paint the fence', 'Before it rains'),
+                ('Clean the gutters', 'Before the rain starts'),
+                ('Buy brushes', 'For painting the fence'),
+            ),
+            start=1,
+        ):
+            committer.handle(
+                todo_helpers.TodoCreatedV1(
+                    todo_id=f'todo-{i}', list_id='list-1', index=1,
+                    title=title, description=description,
+                ),
+            )
+
+
+class TestSearchRepo:
+    def test_search(self):
+        _create_todos_for_search()
+
+        results = queries.SearchRepo().search('paint')
+
+        # title matches rank above description matches, and words match by
+        # prefix
+        assert [r.todo_id for r in results] == ['todo-1', 'todo-3']
+        assert results[0].list_name == 'Home'
+        assert results[1].snippet == 'For painting the fence'
+
+    def test_search_all_words(self):
+        _create_todos_for_search()
+
+        results = queries.SearchRepo().search('the fence')
+
+        assert {r.todo_id for r in results} == {'todo-1', 'todo-3'}
+
+    @pytest.mark.parametrize('text', ('', '"', 'OR AND NOT (', 'nothing'))
+    def test_search_no_results(self, text):
+        _create_todos_for_search()
+
+        assert queries.SearchRepo().search(text) == []
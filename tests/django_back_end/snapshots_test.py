@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import pytest
+
+from testing import lists as list_helpers
+from testing import todos as todo_helpers
+from vote_on_todos.django_back_end import models
+from vote_on_todos.django_back_end import snapshots
+from vote_on_todos.django_back_end.unit_of_work import DjangoCommitter
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def _create_todo_with_upvotes(n: int) -> None:
+    committer = DjangoCommitter()
+    committer.handle(
+        todo_helpers.TodoCreatedV1(
+            todo_id='todo-1', list_id='list-1', index=1,
+        ),
+    )
+    for i in range(n):
+        committer.handle(
+            todo_helpers.TodoUpvotedV1(
+                todo_id='todo-1', index=i + 2, upvoted_by=f'user-{i}',
+            ),
+        )
+
+
+def test_snapshot_taken_every_interval(monkeypatch):
+    monkeypatch.setattr(snapshots, 'SNAPSHOT_INTERVAL', 3)
+
+    _create_todo_with_upvotes(6)
+
+    assert sorted(
+        models.Snapshot.objects.filter(
+            stream_type=models.Snapshot.StreamType.TODO, stream_id='todo-1',
+        ).values_list('index', flat=True),
+    ) == [3, 6]
+
+
+def test_snapshot_taken_after_batch(monkeypatch):
+    monkeypatch.setattr(snapshots, 'SNAPSHOT_INTERVAL', 3)
+
+    committer = DjangoCommitter()
+    with committer.atomic():
+        committer.handle(
+            todo_helpers.TodoCreatedV1(
+                todo_id='todo-1', list_id='list-1', index=1,
+            ),
+        )
+        for i in range(6):
+            committer.handle(
+                todo_helpers.TodoUpvotedV1(
+                    todo_id='todo-1', index=i + 2, upvoted_by=f'user-{i}',
+                ),
+            )
+
+    assert list(
+        models.Snapshot.objects.values_list('index', flat=True),
+    ) == [7]
+
+
+def test_load_todo_from_snapshot(monkeypatch):
+    monkeypatch.setattr(snapshots, 'SNAPSHOT_INTERVAL', 3)
+    _create_todo_with_upvotes(4)
+
+    # events covered by the snapshot are not replayed
+    models.TodoEventSequence.objects.filter(index__lte=3).delete()
+
+    todo = snapshots.load_todo('todo-1')
+
+    assert todo is not None
+    assert todo.next_index == 6
+    assert todo.vote_count == 4
+
+
+def test_snapshots_in_other_versions_are_ignored(monkeypatch):
+    monkeypatch.setattr(snapshots, 'SNAPSHOT_INTERVAL', 3)
+    _create_todo_with_upvotes(4)
+
+    monkeypatch.setattr(
+        snapshots, 'SNAPSHOT_VERSION', snapshots.SNAPSHOT_VERSION + 1,
+    )
+    models.Snapshot.objects.update(state='not a valid snapshot')
+
+    todo = snapshots.load_todo('todo-1')
+
+    assert todo is not None
+    assert todo.vote_count == 4
+
+    assert snapshots.discard_stale_snapshots() == 1
+    assert not models.Snapshot.objects.exists()
+
+
+def test_take_list_snapshot_on_demand():
+    committer = DjangoCommitter()
+    with committer.atomic():
+        committer.handle(
+            list_helpers.ListCreatedV1(list_id='list-1', index=1),
+        )
+
+    snapshots.take_list_snapshot('list-1')
+    models.ListEventSequence.objects.all().delete()
+
+    todo_list = snapshots.load_list('list-1')
+
+    assert todo_list is not None
+    assert todo_list.name == 'My List'
+
+
+def test_no_snapshot_of_nonexistent_stream():
+    snapshots.take_list_snapshot('list-1')
+    snapshots.take_todo_snapshot('todo-1')
+
+    assert not models.Snapshot.objects.exists()
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+from unittest import mock
+
 import pytest
+from django.db.models import Q
 
 from testing import lists as list_helpers
 from testing import todos as todo_helpers
+from vote_on_todos.django_back_end import models
 from vote_on_todos.django_back_end.unit_of_work import DjangoCommitter
 from vote_on_todos.todos.application import unit_of_work
 
@@ -72,3 +76,257 @@ def test_non_monotonic_todo_event_insert_raises_StaleState(indices):
                 todo_id='todo-1', list_id='list-1', index=indices[1],
             ),
         )
+
+
+def test_stream_head_follows_latest_todo_event():
+    committer = DjangoCommitter()
+
+    with committer.atomic():
+        committer.handle(
+            todo_helpers.TodoCreatedV1(
+                todo_id='todo-1', list_id='list-1', index=1,
+            ),
+        )
+        committer.handle(todo_helpers.TodoUpvotedV1(todo_id='todo-1', index=2))
+
+    assert models.TodoStream.objects.get(todo_id='todo-1').version == 2
+
+
+def test_stale_todo_event_is_not_stored():
+    committer = DjangoCommitter()
+    committer.handle(
+        todo_helpers.TodoCreatedV1(todo_id='todo-1', list_id='list-1', index=1),
+    )
+
+    with pytest.raises(unit_of_work.StaleState):
+        committer.handle(todo_helpers.TodoUpvotedV1(todo_id='todo-1', index=1))
+
+    assert models.TodoEvent.objects.count() == 1
+
+
+def test_events_in_atomic_are_inserted_together(django_assert_max_num_queries):
+    committer = DjangoCommitter()
+
+    with django_assert_max_num_queries(20):
+        with committer.atomic():
+            for i in range(1, 51):
+                committer.handle(
+                    todo_helpers.TodoCreatedV1(
+                        todo_id=f'todo-{i}', list_id='list-1', index=1,
+                    ),
+                )
+                committer.handle(
+                    todo_helpers.TodoUpvotedV1(
+                        todo_id=f'todo-{i}', index=2, upvoted_by='user-1',
+                    ),
+                )
+
+    assert models.TodoEventSequence.objects.count() == 100
+    assert list(
+        models.TodoEvent.objects.order_by('position').values_list(
+            'todo_id', flat=True,
+        )[:3],
+    ) == ['todo-1', 'todo-1', 'todo-2']
+    assert set(
+        models.TodoStream.objects.values_list('version', flat=True),
+    ) == {2}
+
+
+def test_stale_event_in_batch_is_not_stored():
+    committer = DjangoCommitter()
+    committer.handle(
+        todo_helpers.TodoCreatedV1(todo_id='todo-1', list_id='list-1', index=1),
+    )
+
+    with pytest.raises(unit_of_work.StaleState):
+        with committer.atomic():
+            committer.handle(
+                todo_helpers.TodoCreatedV1(
+                    todo_id='todo-2', list_id='list-1', index=1,
+                ),
+            )
+            committer.handle(
+                todo_helpers.TodoUpvotedV1(todo_id='todo-1', index=1),
+            )
+
+    assert list(
+        models.TodoEvent.objects.values_list('todo_id', flat=True),
+    ) == ['todo-1']
+
+
+def test_empty_atomic_writes_nothing(django_assert_num_queries):
+    committer = DjangoCommitter()
+
+    with django_assert_num_queries(2):  # the savepoint and its release
+        with committer.atomic():
+            pass
+
+    assert not models.EventLogHead.objects.exists()
+
+
+def test_out_of_order_events_in_batch_raise_StaleState():
+    committer = DjangoCommitter()
+
+    with pytest.raises(unit_of_work.StaleState):
+        with committer.atomic():
+            committer.handle(
+                todo_helpers.TodoCreatedV1(
+                    todo_id='todo-1', list_id='list-1', index=2,
+                ),
+            )
+            committer.handle(
+                todo_helpers.TodoUpvotedV1(todo_id='todo-1', index=1),
+            )
+
+    assert not models.TodoEvent.objects.exists()
+
+
+def test_list_event_behind_its_stream_raises_StaleState():
+    committer = DjangoCommitter()
+    committer.handle(list_helpers.ListCreatedV1(list_id='list-1', index=1))
+    # the head has been lost, so only the sequence catches the conflict
+    models.ListStream.objects.all().delete()
+
+    with pytest.raises(unit_of_work.StaleState):
+        committer.handle(
+            list_helpers.ListCreatedV1(list_id='list-1', index=1),
+        )
+
+    assert models.ListEvent.objects.count() == 1
+
+
+def test_todo_event_behind_its_stream_raises_StaleState():
+    committer = DjangoCommitter()
+    committer.handle(
+        todo_helpers.TodoCreatedV1(todo_id='todo-1', list_id='list-1', index=1),
+    )
+    # the head has been lost, so only the sequence catches the conflict
+    models.TodoStream.objects.all().delete()
+
+    with pytest.raises(unit_of_work.StaleState):
+        committer.handle(
+            todo_helpers.TodoCreatedV1(
+                todo_id='todo-1', list_id='list-1', index=1,
+            ),
+        )
+
+    assert models.TodoEvent.objects.count() == 1
+
+
+def _create_todo() -> None:
+    DjangoCommitter().handle(
+        todo_helpers.TodoCreatedV1(todo_id='todo-1', list_id='list-1', index=1),
+    )
+
+
+def test_concurrent_votes_do_not_conflict():
+    _create_todo()
+    committer = DjangoCommitter()
+
+    # both votes were decided against the todo as of index 1
+    committer.handle(
+        todo_helpers.TodoUpvotedV1(
+            todo_id='todo-1', index=2, upvoted_by='user-1',
+        ),
+    )
+    committer.handle(
+        todo_helpers.TodoUpvotedV1(
+            todo_id='todo-1', index=2, upvoted_by='user-2',
+        ),
+    )
+
+    assert list(
+        models.TodoEventSequence.objects.order_by('index').values_list(
+            'index', flat=True,
+        ),
+    ) == [1, 2, 3]
+    item = models.TodoItem.objects.get()
+    assert (item.next_index, item.vote_count) == (4, 2)
+
+
+def test_vote_decided_before_completion_is_stale():
+    _create_todo()
+    committer = DjangoCommitter()
+    committer.handle(todo_helpers.TodoDoneV1(todo_id='todo-1', index=2))
+
+    with pytest.raises(unit_of_work.StaleState):
+        committer.handle(
+            todo_helpers.TodoUpvotedV1(
+                todo_id='todo-1', index=2, upvoted_by='user-1',
+            ),
+        )
+
+
+def test_completion_decided_before_vote_is_stale():
+    _create_todo()
+    committer = DjangoCommitter()
+    committer.handle(
+        todo_helpers.TodoUpvotedV1(
+            todo_id='todo-1', index=2, upvoted_by='user-1',
+        ),
+    )
+
+    with pytest.raises(unit_of_work.StaleState):
+        committer.handle(todo_helpers.TodoDoneV1(todo_id='todo-1', index=2))
+
+
+@pytest.mark.parametrize(
+    'events',
+    (
+        pytest.param(
+            (
+                todo_helpers.TodoUpvotedV1.build(
+                    todo_id='todo-1', index=2, upvoted_by='user-1',
+                ),
+                todo_helpers.TodoUpvotedV1.build(
+                    todo_id='todo-1', index=2, upvoted_by='user-1',
+                ),
+            ),
+            id='upvoted-twice',
+        ),
+        pytest.param(
+            (
+                todo_helpers.TodoUpvoteRemovedV1.build(
+                    todo_id='todo-1', index=2, removed_by='user-1',
+                ),
+            ),
+            id='not-upvoted',
+        ),
+    ),
+)
+def test_votes_are_unique_per_user(events):
+    _create_todo()
+    committer = DjangoCommitter()
+
+    *earlier, last = events
+    for event in earlier:
+        committer.handle(event)
+
+    with pytest.raises(unit_of_work.StaleState):
+        committer.handle(last)
+
+    assert models.TodoVote.objects.count() == len(earlier)
+
+
+def test_vote_inserted_concurrently_raises_StaleState():
+    _create_todo()
+    committer = DjangoCommitter()
+    committer.handle(
+        todo_helpers.TodoUpvotedV1(
+            todo_id='todo-1', index=2, upvoted_by='user-1',
+        ),
+    )
+
+    # the vote was inserted after this batch looked for existing votes
+    with mock.patch(
+        'vote_on_todos.django_back_end.unit_of_work._match_votes',
+        return_value=Q(pk__in=[]),
+    ):
+        with pytest.raises(unit_of_work.StaleState):
+            committer.handle(
+                todo_helpers.TodoUpvotedV1(
+                    todo_id='todo-1', index=3, upvoted_by='user-1',
+                ),
+            )
+
+    assert models.TodoVote.objects.count() == 1
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import pytest
+
+from vote_on_todos.todos.application import imports
+from vote_on_todos.todos.domain import todos
+
+
+def test_read_csv():
+    lines = [
+        'title,description\n',
+        'Paint the fence,Before it rains\n',
+        'Clean the gutters,\n',
+    ]
+
+    assert imports.read_todos(lines, 'csv') == [
+        todos.TodoDraft('Paint the fence', 'Before it rains'),
+        todos.TodoDraft('Clean the gutters'),
+    ]
+
+
+def test_read_csv_without_title_column():
+    with pytest.raises(imports.InvalidImport) as exc_info:
+        imports.read_todos(['name\n', 'Paint the fence\n'], 'csv')
+
+    assert str(exc_info.value) == 'line 1: the header has no title column'
+
+
+def test_read_invalid_csv():
+    lines = ['title\n', 'Paint the fence\n', 'x' * 200_000 + '\n']
+
+    with pytest.raises(imports.InvalidImport) as exc_info:
+        imports.read_todos(lines, 'csv')
+
+    assert exc_info.value.line == 3
+    assert exc_info.value.reason.startswith('field larger than field limit')
+
+
+def test_read_unknown_format():
+    with pytest.raises(ValueError, match='unknown format: xml'):
+        imports.read_todos(['<todos/>\n'], 'xml')
+
+
+def test_read_jsonl():
+    lines = [
+        '{"title": "Paint the fence", "description": "Before it rains"}\n',
+        '\n',
+        '{"title": "Clean the gutters"}\n',
+    ]
+
+    assert imports.read_todos(lines, 'jsonl') == [
+        todos.TodoDraft('Paint the fence', 'Before it rains'),
+        todos.TodoDraft('Clean the gutters'),
+    ]
+
+
+@pytest.mark.parametrize(
+    ('line', 'reason'),
+    (
+        ('{"title": "Paint', 'Unterminated string starting at'),
+        ('["Paint the fence"]', 'not a JSON object'),
+        ('{"title": " "}', 'the todo has no title'),
+        ('{"title": "Paint", "description": 1}', 'the description is not a string'),
+    ),
+)
+def test_read_invalid_jsonl(line, reason):
+    lines = ['{"title": "Clean the gutters"}\n', line]
+
+    with pytest.raises(imports.InvalidImport) as exc_info:
+        imports.read_todos(lines, 'jsonl')
+
+    assert exc_info.value.line == 2
+    assert exc_info.value.reason == reason
@@ -9,6 +9,7 @@ from testing import todos as todo_helpers
 from testing.lists import ListRepo
 from testing.unit_of_work import Committer
 from vote_on_todos.todos.application import todos
+from vote_on_todos.todos.application import unit_of_work
 from vote_on_todos.todos.domain import todos as domain
 
 
@@ -59,14 +60,58 @@ class TestNewList:
         assert committer.committed == []
 
 
+class TestImportTodos:
+    def test_import_todos(self):
+        committer = Committer()
+        use_case = todos.ImportTodos(
+            committer=committer,
+            lists=ListRepo({'list-1'}),
+            batch_size=2,
+        )
+
+        count = use_case.import_todos(
+            [domain.TodoDraft(title) for title in ('A', 'B', 'C')],
+            list_id='list-1',
+            created_by='user-1',
+            created_at=datetime.datetime(2023, 1, 2, 3, 4, 5),
+        )
+
+        assert count == 3
+        assert [
+            event.title
+            for event in committer.committed
+            if isinstance(event, domain.TodoCreatedV1)
+        ] == ['A', 'B', 'C']
+        assert len(committer.committed) == 3
+
+    def test_import_todos_on_nonexistent_list(self):
+        committer = Committer()
+        use_case = todos.ImportTodos(
+            committer=committer,
+            lists=ListRepo({'list-1'}),
+        )
+
+        with pytest.raises(todos.ListDoesNotExist):
+            use_case.import_todos(
+                [domain.TodoDraft('A')],
+                list_id='list-5',  # does not exist
+                created_by='user-1',
+                created_at=datetime.datetime(2023, 1, 2, 3, 4, 5),
+            )
+
+        assert committer.committed == []
+
+
 class TestUpvote:
     def test_upvote(self):
         committer = Committer()
+        repo = todo_helpers.TodoRepo({
+            'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=2),
+        })
         use_case = todos.Upvote(
             committer=committer,
-            todos=todo_helpers.TodoRepo({
-                'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=2),
-            }),
+            todos=repo,
+            votes=repo,
         )
 
         use_case.upvote(
@@ -83,13 +128,56 @@ class TestUpvote:
             ),
         ]
 
+    def test_upvote_retries_conflicts(self):
+        committer = Committer(conflicts=2)
+        retry = unit_of_work.RetryPolicy(max_attempts=3, sleep=lambda _: None)
+        repo = todo_helpers.TodoRepo({
+            'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=2),
+        })
+        use_case = todos.Upvote(
+            committer=committer,
+            todos=repo,
+            votes=repo,
+            retry=retry,
+        )
+
+        use_case.upvote(
+            todo_id='todo-1', user_id='some-user',
+            upvote_at=datetime.datetime(2023, 1, 2, 3, 4, 5),
+        )
+
+        assert len(committer.committed) == 1
+        assert retry.stats.retries == 2
+
+    def test_upvote_gives_up_on_conflicts(self):
+        committer = Committer(conflicts=2)
+        repo = todo_helpers.TodoRepo({
+            'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=2),
+        })
+        use_case = todos.Upvote(
+            committer=committer,
+            todos=repo,
+            votes=repo,
+            retry=unit_of_work.RetryPolicy(max_attempts=2, sleep=lambda _: None),
+        )
+
+        with pytest.raises(unit_of_work.StaleState):
+            use_case.upvote(
+                todo_id='todo-1', user_id='some-user',
+                upvote_at=datetime.datetime(2023, 1, 2, 3, 4, 5),
+            )
+
+        assert committer.committed == []
+
     def test_upvote_nonexistent_todo(self):
         committer = Committer()
+        repo = todo_helpers.TodoRepo({
+            'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=2),
+        })
         use_case = todos.Upvote(
             committer=committer,
-            todos=todo_helpers.TodoRepo({
-                'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=2),
-            }),
+            todos=repo,
+            votes=repo,
         )
 
         with pytest.raises(todos.TodoDoesNotExist):
@@ -102,13 +190,18 @@ class TestUpvote:
 
     def test_upvote_already_upvoted(self):
         committer = Committer()
-        use_case = todos.Upvote(
-            committer=committer,
-            todos=todo_helpers.TodoRepo({
+        repo = todo_helpers.TodoRepo(
+            {
                 'todo-1': todo_helpers.TodoItem(
-                    id='todo-1', next_index=2, upvotes={'some-user'},
+                    id='todo-1', next_index=2, vote_count=1,
                 ),
-            }),
+            },
+            votes={('todo-1', 'some-user')},
+        )
+        use_case = todos.Upvote(
+            committer=committer,
+            todos=repo,
+            votes=repo,
         )
 
         with pytest.raises(todos.AlreadyUpvoted):
@@ -121,13 +214,18 @@ class TestUpvote:
 
     def test_remove_upvote(self):
         committer = Committer()
-        use_case = todos.Upvote(
-            committer=committer,
-            todos=todo_helpers.TodoRepo({
+        repo = todo_helpers.TodoRepo(
+            {
                 'todo-1': todo_helpers.TodoItem(
-                    id='todo-1', next_index=2, upvotes={'some-user'},
+                    id='todo-1', next_index=2, vote_count=1,
                 ),
-            }),
+            },
+            votes={('todo-1', 'some-user')},
+        )
+        use_case = todos.Upvote(
+            committer=committer,
+            todos=repo,
+            votes=repo,
         )
 
         use_case.remove_upvote(
@@ -146,11 +244,13 @@ class TestUpvote:
 
     def test_remove_upvote_from_nonexistent_todo(self):
         committer = Committer()
+        repo = todo_helpers.TodoRepo({
+            'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=2),
+        })
         use_case = todos.Upvote(
             committer=committer,
-            todos=todo_helpers.TodoRepo({
-                'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=2),
-            }),
+            todos=repo,
+            votes=repo,
         )
 
         with pytest.raises(todos.TodoDoesNotExist):
@@ -163,13 +263,13 @@ class TestUpvote:
 
     def test_remove_upvote_from_todo_not_upvoted(self):
         committer = Committer()
+        repo = todo_helpers.TodoRepo({
+            'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=2),
+        })
         use_case = todos.Upvote(
             committer=committer,
-            todos=todo_helpers.TodoRepo({
-                'todo-1': todo_helpers.TodoItem(
-                    id='todo-1', next_index=2, upvotes={},
-                ),
-            }),
+            todos=repo,
+            votes=repo,
         )
 
         with pytest.raises(todos.NotUpvoted):
@@ -240,3 +340,113 @@ class TestComplete:
             )
 
         assert committer.committed == []
+
+
+class TestBatch:
+    def test_apply(self):
+        committer = Committer()
+        loaded = todo_helpers.TodoItem(id='todo-1', next_index=2, vote_count=1)
+        repo = mock.Mock(
+            wraps=todo_helpers.TodoRepo(
+                {'todo-1': loaded}, votes={('todo-1', 'other-user')},
+            ),
+        )
+        use_case = todos.Batch(committer=committer, todos=repo, votes=repo)
+        at = datetime.datetime(2023, 1, 2, 3, 4, 5)
+
+        outcomes = use_case.apply(
+            [
+                todos.Operation(todos.Action.UPVOTE, 'todo-1'),
+                todos.Operation(todos.Action.UPVOTE, 'todo-1'),
+                todos.Operation(todos.Action.REMOVE_UPVOTE, 'todo-1'),
+                todos.Operation(todos.Action.REMOVE_UPVOTE, 'todo-1'),
+                todos.Operation(todos.Action.COMPLETE, 'todo-1'),
+                todos.Operation(todos.Action.COMPLETE, 'todo-1'),
+                todos.Operation(todos.Action.UPVOTE, 'todo-2'),
+            ],
+            user_id='some-user',
+            at=at,
+        )
+
+        assert outcomes == [
+            todos.Outcome.OK,
+            todos.Outcome.ALREADY_UPVOTED,
+            todos.Outcome.OK,
+            todos.Outcome.NOT_UPVOTED,
+            todos.Outcome.OK,
+            todos.Outcome.ALREADY_DONE,
+            todos.Outcome.TODO_DOES_NOT_EXIST,
+        ]
+        assert committer.committed == [
+            domain.TodoUpvotedV1(
+                timestamp=at, index=2, todo_id='todo-1', upvoted_by='some-user',
+            ),
+            domain.TodoUpvoteRemovedV1(
+                timestamp=at, index=3, todo_id='todo-1', removed_by='some-user',
+            ),
+            domain.TodoDoneV1(
+                timestamp=at, index=4, todo_id='todo-1', recorded_by='some-user',
+            ),
+        ]
+        # each todo is loaded once, and the loaded item is left alone
+        assert repo.get_todo.call_count == 2
+        assert loaded.next_index == 2
+        assert loaded.vote_count == 1
+
+    def test_apply_checks_votes_against_the_votes(self):
+        committer = Committer()
+        # the todo repo still shows a vote that the votes say is gone
+        todo_repo = todo_helpers.TodoRepo(
+            {
+                'todo-1': todo_helpers.TodoItem(
+                    id='todo-1', next_index=2, vote_count=1,
+                ),
+            },
+            votes={('todo-1', 'some-user')},
+        )
+        vote_repo = mock.Mock(**{'has_voted.return_value': False})
+        use_case = todos.Batch(
+            committer=committer, todos=todo_repo, votes=vote_repo,
+        )
+
+        outcomes = use_case.apply(
+            [
+                todos.Operation(todos.Action.UPVOTE, 'todo-1'),
+                todos.Operation(todos.Action.REMOVE_UPVOTE, 'todo-1'),
+                todos.Operation(todos.Action.REMOVE_UPVOTE, 'todo-1'),
+            ],
+            user_id='some-user',
+            at=datetime.datetime(2023, 1, 2, 3, 4, 5),
+        )
+
+        assert outcomes == [
+            todos.Outcome.OK,
+            todos.Outcome.OK,
+            todos.Outcome.NOT_UPVOTED,
+        ]
+        vote_repo.has_voted.assert_called_once_with('todo-1', 'some-user')
+
+    def test_apply_retries_on_conflict(self):
+        committer = Committer(conflicts=1)
+        repo = todo_helpers.TodoRepo({
+            'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=2),
+        })
+        use_case = todos.Batch(
+            committer=committer,
+            todos=repo,
+            votes=repo,
+            retry=unit_of_work.RetryPolicy(max_attempts=2, sleep=lambda _: None),
+        )
+
+        # a generator, which the retry must not find used up
+        outcomes = use_case.apply(
+            (
+                todos.Operation(todos.Action(action), 'todo-1')
+                for action in ('upvote', 'complete')
+            ),
+            user_id='some-user',
+            at=datetime.datetime(2023, 1, 2, 3, 4, 5),
+        )
+
+        assert outcomes == [todos.Outcome.OK, todos.Outcome.OK]
+        assert len(committer.committed) == 2
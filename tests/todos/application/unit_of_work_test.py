@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+import pytest
+
+from vote_on_todos.todos.application import unit_of_work
+
+
+def _conflicting(conflicts: int) -> tuple[list[str], Callable[[], str]]:
+    calls: list[str] = []
+
+    def attempt() -> str:
+        calls.append('attempt')
+        if len(calls) <= conflicts:
+            raise unit_of_work.StaleState
+        return 'done'
+
+    return calls, attempt
+
+
+class TestRetryPolicy:
+    def test_success_is_not_retried(self):
+        sleeps: list[float] = []
+        policy = unit_of_work.RetryPolicy(max_attempts=3, sleep=sleeps.append)
+        calls, attempt = _conflicting(0)
+
+        assert policy.run(attempt) == 'done'
+
+        assert calls == ['attempt']
+        assert sleeps == []
+        assert policy.stats == unit_of_work.RetryStats()
+
+    def test_conflicts_are_retried(self):
+        sleeps: list[float] = []
+        policy = unit_of_work.RetryPolicy(
+            max_attempts=3, base_delay=0.01, max_delay=1,
+            sleep=sleeps.append, random=lambda: 0.5,
+        )
+        calls, attempt = _conflicting(2)
+
+        assert policy.run(attempt) == 'done'
+
+        assert len(calls) == 3
+        assert sleeps == [0.005, 0.01]
+        assert policy.stats == unit_of_work.RetryStats(conflicts=2, retries=2)
+
+    def test_attempts_are_bounded(self):
+        policy = unit_of_work.RetryPolicy(max_attempts=2, sleep=lambda _: None)
+        calls, attempt = _conflicting(5)
+
+        with pytest.raises(unit_of_work.StaleState):
+            policy.run(attempt)
+
+        assert len(calls) == 2
+        assert policy.stats == unit_of_work.RetryStats(
+            conflicts=2, retries=1, exhausted=1,
+        )
+
+    def test_scope_counts_its_own_conflicts(self):
+        policy = unit_of_work.RetryPolicy(max_attempts=2, sleep=lambda _: None)
+        policy.run(_conflicting(1)[1])
+
+        with unit_of_work.retry_scope() as stats:
+            policy.run(_conflicting(1)[1])
+            with pytest.raises(unit_of_work.StaleState):
+                policy.run(_conflicting(2)[1])
+
+        policy.run(_conflicting(1)[1])
+
+        assert stats == unit_of_work.RetryStats(
+            conflicts=3, retries=2, exhausted=1,
+        )
+        assert policy.stats == unit_of_work.RetryStats(
+            conflicts=5, retries=4, exhausted=1,
+        )
+
+    def test_delay_is_capped(self):
+        policy = unit_of_work.RetryPolicy(
+            base_delay=0.01, max_delay=0.05, random=lambda: 1.0,
+        )
+
+        assert [policy.delay(attempt) for attempt in range(1, 5)] == [
+            0.01, 0.02, 0.04, 0.05,
+        ]
@@ -48,13 +48,33 @@ class TestNewList:
                 created_at=datetime.datetime(2023, 1, 2, 3, 4, 5),
             )
 
+    def test_new_todos(self):
+        new_todo = todos.NewTodo(
+            lists=list_helpers.ListRepo({'list-1'}),
+        )
+
+        events = new_todo.create_new_todos(
+            [todos.TodoDraft('First'), todos.TodoDraft('Second', 'Later')],
+            list_id='list-1',
+            created_by='user-1',
+            created_at=datetime.datetime(2023, 1, 2, 3, 4, 5),
+        )
+
+        assert [(e.title, e.description, e.timestamp) for e in events] == [
+            ('First', '', datetime.datetime(2023, 1, 2, 3, 4, 5)),
+            ('Second', 'Later', datetime.datetime(2023, 1, 2, 3, 4, 5, 1)),
+        ]
+        assert len({e.todo_id for e in events}) == 2
+
 
 class TestVoting:
     def test_upvote_todo(self):
+        repo = todo_helpers.TodoRepo({
+            'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=2),
+        })
         voting = todos.Voting(
-            todos=todo_helpers.TodoRepo({
-                'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=2),
-            }),
+            todos=repo,
+            votes=repo,
         )
 
         event = voting.upvote(
@@ -70,10 +90,12 @@ class TestVoting:
         )
 
     def test_upvote_nonexistent_todo(self):
+        repo = todo_helpers.TodoRepo({
+            'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=2),
+        })
         voting = todos.Voting(
-            todos=todo_helpers.TodoRepo({
-                'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=2),
-            }),
+            todos=repo,
+            votes=repo,
         )
 
         with pytest.raises(todos.TodoDoesNotExist):
@@ -84,12 +106,17 @@ class TestVoting:
             )
 
     def test_upvote_todo_already_upvoted(self):
-        voting = todos.Voting(
-            todos=todo_helpers.TodoRepo({
+        repo = todo_helpers.TodoRepo(
+            {
                 'todo-1': todo_helpers.TodoItem(
-                    id='todo-1', next_index=3, upvotes={'someone'},
+                    id='todo-1', next_index=3, vote_count=1,
                 ),
-            }),
+            },
+            votes={('todo-1', 'someone')},
+        )
+        voting = todos.Voting(
+            todos=repo,
+            votes=repo,
         )
 
         with pytest.raises(todos.AlreadyUpvoted):
@@ -100,12 +127,17 @@ class TestVoting:
             )
 
     def test_remove_upvote(self):
-        voting = todos.Voting(
-            todos=todo_helpers.TodoRepo({
+        repo = todo_helpers.TodoRepo(
+            {
                 'todo-1': todo_helpers.TodoItem(
-                    id='todo-1', next_index=2, upvotes={'someone'},
+                    id='todo-1', next_index=2, vote_count=1,
                 ),
-            }),
+            },
+            votes={('todo-1', 'someone')},
+        )
+        voting = todos.Voting(
+            todos=repo,
+            votes=repo,
         )
 
         event = voting.remove_upvote(
@@ -121,10 +153,12 @@ class TestVoting:
         )
 
     def test_remove_upvote_from_nonexistent_todo(self):
+        repo = todo_helpers.TodoRepo({
+            'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=2),
+        })
         voting = todos.Voting(
-            todos=todo_helpers.TodoRepo({
-                'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=2),
-            }),
+            todos=repo,
+            votes=repo,
         )
 
         with pytest.raises(todos.TodoDoesNotExist):
@@ -135,12 +169,12 @@ class TestVoting:
             )
 
     def test_remove_upvote_from_todo_not_upvoted(self):
+        repo = todo_helpers.TodoRepo({
+            'todo-1': todo_helpers.TodoItem(id='todo-1', next_index=3),
+        })
         voting = todos.Voting(
-            todos=todo_helpers.TodoRepo({
-                'todo-1': todo_helpers.TodoItem(
-                    id='todo-1', next_index=3, upvotes={},
-                ),
-            }),
+            todos=repo,
+            votes=repo,
         )
 
         with pytest.raises(todos.NotUpvoted):
@@ -200,3 +234,16 @@ class TestCompletion:
                 user_id='someone',
                 record_at=datetime.datetime(2023, 1, 2, 3, 4, 5),
             )
+
+
+class TestGetItems:
+    def test_get_items_from_iterator(self):
+        events = iter([
+            todo_helpers.TodoCreatedV1(todo_id='todo-1', list_id='list-1', index=1),
+            todo_helpers.TodoUpvotedV1(todo_id='todo-1', index=2),
+        ])
+
+        items = todos.get_items(events)
+
+        assert items['todo-1'].next_index == 3
+        assert items['todo-1'].vote_count == 1
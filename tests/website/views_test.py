@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import logging
+
 import pytest
+import webtest
 from django.contrib.auth import models as auth_models
 from django_webtest import DjangoTestApp
 from django_webtest import DjangoWebtestResponse
 
+from vote_on_todos.django_back_end import models
 from vote_on_todos.django_back_end import queries
+from vote_on_todos.django_back_end.unit_of_work import DjangoCommitter
+from vote_on_todos.todos.application import unit_of_work
+from vote_on_todos.website import config
 
 pytestmark = pytest.mark.django_db(transaction=True)
 
@@ -78,6 +85,24 @@ def test_lists_none_found(django_app: DjangoTestApp):
     assert 'no lists: you should create one!' in response
 
 
+def test_lists_paginated(django_app: DjangoTestApp, settings):
+    settings.PAGE_SIZE = 1
+    _create_list(django_app, 'Second List', 'More things I need to do')
+    _create_list(django_app, 'First List', 'Things I need to do')
+
+    response = django_app.get('/lists/', user='some-user')
+
+    assert 'First List' in response
+    assert 'Second List' not in response
+
+    response = response.click('Next page')
+
+    assert 'First List' not in response
+    assert 'Second List' in response
+    assert 'Next page' not in response
+    assert 'First page' in response
+
+
 def test_create_new_list(django_app: DjangoTestApp):
     response = _create_list(django_app, 'My List', 'Things I need to do')
 
@@ -89,6 +114,38 @@ def test_create_new_list(django_app: DjangoTestApp):
     # TODO: assertions on the content of the response
 
 
+def test_new_list_before_it_is_projected(django_app: DjangoTestApp, settings):
+    settings.PROJECT_READ_MODELS_INLINE = False
+    _create_list(django_app, 'My List', 'Things I need to do')
+    list_id = models.ListStream.objects.get().list_id
+
+    response = django_app.get(f'/new-todo/{list_id}/', user='some-user')
+
+    assert response.status_code == 200
+    assert 'My List' in response
+
+    form = response.form
+    form['title'] = 'Important task'
+    response = form.submit()
+
+    assert response.status_code == 302
+
+
+@pytest.mark.parametrize('url', ('/lists/list-x/', '/new-todo/list-x/'))
+def test_nonexistent_list(django_app: DjangoTestApp, url):
+    django_app.get(url, user='some-user', status=404)
+
+
+def test_new_todo_on_nonexistent_list(django_app: DjangoTestApp):
+    _create_list(django_app, 'My List', 'Things I need to do')
+    list_id = queries.ListRepo().get_lists().pop().id
+    form = django_app.get(f'/new-todo/{list_id}/', user='some-user').form
+    form.action = '/new-todo/list-x/'
+    form['title'] = 'Important task'
+
+    form.submit(status=404)
+
+
 def test_view_list_no_todos(django_app: DjangoTestApp):
     response = _create_list(django_app, 'My List', 'Things I need to do')
 
@@ -122,6 +179,26 @@ def test_create_new_todo(django_app: DjangoTestApp):
     # TODO: assertions on the content of the response
 
 
+def test_view_list_paginated(django_app: DjangoTestApp, settings):
+    settings.PAGE_SIZE = 1
+    _create_list(django_app, 'My List', 'Things I need to do')
+    list_id = queries.ListRepo().get_lists().pop().id
+    _create_todo(django_app, list_id, 'Important task', 'This must be done soon!')
+    _create_todo(django_app, list_id, 'Less important task', 'This can wait')
+    first, second = queries.TodoRepo().get_incomplete(list_id)
+
+    response = django_app.get(f'/lists/{list_id}/', user='some-user')
+
+    assert f'upvote-{first.id}' in response.forms
+    assert f'upvote-{second.id}' not in response.forms
+
+    response = response.click('Next page')
+
+    assert f'upvote-{first.id}' not in response.forms
+    assert f'upvote-{second.id}' in response.forms
+    assert 'Next page' not in response
+
+
 def test_upvote_todo(django_app: DjangoTestApp):
     _create_list(django_app, 'My List', 'Things I need to do')
     list_id = queries.ListRepo().get_lists().pop().id
@@ -129,7 +206,7 @@ def test_upvote_todo(django_app: DjangoTestApp):
         django_app, list_id,
         'Important task', 'This must be done soon!',
     )
-    todo_id = queries.TodoRepo().get_list(list_id).pop().id
+    todo_id = queries.TodoRepo().get_incomplete(list_id).pop().id
 
     response = _upvote_todo(django_app, list_id, todo_id)
 
@@ -141,6 +218,254 @@ def test_upvote_todo(django_app: DjangoTestApp):
     # TODO: assertions on the content of the response
 
 
+def test_upvote_todo_with_group_commit(django_app: DjangoTestApp, settings):
+    settings.GROUP_COMMIT = True
+    settings.GROUP_COMMIT_WINDOW = 0
+    config.get_commit_group.cache_clear()
+    _create_list(django_app, 'My List', 'Things I need to do')
+    list_id = queries.ListRepo().get_lists().pop().id
+    _create_todo(
+        django_app, list_id,
+        'Important task', 'This must be done soon!',
+    )
+    todo_id = queries.TodoRepo().get_incomplete(list_id).pop().id
+
+    response = _upvote_todo(django_app, list_id, todo_id)
+
+    assert response.status_code == 302
+    assert models.TodoItem.objects.get().vote_count == 1
+    group = config.get_commit_group()
+    assert group.window == 0
+    # the new list, the new todo and the upvote
+    assert group.units == 3
+    config.get_commit_group.cache_clear()
+
+
+def test_conflicts_are_logged(
+        django_app: DjangoTestApp, monkeypatch, caplog,
+):
+    _create_list(django_app, 'My List', 'Things I need to do')
+    list_id = queries.ListRepo().get_lists().pop().id
+    _create_todo(
+        django_app, list_id,
+        'Important task', 'This must be done soon!',
+    )
+    todo_id = queries.TodoRepo().get_incomplete(list_id).pop().id
+    write = DjangoCommitter.write
+    conflicts = [unit_of_work.StaleState()]
+
+    def conflict_once(self, events):
+        if conflicts:
+            raise conflicts.pop()
+        write(self, events)
+
+    monkeypatch.setattr(DjangoCommitter, 'write', conflict_once)
+    caplog.set_level(logging.DEBUG, logger='vote_on_todos.website.middleware')
+
+    response = _upvote_todo(django_app, list_id, todo_id)
+
+    assert response.status_code == 302
+    assert (
+        f'conflicts in /todo/{todo_id}/upvote/: '
+        '1 in total, 1 retried, 0 given up'
+    ) in caplog.messages
+
+
+def test_my_activity(django_app: DjangoTestApp):
+    _create_list(django_app, 'My List', 'Things I need to do')
+    list_id = queries.ListRepo().get_lists().pop().id
+    _create_todo(
+        django_app, list_id,
+        'Important task', 'This must be done soon!',
+    )
+    todo_id = queries.TodoRepo().get_incomplete(list_id).pop().id
+    _upvote_todo(django_app, list_id, todo_id, user='other-user')
+
+    response = django_app.get('/activity/', user='other-user')
+
+    assert response.status_code == 200
+    assert 'upvoted' in response
+    assert 'created' not in response
+    assert 'Important task' in response
+
+
+def test_import_todos(django_app: DjangoTestApp):
+    _create_list(django_app, 'My List', 'Things I need to do')
+    list_id = queries.ListRepo().get_lists().pop().id
+    page = django_app.get(f'/import-todos/{list_id}/', user='some-user')
+    form = page.form
+    form['file'] = webtest.Upload(
+        'todos.csv', b'title,description\nFirst,\nSecond,Later\n',
+    )
+    form['file_format'] = 'csv'
+
+    response = form.submit()
+
+    assert response.status_code == 302
+    response = response.follow()
+    assert 'Imported 2 todos' in response
+    assert [
+        todo.title for todo in queries.TodoRepo().get_incomplete(list_id)
+    ] == ['First', 'Second']
+
+
+def test_import_invalid_todos(django_app: DjangoTestApp):
+    _create_list(django_app, 'My List', 'Things I need to do')
+    list_id = queries.ListRepo().get_lists().pop().id
+    page = django_app.get(f'/import-todos/{list_id}/', user='some-user')
+    form = page.form
+    form['file'] = webtest.Upload('todos.jsonl', b'{"title": ""}\n')
+    form['file_format'] = 'jsonl'
+
+    response = form.submit()
+
+    assert response.status_code == 200
+    assert 'line 1: the todo has no title' in response
+    assert queries.TodoRepo().get_incomplete(list_id) == []
+
+
+def test_import_todos_not_utf8(django_app: DjangoTestApp):
+    _create_list(django_app, 'My List', 'Things I need to do')
+    list_id = queries.ListRepo().get_lists().pop().id
+    form = django_app.get(f'/import-todos/{list_id}/', user='some-user').form
+    form['file'] = webtest.Upload('todos.csv', 'title\nCafé\n'.encode('latin-1'))
+    form['file_format'] = 'csv'
+
+    response = form.submit()
+
+    assert response.status_code == 200
+    assert 'The file is not UTF-8 text.' in response
+    assert queries.TodoRepo().get_incomplete(list_id) == []
+
+
+def test_import_todos_on_nonexistent_list(django_app: DjangoTestApp):
+    _create_list(django_app, 'My List', 'Things I need to do')
+    list_id = queries.ListRepo().get_lists().pop().id
+    form = django_app.get(f'/import-todos/{list_id}/', user='some-user').form
+    form.action = '/import-todos/list-x/'
+    form['file'] = webtest.Upload('todos.csv', b'title\nFirst\n')
+    form['file_format'] = 'csv'
+
+    form.submit(status=404)
+
+
+def test_search(django_app: DjangoTestApp):
+    _create_list(django_app, 'My List', 'Things I need to do')
+    list_id = queries.ListRepo().get_lists().pop().id
+    _create_todo(
+        django_app, list_id,
+        'Important task', 'This must be done soon!',
+    )
+    _create_todo(django_app, list_id, 'Other task', 'Whenever')
+
+    response = django_app.get('/search/', {'q': 'import'}, user='some-user')
+
+    assert response.status_code == 200
+    assert [a.text for a in response.html.select('tbody a')] == [
+        'Important task',
+    ]
+
+
+def test_todo_batch(django_app: DjangoTestApp):
+    _create_list(django_app, 'My List', 'Things I need to do')
+    list_id = queries.ListRepo().get_lists().pop().id
+    _create_todo(
+        django_app, list_id,
+        'Important task', 'This must be done soon!',
+    )
+    todo_id = queries.TodoRepo().get_incomplete(list_id).pop().id
+    django_app.get(f'/lists/{list_id}/', user='some-user')
+
+    response = django_app.post_json(
+        '/api/todos/batch/',
+        {
+            'operations': [
+                {'action': 'upvote', 'todo_id': todo_id},
+                {'action': 'upvote', 'todo_id': todo_id},
+                {'action': 'complete', 'todo_id': todo_id},
+                {'action': 'remove_upvote', 'todo_id': 'todo-x'},
+            ],
+        },
+        headers={'X-CSRFToken': django_app.cookies['csrftoken']},
+        user='some-user',
+    )
+
+    assert response.json == {
+        'results': [
+            {'action': 'upvote', 'todo_id': todo_id, 'outcome': 'ok'},
+            {'action': 'upvote', 'todo_id': todo_id, 'outcome': 'already_upvoted'},
+            {'action': 'complete', 'todo_id': todo_id, 'outcome': 'ok'},
+            {
+                'action': 'remove_upvote', 'todo_id': 'todo-x',
+                'outcome': 'todo_does_not_exist',
+            },
+        ],
+    }
+    todo = queries.TodoRepo().get_todo(todo_id)
+    assert todo is not None
+    assert todo.vote_count == 1
+    assert todo.done_at is not None
+
+
+@pytest.mark.parametrize(
+    'body',
+    (
+        [],
+        {'operations': [{'action': 'delete', 'todo_id': 'todo-1'}]},
+        {'operations': [{'action': 'upvote'}]},
+    ),
+)
+def test_todo_batch_invalid(django_app: DjangoTestApp, body):
+    django_app.get('/lists/', user='some-user')
+
+    response = django_app.post_json(
+        '/api/todos/batch/', body,
+        headers={'X-CSRFToken': django_app.cookies['csrftoken']},
+        user='some-user', status=400,
+    )
+
+    assert 'error' in response.json
+
+
+def test_todo_batch_not_json(django_app: DjangoTestApp):
+    django_app.get('/lists/', user='some-user')
+
+    response = django_app.post(
+        '/api/todos/batch/', '{"operations": [',
+        headers={'X-CSRFToken': django_app.cookies['csrftoken']},
+        content_type='application/json',
+        user='some-user', status=400,
+    )
+
+    assert response.json['error'].startswith('the body is not valid JSON')
+
+
+def test_todo_batch_too_many_operations(django_app: DjangoTestApp, settings):
+    settings.BATCH_MAX_OPERATIONS = 1
+    django_app.get('/lists/', user='some-user')
+    operation = {'action': 'upvote', 'todo_id': 'todo-1'}
+
+    response = django_app.post_json(
+        '/api/todos/batch/', {'operations': [operation, operation]},
+        headers={'X-CSRFToken': django_app.cookies['csrftoken']},
+        user='some-user', status=400,
+    )
+
+    assert response.json == {'error': 'at most 1 operations are allowed'}
+
+
+def test_todo_batch_not_logged_in(django_app: DjangoTestApp):
+    django_app.get('/accounts/login/')
+
+    response = django_app.post_json(
+        '/api/todos/batch/', {'operations': []},
+        headers={'X-CSRFToken': django_app.cookies['csrftoken']},
+        status=403,
+    )
+
+    assert 'CSRF' not in response
+
+
 def test_remove_upvote_todo(django_app: DjangoTestApp):
     _create_list(django_app, 'My List', 'Things I need to do')
     list_id = queries.ListRepo().get_lists().pop().id
@@ -148,7 +473,7 @@ def test_remove_upvote_todo(django_app: DjangoTestApp):
         django_app, list_id,
         'Important task', 'This must be done soon!',
     )
-    todo_id = queries.TodoRepo().get_list(list_id).pop().id
+    todo_id = queries.TodoRepo().get_incomplete(list_id).pop().id
     _upvote_todo(django_app, list_id, todo_id)
 
     response = _remove_upvote_from_todo(django_app, list_id, todo_id)
@@ -168,7 +493,7 @@ def test_mark_todo_done(django_app: DjangoTestApp):
         django_app, list_id,
         'Important task', 'This must be done soon!',
     )
-    todo_id = queries.TodoRepo().get_list(list_id).pop().id
+    todo_id = queries.TodoRepo().get_incomplete(list_id).pop().id
 
     response = _mark_todo_done(django_app, list_id, todo_id)
 
@@ -180,6 +505,58 @@ def test_mark_todo_done(django_app: DjangoTestApp):
     # TODO: assertions on the content of the response
 
 
+@pytest.mark.parametrize(
+    ('action', 'expected'),
+    (
+        ('upvote', 'id="remove-upvote-{todo_id}"'),
+        ('remove-upvote', 'id="upvote-{todo_id}"'),
+        ('complete', 'completed by some-user'),
+    ),
+)
+def test_todo_row_fragment(django_app: DjangoTestApp, action, expected):
+    _create_list(django_app, 'My List', 'Things I need to do')
+    list_id = queries.ListRepo().get_lists().pop().id
+    _create_todo(
+        django_app, list_id,
+        'Important task', 'This must be done soon!',
+    )
+    todo_id = queries.TodoRepo().get_incomplete(list_id).pop().id
+    if action == 'remove-upvote':
+        _upvote_todo(django_app, list_id, todo_id)
+    page = django_app.get(f'/lists/{list_id}/', user='some-user')
+
+    response = page.forms[f'{action}-{todo_id}'].submit(
+        headers={'X-Fragment': 'todo-row'},
+    )
+
+    assert response.status_code == 200
+    assert response.headers['X-Fragment'] == 'todo-row'
+    assert response.text.strip().startswith('<tr>')
+    assert 'Important task' in response
+    assert expected.format(todo_id=todo_id) in response
+
+
+def test_todo_row_fragment_error(django_app: DjangoTestApp):
+    _create_list(django_app, 'My List', 'Things I need to do')
+    list_id = queries.ListRepo().get_lists().pop().id
+    _create_todo(
+        django_app, list_id,
+        'Important task', 'This must be done soon!',
+    )
+    todo_id = queries.TodoRepo().get_incomplete(list_id).pop().id
+    page = django_app.get(f'/lists/{list_id}/', user='some-user')
+    form = page.forms[f'upvote-{todo_id}']
+    form.action = '/todo/todo-x/upvote/'
+
+    response = form.submit(headers={'X-Fragment': 'todo-row'})
+
+    # the script reloads the list rather than following the redirect, and the
+    # reloaded list shows the error
+    assert response.status_code == 302
+    page = django_app.get(f'/lists/{list_id}/', user='some-user')
+    assert 'exist anymore' in page
+
+
 # Auth
 # ====
 
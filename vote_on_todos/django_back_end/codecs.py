@@ -0,0 +1,150 @@
+"""Encoding and decoding of event payloads.
+
+Each event type has a codec with its own structure and unstructure functions,
+generated once when the registry is built. Decoding an event is then a single
+dict lookup and a call to a function specialised for that event class, rather
+than a dispatch through the generic converter.
+
+Fields that are stored in their own columns (the timestamp, the stream id and
+the stream index) are left out of the payloads, and are passed back in when
+decoding.
+
+If `orjson` is installed, it is used to parse and serialise the JSON.
+"""
+from __future__ import annotations
+
+import datetime
+import importlib
+import json
+from collections.abc import Callable
+from collections.abc import Collection
+from collections.abc import Mapping
+from typing import Any
+from typing import Generic
+from typing import TypeVar
+
+import attrs
+import cattrs.gen
+import cattrs.preconf.json
+
+E = TypeVar('E')
+
+
+@attrs.frozen
+class JSONBackend:
+    name: str
+    loads: Callable[[str], Any]
+    dumps: Callable[[Any], str]
+
+
+def _orjson_backend() -> JSONBackend | None:
+    try:
+        # imported by name, so that type checking does not need it installed
+        orjson = importlib.import_module('orjson')
+    except ImportError:  # pragma: no cover (optional dependency)
+        return None
+
+    return JSONBackend(
+        name='orjson',
+        loads=orjson.loads,
+        dumps=lambda obj: orjson.dumps(obj).decode(),
+    )
+
+
+STDLIB_JSON = JSONBackend(name='json', loads=json.loads, dumps=json.dumps)
+ORJSON = _orjson_backend()
+
+DEFAULT_BACKEND = ORJSON or STDLIB_JSON
+
+# The converter whose hooks (e.g. for datetimes) the codecs are generated with.
+_converter = cattrs.preconf.json.make_converter()
+
+
+def _structure_datetime(value: Any, _: type) -> datetime.datetime:
+    # column values are already datetimes
+    if isinstance(value, datetime.datetime):
+        return value
+    return datetime.datetime.fromisoformat(value)
+
+
+_converter.register_structure_hook(datetime.datetime, _structure_datetime)
+
+
+@attrs.frozen
+class Codec(Generic[E]):
+    event_class: type[E]
+    event_type: str
+    event_type_version: int
+
+    _structure: Callable[[Mapping[str, Any], type[E]], E]
+    _unstructure: Callable[[E], dict[str, Any]]
+    _backend: JSONBackend
+
+    @classmethod
+    def build(
+            cls,
+            event_class: type[E],
+            event_type: str,
+            event_type_version: int,
+            backend: JSONBackend,
+            columns: Collection[str] = (),
+    ) -> Codec[E]:
+        return cls(
+            event_class=event_class,
+            event_type=event_type,
+            event_type_version=event_type_version,
+            structure=cattrs.gen.make_dict_structure_fn(
+                event_class, _converter,
+                _cattrs_detailed_validation=False,
+            ),
+            unstructure=cattrs.gen.make_dict_unstructure_fn(
+                event_class, _converter,
+                **{
+                    name: cattrs.gen.override(omit=True)
+                    for name in columns
+                },
+            ),
+            backend=backend,
+        )
+
+    def encode(self, event: E) -> str:
+        return self._backend.dumps(self._unstructure(event))
+
+    def decode(self, payload: str, **columns: Any) -> E:
+        return self._structure(
+            self._backend.loads(payload) | columns, self.event_class,
+        )
+
+
+class Registry(Generic[E]):
+    """The codecs for a family of events.
+
+    Args:
+        event_types: The type name and version of each event class.
+        backend: The JSON implementation to use.
+        columns: The names of fields to leave out of the payloads.
+    """
+
+    def __init__(
+            self,
+            event_types: Mapping[type[E], tuple[str, int]],
+            backend: JSONBackend = DEFAULT_BACKEND,
+            *,
+            columns: Collection[str] = (),
+    ) -> None:
+        self._by_class: dict[type[E], Codec[E]] = {}
+        self._by_type: dict[tuple[str, int], Codec[E]] = {}
+        for event_class, (event_type, version) in event_types.items():
+            codec = Codec.build(
+                event_class, event_type, version, backend, columns,
+            )
+            self._by_class[event_class] = codec
+            self._by_type[(event_type, version)] = codec
+
+    def for_event(self, event: E) -> Codec[E]:
+        return self._by_class[type(event)]
+
+    def decode(
+            self, event_type: str, version: int, payload: str, **columns: Any,
+    ) -> E:
+        return self._by_type[(event_type, version)].decode(payload, **columns)
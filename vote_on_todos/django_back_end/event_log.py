@@ -0,0 +1,80 @@
+"""A single, totally ordered log of all list and todo events.
+
+Every event is given a position when it is committed. Positions are unique
+and increase in commit order, so a consumer that remembers the last position
+it has seen can always catch up by reading the events after it.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+from collections.abc import Iterator
+
+import attrs
+from django.db.models import F
+
+from . import models
+from vote_on_todos.todos.domain import lists
+from vote_on_todos.todos.domain import todos
+
+
+@attrs.frozen
+class LoggedEvent:
+    position: int
+    event: lists.Event | todos.Event
+
+
+def claim_positions(count: int) -> range:
+    """Claim the next `count` positions in the log.
+
+    This must be called in the same transaction that stores the events, so
+    that positions are claimed in commit order.
+    """
+    claimed = models.EventLogHead.objects.filter(pk=1).update(
+        position=F('position') + count,
+    )
+    if claimed:
+        end = models.EventLogHead.objects.get(pk=1).position
+    else:
+        models.EventLogHead.objects.create(pk=1, position=count)
+        end = count
+
+    return range(end - count + 1, end + 1)
+
+
+def head_position() -> int:
+    """Get the position of the latest event in the log (0 if it is empty)."""
+    head = models.EventLogHead.objects.filter(pk=1).first()
+    return head.position if head is not None else 0
+
+
+def read_after(
+        position: int, *, batch_size: int = models.CHUNK_SIZE,
+) -> list[LoggedEvent]:
+    """Read the next batch of events after `position`, in log order."""
+    list_events = (
+        LoggedEvent(position=seq.event.position, event=seq.to_domain())
+        for seq in models.ListEventSequence.objects.filter(
+            event__position__gt=position,
+        ).select_related('event').order_by('event__position')[:batch_size]
+    )
+    todo_events = (
+        LoggedEvent(position=seq.event.position, event=seq.to_domain())
+        for seq in models.TodoEventSequence.objects.filter(
+            event__position__gt=position,
+        ).select_related('event').order_by('event__position')[:batch_size]
+    )
+
+    merged = heapq.merge(
+        list_events, todo_events, key=lambda logged: logged.position,
+    )
+    return list(itertools.islice(merged, batch_size))
+
+
+def iter_batches_after(
+        position: int, *, batch_size: int = models.CHUNK_SIZE,
+) -> Iterator[list[LoggedEvent]]:
+    """Read all the events after `position`, one batch at a time."""
+    while batch := read_after(position, batch_size=batch_size):
+        yield batch
+        position = batch[-1].position
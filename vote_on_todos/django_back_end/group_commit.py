@@ -0,0 +1,148 @@
+"""Group commit: write the units of work of concurrent requests together.
+
+SQLite serialises writers, so when many requests vote at once each of them
+waits for the others' transactions (and fsyncs) in turn. With group commit,
+a request that wants to commit joins a queue instead. The first request to
+join waits for a short window so that others can join it, then commits up to
+`max_size` of the queue in one transaction, and hands over to the next request
+in the queue to lead the next group. Each unit of work is written in its own
+savepoint, so a unit that raises StaleState is rolled back and reported to its
+own caller without affecting the rest of the group.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import attrs
+from django.db import transaction
+
+from .unit_of_work import DjangoCommitter
+from vote_on_todos.todos.application import unit_of_work
+from vote_on_todos.todos.domain import lists
+from vote_on_todos.todos.domain import todos
+
+
+@attrs.define
+class _Unit:
+    committer: DjangoCommitter
+    events: list[lists.Event | todos.Event]
+    # set when the unit has been committed, or has been made the leader
+    woken: threading.Event = attrs.field(factory=threading.Event)
+    done: bool = False
+    error: Exception | None = None
+
+
+@attrs.define
+class CommitGroup:
+    """A queue of units of work that are committed together."""
+    window: float = 0.002
+    """Seconds to wait for other units of work before committing."""
+    max_size: int = 100
+
+    flushes: int = attrs.field(init=False, default=0)
+    """The number of transactions committed."""
+    units: int = attrs.field(init=False, default=0)
+    """The number of units of work committed in them."""
+
+    _lock: threading.Lock = attrs.field(
+        init=False, factory=threading.Lock, repr=False,
+    )
+    _queue: list[_Unit] = attrs.field(init=False, factory=list, repr=False)
+    _flushing: bool = attrs.field(init=False, default=False, repr=False)
+
+    def commit(
+            self,
+            committer: DjangoCommitter,
+            events: list[lists.Event | todos.Event],
+    ) -> None:
+        """Commit some events as part of the next group.
+
+        Raises:
+            StaleState: The state has changed and committing is no longer safe.
+        """
+        unit = _Unit(committer=committer, events=events)
+        with self._lock:
+            self._queue.append(unit)
+            lead = not self._flushing
+            self._flushing = True
+
+        if lead:
+            time.sleep(self.window)
+        else:
+            unit.woken.wait()
+        if not unit.done:
+            # this unit leads the next group, which it is at the head of
+            self._flush_next()
+
+        if unit.error is not None:
+            raise unit.error
+
+    def _flush_next(self) -> None:
+        with self._lock:
+            group = self._queue[:self.max_size]
+            del self._queue[:self.max_size]
+
+        self._flush(group)
+
+        # hand over to the unit at the head of the queue, so that no caller
+        # waits on more than one group
+        with self._lock:
+            if self._queue:
+                self._queue[0].woken.set()
+            else:
+                self._flushing = False
+
+    def _flush(self, group: list[_Unit]) -> None:
+        try:
+            with transaction.atomic():
+                for unit in group:
+                    try:
+                        unit.committer.write(unit.events)
+                    except unit_of_work.StaleState as e:
+                        unit.error = e
+        except Exception as e:
+            for unit in group:
+                unit.error = unit.error or e
+        else:
+            self.flushes += 1
+            self.units += len(group)
+        finally:
+            for unit in group:
+                unit.done = True
+                unit.woken.set()
+
+
+@attrs.define
+class GroupCommitter:
+    """A committer that commits through a shared `CommitGroup`.
+
+    Events handled inside `atomic()` are buffered and only written, together
+    with those of other requests, when the block exits. So StaleState is
+    raised when leaving `atomic()` rather than from `handle()`.
+    """
+    group: CommitGroup
+    committer: DjangoCommitter = attrs.field(factory=DjangoCommitter)
+
+    _pending: list[lists.Event | todos.Event] | None = attrs.field(
+        init=False, default=None,
+    )
+
+    @contextmanager
+    def atomic(self) -> Iterator[None]:
+        self._pending = []
+        try:
+            yield
+            events = self._pending
+        finally:
+            self._pending = None
+
+        if events:
+            self.group.commit(self.committer, events)
+
+    def handle(self, event: lists.Event | todos.Event) -> None:
+        if self._pending is None:
+            raise RuntimeError('events must be handled inside atomic()')
+        self._pending.append(event)
@@ -0,0 +1,75 @@
+"""A request-scoped identity map for repository reads.
+
+A single request can ask for the same todo item several times: once in the
+view, again in the domain services and once more to decide where to redirect.
+Repositories sharing an identity map only load each todo item once from each
+source, until an event for that todo is handled.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import attrs
+
+from vote_on_todos.todos.domain import todos
+
+
+@attrs.define
+class IdentityMap:
+    """Todo items loaded in the current scope, kept apart by source.
+
+    The read models can lag behind the event streams, so an item loaded from
+    one source is never handed out for another.
+    """
+    _todos: dict[str, dict[str, todos.TodoItem | None]] = attrs.field(
+        init=False, factory=dict,
+    )
+
+    hits: int = attrs.field(init=False, default=0)
+    """The number of loads saved by the identity map."""
+    misses: int = attrs.field(init=False, default=0)
+
+    def get_todo(
+            self,
+            source: str,
+            todo_id: str,
+            load: Callable[[str], todos.TodoItem | None],
+    ) -> todos.TodoItem | None:
+        loaded = self._todos.setdefault(source, {})
+        try:
+            todo = loaded[todo_id]
+        except KeyError:
+            self.misses += 1
+            todo = loaded[todo_id] = load(todo_id)
+        else:
+            self.hits += 1
+
+        return todo
+
+    def discard_todo(self, todo_id: str) -> None:
+        for loaded in self._todos.values():
+            loaded.pop(todo_id, None)
+
+
+_current: ContextVar[IdentityMap | None] = ContextVar(
+    'identity_map', default=None,
+)
+
+
+def current() -> IdentityMap | None:
+    """Get the identity map for the current scope, if there is one."""
+    return _current.get()
+
+
+@contextmanager
+def scope() -> Iterator[IdentityMap]:
+    """Share a new identity map for the duration of this context."""
+    identity_map = IdentityMap()
+    token = _current.set(identity_map)
+    try:
+        yield identity_map
+    finally:
+        _current.reset(token)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import datetime
+import time
+from collections.abc import Callable
+from typing import Any
+
+import cattrs.preconf.json
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandParser
+
+from vote_on_todos.django_back_end import codecs
+from vote_on_todos.django_back_end import models
+from vote_on_todos.todos.domain import todos
+
+
+def _sample_events(n: int) -> list[todos.Event]:
+    timestamp = datetime.datetime(2023, 1, 2, 3, 4, 5, tzinfo=datetime.UTC)
+    events: list[todos.Event] = []
+    for i in range(n):
+        if i % 10 == 0:
+            events.append(
+                todos.TodoCreatedV1(
+                    timestamp=timestamp, todo_id=f'todo-{i}', index=1,
+                    list_id='list-1', title='Something I must do',
+                    description='A very important thing', created_by='me',
+                ),
+            )
+        else:
+            events.append(
+                todos.TodoUpvotedV1(
+                    timestamp=timestamp, todo_id=f'todo-{i - i % 10}',
+                    index=i % 10 + 1, upvoted_by=f'user-{i}',
+                ),
+            )
+    return events
+
+
+class Command(BaseCommand):
+    help = 'Compare the throughput of decoding todo events with each codec.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--events', type=int, default=100_000,
+            help='The number of events to decode with each codec.',
+        )
+
+    def _report(
+            self, name: str, rows: list[tuple[str, int, str]],
+            decode: Callable[[str, int, str], Any],
+    ) -> None:
+        start = time.perf_counter()
+        for event_type, version, payload in rows:
+            decode(event_type, version, payload)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(f'{name:>20}: {len(rows) / elapsed:12,.0f} events/s')
+
+    def handle(self, *args: Any, events: int, **options: Any) -> None:
+        converter = cattrs.preconf.json.make_converter()
+        rows = [
+            (*models.TODO_EVENT_TYPES[type(event)], converter.dumps(event))
+            for event in _sample_events(events)
+        ]
+
+        # this is how events were decoded before there were codecs
+        def decode_with_converter(
+                event_type: str, version: int, payload: str,
+        ) -> todos.Event:
+            event_class = {
+                v: k for k, v in models.TODO_EVENT_TYPES.items()
+            }[(event_type, version)]
+            return converter.loads(payload, event_class)
+
+        self._report('payload_converter', rows, decode_with_converter)
+
+        for backend in (codecs.STDLIB_JSON, codecs.ORJSON):
+            if backend is None:  # pragma: no cover (optional dependency)
+                continue
+            registry = codecs.Registry(models.TODO_EVENT_TYPES, backend)
+            self._report(f'codecs ({backend.name})', rows, registry.decode)
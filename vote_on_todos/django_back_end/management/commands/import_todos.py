@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import datetime
+import os
+import time
+from typing import Any
+
+import attrs
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.core.management.base import CommandParser
+
+from vote_on_todos.todos.application import imports
+from vote_on_todos.todos.application import todos
+from vote_on_todos.website import config
+
+
+class Command(BaseCommand):
+    help = 'Create the todos in a CSV or JSON Lines file in a todo list.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('list_id', help='The list to add the todos to.')
+        parser.add_argument('path', help='The file to import.')
+        parser.add_argument(
+            '--format', choices=imports.FORMATS,
+            help='The format of the file (default: from its extension).',
+        )
+        parser.add_argument(
+            '--created-by', required=True,
+            help='The user to record as the creator of the todos.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=attrs.fields(todos.ImportTodos).batch_size.default,
+            help='The number of todos to commit in each transaction.',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        file_format = options['format'] or os.path.splitext(
+            options['path'],
+        )[1].removeprefix('.')
+        if file_format not in imports.FORMATS:
+            raise CommandError(
+                f'cannot tell the format of {options["path"]}: use --format',
+            )
+
+        try:
+            with open(options['path'], newline='', encoding='utf-8') as f:
+                drafts = imports.read_todos(f, file_format)
+        except OSError as e:
+            raise CommandError(str(e)) from e
+        except imports.InvalidImport as e:
+            raise CommandError(f'{options["path"]}: {e}') from e
+
+        application = attrs.evolve(
+            config.get_import_todos_service(),
+            batch_size=options['batch_size'],
+        )
+        start = time.perf_counter()
+        try:
+            count = application.import_todos(
+                drafts,
+                list_id=options['list_id'],
+                created_by=options['created_by'],
+                created_at=datetime.datetime.now(datetime.UTC),
+            )
+        except todos.ListDoesNotExist as e:
+            raise CommandError(
+                f'there is no list {options["list_id"]}',
+            ) from e
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f'imported {count} todos in {elapsed:.2f}s '
+            f'({count / elapsed:,.0f} todos/s)',
+        )
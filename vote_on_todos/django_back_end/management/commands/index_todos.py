@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.core.management.base import CommandParser
+from django.db import transaction
+
+from vote_on_todos.django_back_end import event_log
+from vote_on_todos.django_back_end import models
+from vote_on_todos.django_back_end import projections
+
+
+class Command(BaseCommand):
+    help = 'Add every todo in the event log to the search index.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--batch-size', type=int, default=models.CHUNK_SIZE,
+            help='The number of events to index in each transaction.',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        before = models.TodoSearchDocument.objects.count()
+        start = time.perf_counter()
+        events = 0
+        for batch in event_log.iter_batches_after(
+            0, batch_size=options['batch_size'],
+        ):
+            with transaction.atomic():
+                projections.project_todo_search(
+                    [logged.event for logged in batch],
+                )
+            events += len(batch)
+
+        elapsed = time.perf_counter() - start
+        indexed = models.TodoSearchDocument.objects.count() - before
+        self.stdout.write(
+            f'indexed {indexed} todos from {events} events '
+            f'({events / elapsed:,.0f} events/s)',
+        )
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.core.management.base import CommandParser
+
+from vote_on_todos.django_back_end import models
+from vote_on_todos.django_back_end import projections
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Keep the read models up to date by tailing the event log.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--projection', action='append', dest='projections',
+            choices=[projection.name for projection in projections.PROJECTIONS],
+            help='A projection to run (default: all of them).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=models.CHUNK_SIZE,
+            help='The number of events to apply in each transaction.',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Seconds to wait for new events once caught up.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once every projection has caught up.',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        to_run = [
+            projections.get_projection(name)
+            for name in options['projections'] or [
+                projection.name for projection in projections.PROJECTIONS
+            ]
+        ]
+
+        try:
+            while True:
+                for projection in to_run:
+                    self._catch_up(projection, options['batch_size'])
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+
+    def _catch_up(
+            self, projection: projections.Projection, batch_size: int,
+    ) -> None:
+        applied = 0
+        start = time.perf_counter()
+        while count := projections.catch_up(projection, batch_size=batch_size):
+            applied += count
+
+        lag = projections.lag(projection)
+        logger.info(
+            'projection %s lag=%d applied=%d',
+            projection.name, lag, applied,
+        )
+        if applied:
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'{projection.name}: applied {applied} events '
+                f'({applied / elapsed:,.0f}/s), lag {lag}',
+            )
@@ -0,0 +1,80 @@
+# Generated by Django 4.2.11 on 2026-10-18 07:07
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from django.db import migrations
+from django.db import models
+
+
+def populate_todo_items(apps: Any, schema_editor: Any) -> None:
+    TodoEventSequence = apps.get_model('django_back_end', 'TodoEventSequence')
+    TodoItem = apps.get_model('django_back_end', 'TodoItem')
+
+    items: dict[str, Any] = {}
+    upvotes: dict[str, set[str]] = {}
+    qs = TodoEventSequence.objects.select_related('event').order_by(
+        'todo_id', 'index',
+    )
+    for seq in qs.iterator():
+        payload = json.loads(seq.event.payload)
+        event_type = seq.event.event_type
+        if event_type == 'TodoCreated':
+            item = items[seq.todo_id] = TodoItem(
+                todo_id=seq.todo_id,
+                list_id=payload['list_id'],
+                title=payload['title'],
+                description=payload['description'],
+                creator=payload['created_by'],
+                created_at=seq.event.timestamp,
+            )
+            upvotes[seq.todo_id] = set()
+        else:
+            item = items[seq.todo_id]
+            if event_type == 'TodoUpvoted':
+                upvotes[seq.todo_id].add(payload['upvoted_by'])
+            elif event_type == 'TodoUpvoteRemoved':
+                upvotes[seq.todo_id].discard(payload['removed_by'])
+            else:
+                item.done_at = seq.event.timestamp
+                item.completor = payload['recorded_by']
+        item.next_index = seq.index + 1
+
+    for todo_id, item in items.items():
+        item.upvotes = sorted(upvotes[todo_id])
+        item.vote_count = len(upvotes[todo_id])
+    TodoItem.objects.bulk_create(items.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_back_end', '0002_ensure_index_always_increases'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TodoItem',
+            fields=[
+                (
+                    'todo_id', models.CharField(
+                        max_length=100, primary_key=True, serialize=False,
+                    ),
+                ),
+                ('next_index', models.PositiveIntegerField()),
+                ('list_id', models.CharField(db_index=True, max_length=100)),
+                ('title', models.TextField()),
+                ('description', models.TextField()),
+                ('creator', models.CharField(max_length=150)),
+                ('created_at', models.DateTimeField()),
+                ('done_at', models.DateTimeField(null=True)),
+                ('completor', models.CharField(max_length=150, null=True)),
+                ('upvotes', models.JSONField(default=list)),
+                ('vote_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(
+            populate_todo_items, reverse_code=migrations.RunPython.noop,
+        ),
+    ]
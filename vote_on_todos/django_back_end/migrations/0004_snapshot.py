@@ -0,0 +1,43 @@
+# Generated by Django 4.2.11 on 2026-10-18 07:09
+from __future__ import annotations
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_back_end', '0003_todoitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Snapshot',
+            fields=[
+                (
+                    'id', models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True, serialize=False, verbose_name='ID',
+                    ),
+                ),
+                (
+                    'stream_type', models.CharField(
+                        choices=[('list', 'List'), ('todo', 'Todo')],
+                        max_length=10,
+                    ),
+                ),
+                ('stream_id', models.CharField(max_length=100)),
+                ('index', models.PositiveIntegerField()),
+                ('version', models.PositiveIntegerField()),
+                ('state', models.TextField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='snapshot',
+            constraint=models.UniqueConstraint(
+                fields=('stream_type', 'stream_id', 'version', 'index'),
+                name='unique_snapshot_per_stream_index',
+            ),
+        ),
+    ]
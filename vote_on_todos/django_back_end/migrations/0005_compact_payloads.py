@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from django.db import migrations
+
+_BATCH_SIZE = 1000
+
+
+def _rewrite_payloads(model: Any, rewrite: Any) -> None:
+    last_id = 0
+    while True:
+        batch = list(
+            model.objects.filter(id__gt=last_id).order_by('id')[:_BATCH_SIZE],
+        )
+        if not batch:
+            break
+
+        for row in batch:
+            row.payload = json.dumps(rewrite(row, json.loads(row.payload)))
+        model.objects.bulk_update(batch, ['payload'])
+
+        last_id = batch[-1].id
+
+
+def _compact(stream_field: str) -> Any:
+    def rewrite(row: Any, payload: dict[str, Any]) -> dict[str, Any]:
+        for key in ('timestamp', stream_field, 'index'):
+            payload.pop(key, None)
+        return payload
+
+    return rewrite
+
+
+def _expand(stream_field: str, sequence_model: Any) -> Any:
+    def rewrite(row: Any, payload: dict[str, Any]) -> dict[str, Any]:
+        sequence = sequence_model.objects.get(event_id=row.id)
+        return {
+            'timestamp': row.timestamp.isoformat(),
+            stream_field: getattr(row, stream_field),
+            'index': sequence.index,
+        } | payload
+
+    return rewrite
+
+
+def compact_payloads(apps: Any, schema_editor: Any) -> None:
+    _rewrite_payloads(
+        apps.get_model('django_back_end', 'ListEvent'), _compact('list_id'),
+    )
+    _rewrite_payloads(
+        apps.get_model('django_back_end', 'TodoEvent'), _compact('todo_id'),
+    )
+
+
+def expand_payloads(apps: Any, schema_editor: Any) -> None:
+    _rewrite_payloads(
+        apps.get_model('django_back_end', 'ListEvent'),
+        _expand(
+            'list_id', apps.get_model('django_back_end', 'ListEventSequence'),
+        ),
+    )
+    _rewrite_payloads(
+        apps.get_model('django_back_end', 'TodoEvent'),
+        _expand(
+            'todo_id', apps.get_model('django_back_end', 'TodoEventSequence'),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('django_back_end', '0004_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(compact_payloads, reverse_code=expand_payloads),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.11 on 2026-10-18 07:15
+from __future__ import annotations
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_back_end', '0005_compact_payloads'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='todoitem',
+            index=models.Index(
+                condition=models.Q(('done_at__isnull', True)),
+                fields=['list_id', '-vote_count', 'created_at', 'todo_id'],
+                name='todoitem_incomplete_rank',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='todoitem',
+            index=models.Index(
+                condition=models.Q(('done_at__isnull', False)),
+                fields=['list_id', 'done_at', 'created_at', 'todo_id'],
+                name='todoitem_completed_rank',
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.11 on 2026-10-18 07:17
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from django.db import migrations
+from django.db import models
+
+
+def populate_todo_lists(apps: Any, schema_editor: Any) -> None:
+    ListEventSequence = apps.get_model('django_back_end', 'ListEventSequence')
+    TodoList = apps.get_model('django_back_end', 'TodoList')
+
+    todo_lists = {}
+    qs = ListEventSequence.objects.select_related('event').filter(
+        event__event_type='ListCreated', event__event_type_version=1,
+    )
+    for seq in qs.order_by('event__timestamp').iterator():
+        payload = json.loads(seq.event.payload)
+        todo_lists[seq.list_id] = TodoList(
+            list_id=seq.list_id,
+            name=payload['name'],
+            description=payload['description'],
+            creator=payload['created_by'],
+        )
+
+    TodoList.objects.bulk_create(todo_lists.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_back_end', '0006_todoitem_rank_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TodoList',
+            fields=[
+                (
+                    'list_id', models.CharField(
+                        max_length=100, primary_key=True, serialize=False,
+                    ),
+                ),
+                ('name', models.TextField()),
+                ('description', models.TextField()),
+                ('creator', models.CharField(max_length=150)),
+            ],
+            options={
+                'indexes': [
+                    models.Index(
+                        fields=['name', 'list_id'], name='todolist_name_order',
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(
+            populate_todo_lists, reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.11 on 2026-10-18 07:19
+from __future__ import annotations
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_back_end', '0007_todolist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListStream',
+            fields=[
+                (
+                    'list_id', models.CharField(
+                        max_length=100, primary_key=True, serialize=False,
+                    ),
+                ),
+                ('version', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TodoStream',
+            fields=[
+                (
+                    'todo_id', models.CharField(
+                        max_length=100, primary_key=True, serialize=False,
+                    ),
+                ),
+                ('version', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.RunSQL(
+            sql="""\
+INSERT INTO django_back_end_liststream (list_id, version)
+SELECT list_id, MAX("index") FROM django_back_end_listeventsequence
+GROUP BY list_id;
+""",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            sql="""\
+INSERT INTO django_back_end_todostream (todo_id, version)
+SELECT todo_id, MAX("index") FROM django_back_end_todoeventsequence
+GROUP BY todo_id;
+""",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        # the stream heads now ensure that indexes always increase
+        migrations.RunSQL(
+            sql='DROP TRIGGER ensure_listevent_index_always_increases;',
+            reverse_sql="""\
+CREATE TRIGGER ensure_listevent_index_always_increases
+BEFORE INSERT ON django_back_end_listeventsequence
+BEGIN
+    SELECT
+    CASE WHEN NEW."index" <= (
+        SELECT MAX("index") FROM django_back_end_listeventsequence
+        WHERE "list_id"=NEW."list_id"
+    ) THEN RAISE (ABORT,'index must be greater than all previous indexes')
+    END;
+END;
+""",
+        ),
+        migrations.RunSQL(
+            sql='DROP TRIGGER ensure_todoevent_index_always_increases;',
+            reverse_sql="""\
+CREATE TRIGGER ensure_todoevent_index_always_increases
+BEFORE INSERT ON django_back_end_todoeventsequence
+BEGIN
+    SELECT
+    CASE WHEN NEW."index" <= (
+        SELECT MAX("index")FROM django_back_end_todoeventsequence
+        WHERE "todo_id"=NEW."todo_id"
+    ) THEN RAISE (ABORT,'index must be greater than all previous indexes')
+    END;
+END;
+""",
+        ),
+    ]
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import heapq
+from typing import Any
+
+from django.db import migrations
+from django.db import models
+
+_BATCH_SIZE = 1000
+
+
+def assign_positions(apps: Any, schema_editor: Any) -> None:
+    ListEvent = apps.get_model('django_back_end', 'ListEvent')
+    TodoEvent = apps.get_model('django_back_end', 'TodoEvent')
+    EventLogHead = apps.get_model('django_back_end', 'EventLogHead')
+
+    # existing events are logged in the order they happened
+    events = heapq.merge(
+        (
+            (timestamp, pk, ListEvent)
+            for pk, timestamp in ListEvent.objects.order_by(
+                'timestamp', 'id',
+            ).values_list('id', 'timestamp')
+        ),
+        (
+            (timestamp, pk, TodoEvent)
+            for pk, timestamp in TodoEvent.objects.order_by(
+                'timestamp', 'id',
+            ).values_list('id', 'timestamp')
+        ),
+        key=lambda event: (event[0], event[1]),
+    )
+
+    updates: dict[Any, list[Any]] = {ListEvent: [], TodoEvent: []}
+    position = 0
+    for position, (_, pk, model) in enumerate(events, start=1):
+        updates[model].append(model(id=pk, position=position))
+
+    for model, objs in updates.items():
+        model.objects.bulk_update(objs, ['position'], batch_size=_BATCH_SIZE)
+
+    if position:
+        EventLogHead.objects.create(pk=1, position=position)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_back_end', '0008_stream_heads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventLogHead',
+            fields=[
+                (
+                    'id', models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True, serialize=False, verbose_name='ID',
+                    ),
+                ),
+                ('position', models.PositiveBigIntegerField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='listevent',
+            name='position',
+            field=models.PositiveBigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='todoevent',
+            name='position',
+            field=models.PositiveBigIntegerField(null=True),
+        ),
+        migrations.RunPython(
+            assign_positions, reverse_code=migrations.RunPython.noop,
+        ),
+        migrations.AlterField(
+            model_name='listevent',
+            name='position',
+            field=models.PositiveBigIntegerField(unique=True),
+        ),
+        migrations.AlterField(
+            model_name='todoevent',
+            name='position',
+            field=models.PositiveBigIntegerField(unique=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.11 on 2026-10-18 07:31
+from __future__ import annotations
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_back_end', '0009_event_log_position'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectionCheckpoint',
+            fields=[
+                (
+                    'name', models.CharField(
+                        max_length=100, primary_key=True, serialize=False,
+                    ),
+                ),
+                ('position', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from django.db import migrations
+from django.db import models
+
+_BATCH_SIZE = 1000
+
+
+def populate_votes(apps: Any, schema_editor: Any) -> None:
+    TodoEventSequence = apps.get_model('django_back_end', 'TodoEventSequence')
+    TodoVote = apps.get_model('django_back_end', 'TodoVote')
+
+    votes: set[tuple[str, str]] = set()
+    for seq in TodoEventSequence.objects.filter(
+        event__event_type__in=['TodoUpvoted', 'TodoUpvoteRemoved'],
+    ).select_related('event').order_by('todo_id', 'index').iterator():
+        payload = json.loads(seq.event.payload)
+        if seq.event.event_type == 'TodoUpvoted':
+            votes.add((seq.todo_id, payload['upvoted_by']))
+        else:
+            votes.discard((seq.todo_id, payload['removed_by']))
+
+    TodoVote.objects.bulk_create(
+        (
+            TodoVote(todo_id=todo_id, user_id=user_id)
+            for todo_id, user_id in votes
+        ),
+        batch_size=_BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_back_end', '0010_projection_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='todostream',
+            name='barrier',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='TodoVote',
+            fields=[
+                (
+                    'id', models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True, serialize=False, verbose_name='ID',
+                    ),
+                ),
+                ('todo_id', models.CharField(max_length=100)),
+                ('user_id', models.CharField(max_length=150)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='todovote',
+            constraint=models.UniqueConstraint(
+                fields=('todo_id', 'user_id'), name='unique_vote_per_user',
+            ),
+        ),
+        # votes commute with each other but not with any other todo event
+        migrations.RunSQL(
+            sql="""\
+UPDATE django_back_end_todostream SET barrier = COALESCE((
+    SELECT MAX(seq."index")
+    FROM django_back_end_todoeventsequence seq
+    JOIN django_back_end_todoevent evt ON evt.id = seq.event_id
+    WHERE seq.todo_id = django_back_end_todostream.todo_id
+    AND evt.event_type NOT IN ('TodoUpvoted', 'TodoUpvoteRemoved')
+), 0);
+""",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.RunPython(
+            populate_votes, reverse_code=migrations.RunPython.noop,
+        ),
+    ]
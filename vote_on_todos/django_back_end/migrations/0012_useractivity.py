@@ -0,0 +1,95 @@
+# Generated by Django 4.2.11 on 2026-10-18 07:47
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from django.db import migrations
+from django.db import models
+
+_BATCH_SIZE = 1000
+
+_USER_FIELDS = {
+    'TodoCreated': ('created', 'created_by'),
+    'TodoUpvoted': ('upvoted', 'upvoted_by'),
+    'TodoUpvoteRemoved': ('upvote_removed', 'removed_by'),
+    'TodoDone': ('completed', 'recorded_by'),
+}
+
+
+def populate_user_activity(apps: Any, schema_editor: Any) -> None:
+    TodoEventSequence = apps.get_model('django_back_end', 'TodoEventSequence')
+    UserActivity = apps.get_model('django_back_end', 'UserActivity')
+
+    activity = []
+    for seq in TodoEventSequence.objects.select_related('event').iterator(
+        _BATCH_SIZE,
+    ):
+        kind, user_field = _USER_FIELDS[seq.event.event_type]
+        activity.append(
+            UserActivity(
+                user_id=json.loads(seq.event.payload)[user_field],
+                kind=kind,
+                todo_id=seq.todo_id,
+                index=seq.index,
+                timestamp=seq.event.timestamp,
+            ),
+        )
+        if len(activity) == _BATCH_SIZE:
+            UserActivity.objects.bulk_create(activity)
+            activity = []
+
+    UserActivity.objects.bulk_create(activity)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_back_end', '0011_commutative_votes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserActivity',
+            fields=[
+                (
+                    'id', models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True, serialize=False, verbose_name='ID',
+                    ),
+                ),
+                ('user_id', models.CharField(max_length=150)),
+                (
+                    'kind', models.CharField(
+                        choices=[
+                            ('created', 'Created'),
+                            ('upvoted', 'Upvoted'),
+                            ('upvote_removed', 'Upvote Removed'),
+                            ('completed', 'Completed'),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ('todo_id', models.CharField(max_length=100)),
+                ('index', models.PositiveIntegerField()),
+                ('timestamp', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [
+                    models.Index(
+                        fields=['user_id', '-timestamp', '-id'],
+                        name='useractivity_user_order',
+                    ),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='useractivity',
+            constraint=models.UniqueConstraint(
+                fields=('todo_id', 'index'), name='unique_activity_per_event',
+            ),
+        ),
+        migrations.RunPython(
+            populate_user_activity, reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.11 on 2026-10-18 07:49
+from __future__ import annotations
+
+from typing import Any
+
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+
+_BATCH_SIZE = 1000
+
+
+def populate_list_stats(apps: Any, schema_editor: Any) -> None:
+    TodoEventSequence = apps.get_model('django_back_end', 'TodoEventSequence')
+    TodoItem = apps.get_model('django_back_end', 'TodoItem')
+    ListStats = apps.get_model('django_back_end', 'ListStats')
+
+    last_activity = dict(
+        TodoEventSequence.objects.values('todo_id').annotate(
+            last=models.Max('event__timestamp'),
+        ).values_list('todo_id', 'last'),
+    )
+
+    stats: dict[str, Any] = {}
+    for item in TodoItem.objects.iterator(_BATCH_SIZE):
+        item_activity = last_activity.get(item.todo_id, item.created_at)
+        todo_stats = stats.setdefault(
+            item.list_id,
+            ListStats(todo_list_id=item.list_id, last_activity=item_activity),
+        )
+        if item.done_at is None:
+            todo_stats.open_count += 1
+        else:
+            todo_stats.done_count += 1
+        todo_stats.vote_count += item.vote_count
+        todo_stats.last_activity = max(todo_stats.last_activity, item_activity)
+
+    ListStats.objects.bulk_create(stats.values(), batch_size=_BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_back_end', '0012_useractivity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListStats',
+            fields=[
+                (
+                    'todo_list', models.OneToOneField(
+                        db_column='list_id',
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name='stats',
+                        serialize=False,
+                        to='django_back_end.todolist',
+                    ),
+                ),
+                ('open_count', models.IntegerField(default=0)),
+                ('done_count', models.IntegerField(default=0)),
+                ('vote_count', models.IntegerField(default=0)),
+                ('last_activity', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(
+            populate_list_stats, reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.11 on 2026-10-18 07:51
+from __future__ import annotations
+
+from django.db import migrations
+from django.db import models
+
+_CREATE_INDEX = (
+    """
+    CREATE VIRTUAL TABLE django_back_end_todosearch USING fts5(
+        title,
+        description,
+        content='django_back_end_todosearchdocument',
+        content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER django_back_end_todosearch_insert
+    AFTER INSERT ON django_back_end_todosearchdocument BEGIN
+        INSERT INTO django_back_end_todosearch(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER django_back_end_todosearch_delete
+    AFTER DELETE ON django_back_end_todosearchdocument BEGIN
+        INSERT INTO django_back_end_todosearch(
+            django_back_end_todosearch, rowid, title, description
+        )
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+)
+
+_DROP_INDEX = (
+    'DROP TRIGGER django_back_end_todosearch_delete',
+    'DROP TRIGGER django_back_end_todosearch_insert',
+    'DROP TABLE django_back_end_todosearch',
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_back_end', '0013_liststats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TodoSearchDocument',
+            fields=[
+                (
+                    'id', models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True, serialize=False, verbose_name='ID',
+                    ),
+                ),
+                ('todo_id', models.CharField(max_length=100, unique=True)),
+                ('list_id', models.CharField(max_length=100)),
+                ('title', models.TextField()),
+                ('description', models.TextField()),
+            ],
+        ),
+        migrations.RunSQL(_CREATE_INDEX, reverse_sql=_DROP_INDEX),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-18 08:42
+from __future__ import annotations
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_back_end', '0014_todosearchdocument'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='todoitem',
+            name='upvotes',
+        ),
+    ]
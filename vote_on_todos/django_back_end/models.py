@@ -1,12 +1,37 @@
 from __future__ import annotations
 
-import cattrs.preconf.json
+import attrs
 from django.db import models
 
+from . import codecs
 from vote_on_todos.todos.domain import lists
 from vote_on_todos.todos.domain import todos
 
 
+# Rows are fetched from the database in chunks of this size when streaming
+# events, so memory use does not grow with the length of the event log.
+CHUNK_SIZE = 2000
+
+
+# Event log
+# =========
+
+class EventLogHead(models.Model):
+    """The position of the latest event in the log.
+
+    Every list and todo event is given the next position when it is committed,
+    so there is a single order over all events that incremental consumers can
+    checkpoint against. There is only ever one row in this table.
+    """
+    position = models.PositiveBigIntegerField()
+
+
+class ProjectionCheckpoint(models.Model):
+    """The log position that a projection has been applied up to."""
+    name = models.CharField(max_length=100, primary_key=True)
+    position = models.PositiveBigIntegerField(default=0)
+
+
 # Lists
 # =====
 
@@ -15,8 +40,10 @@ LIST_EVENT_TYPES: dict[type[lists.Event], tuple[str, int]] = {
 }
 
 
-def list_event_type(event_type: str, version: int) -> type[lists.Event]:
-    return {v: k for k, v in LIST_EVENT_TYPES.items()}[(event_type, version)]
+LIST_CODECS = codecs.Registry(
+    LIST_EVENT_TYPES,
+    columns=[field.name for field in attrs.fields(lists.Event)],
+)
 
 
 class ListEvent(models.Model):
@@ -27,7 +54,8 @@ class ListEvent(models.Model):
 
     timestamp = models.DateTimeField()
     payload = models.CharField(max_length=500)
-    payload_converter = cattrs.preconf.json.make_converter()
+
+    position = models.PositiveBigIntegerField(unique=True)
 
 
 class ListEventSequence(models.Model):
@@ -42,6 +70,21 @@ class ListEventSequence(models.Model):
             ),
         ]
 
+    def to_domain(self) -> lists.Event:
+        return LIST_CODECS.decode(
+            self.event.event_type, self.event.event_type_version,
+            self.event.payload,
+            timestamp=self.event.timestamp,
+            list_id=self.list_id,
+            index=self.index,
+        )
+
+
+class ListStream(models.Model):
+    """The head of each list's stream: the index of its latest event."""
+    list_id = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveIntegerField()
+
 
 # Todos
 # =====
@@ -53,8 +96,10 @@ TODO_EVENT_TYPES: dict[type[todos.Event], tuple[str, int]] = {
 }
 
 
-def todo_event_type(event_type: str, version: int) -> type[todos.Event]:
-    return {v: k for k, v in TODO_EVENT_TYPES.items()}[(event_type, version)]
+TODO_CODECS = codecs.Registry(
+    TODO_EVENT_TYPES,
+    columns=[field.name for field in attrs.fields(todos.Event)],
+)
 
 
 class TodoEvent(models.Model):
@@ -65,7 +110,8 @@ class TodoEvent(models.Model):
 
     timestamp = models.DateTimeField()
     payload = models.CharField(max_length=500)
-    payload_converter = cattrs.preconf.json.make_converter()
+
+    position = models.PositiveBigIntegerField(unique=True)
 
 
 class TodoEventSequence(models.Model):
@@ -79,3 +125,253 @@ class TodoEventSequence(models.Model):
                 fields=['todo_id', 'index'], name='unique_index_per_todo_id',
             ),
         ]
+
+    def to_domain(self) -> todos.Event:
+        return TODO_CODECS.decode(
+            self.event.event_type, self.event.event_type_version,
+            self.event.payload,
+            timestamp=self.event.timestamp,
+            todo_id=self.todo_id,
+            index=self.index,
+        )
+
+
+class TodoStream(models.Model):
+    """The head of each todo's stream: the index of its latest event."""
+    todo_id = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveIntegerField()
+    # the index of the latest event that votes do not commute with
+    barrier = models.PositiveIntegerField(default=0)
+
+
+class TodoVote(models.Model):
+    """A user's current upvote on a todo item.
+
+    Votes from different users commute, so they are not made to race for the
+    next index in the todo's stream. Instead this table's unique constraint
+    ensures that each user upvotes a todo at most once.
+    """
+    todo_id = models.CharField(max_length=100)
+    user_id = models.CharField(max_length=150)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['todo_id', 'user_id'], name='unique_vote_per_user',
+            ),
+        ]
+
+
+# Snapshots
+# =========
+
+class Snapshot(models.Model):
+    """The state of an aggregate as of some index in its stream.
+
+    Snapshots are tagged with the version of the format they were written in.
+    Only snapshots in the current format are ever read, so older ones can be
+    discarded at any time.
+    """
+
+    class StreamType(models.TextChoices):
+        LIST = 'list'
+        TODO = 'todo'
+
+    stream_type = models.CharField(max_length=10, choices=StreamType.choices)
+    stream_id = models.CharField(max_length=100)
+    index = models.PositiveIntegerField()
+
+    version = models.PositiveIntegerField()
+    state = models.TextField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['stream_type', 'stream_id', 'version', 'index'],
+                name='unique_snapshot_per_stream_index',
+            ),
+        ]
+
+
+# Read models
+# ===========
+
+# The orders in which todo items are shown in a list. The todo id is there to
+# make the order total, so that it can be used for keyset pagination.
+INCOMPLETE_TODOS_ORDER = ['-vote_count', 'created_at', 'todo_id']
+COMPLETED_TODOS_ORDER = ['done_at', 'created_at', 'todo_id']
+# The order in which a user's activity is shown: most recent first.
+USER_ACTIVITY_ORDER = ['-timestamp', '-id']
+
+
+class TodoList(models.Model):
+    """The current state of a todo list.
+
+    This is kept up to date by the `todo_lists` projection.
+    """
+    list_id = models.CharField(max_length=100, primary_key=True)
+    name = models.TextField()
+    description = models.TextField()
+    creator = models.CharField(max_length=150)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['name', 'list_id'], name='todolist_name_order',
+            ),
+        ]
+
+    def to_domain(self) -> lists.TodoList:
+        return lists.TodoList(
+            id=self.list_id,
+            name=self.name,
+            description=self.description,
+            creator=self.creator,
+        )
+
+    @classmethod
+    def from_domain(cls, todo_list: lists.TodoList) -> TodoList:
+        return cls(
+            list_id=todo_list.id,
+            name=todo_list.name,
+            description=todo_list.description,
+            creator=todo_list.creator,
+        )
+
+
+class ListStats(models.Model):
+    """Counts of the todo items in a todo list.
+
+    This is kept up to date by the `todo_items` projection, which adjusts the
+    counts by the effect of each todo event as it applies it. Todo events can
+    be projected before the list they belong to, so there is no foreign key
+    constraint on `todo_list`.
+    """
+    todo_list = models.OneToOneField(
+        TodoList,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='list_id',
+        db_constraint=False,
+        related_name='stats',
+    )
+    open_count = models.IntegerField(default=0)
+    done_count = models.IntegerField(default=0)
+    vote_count = models.IntegerField(default=0)
+    last_activity = models.DateTimeField()
+
+
+class TodoItem(models.Model):
+    """The current state of a todo item.
+
+    This is kept up to date by the `todo_items` projection, so that reads do
+    not need to replay the whole event history.
+    """
+    todo_id = models.CharField(max_length=100, primary_key=True)
+    next_index = models.PositiveIntegerField()
+
+    list_id = models.CharField(max_length=100, db_index=True)
+    title = models.TextField()
+    description = models.TextField()
+    creator = models.CharField(max_length=150)
+    created_at = models.DateTimeField()
+    done_at = models.DateTimeField(null=True)
+    completor = models.CharField(max_length=150, null=True)
+
+    vote_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['list_id', *INCOMPLETE_TODOS_ORDER],
+                name='todoitem_incomplete_rank',
+                condition=models.Q(done_at__isnull=True),
+            ),
+            models.Index(
+                fields=['list_id', *COMPLETED_TODOS_ORDER],
+                name='todoitem_completed_rank',
+                condition=models.Q(done_at__isnull=False),
+            ),
+        ]
+
+    def to_domain(self) -> todos.TodoItem:
+        return todos.TodoItem(
+            id=self.todo_id,
+            next_index=self.next_index,
+            list_id=self.list_id,
+            title=self.title,
+            description=self.description,
+            creator=self.creator,
+            created_at=self.created_at,
+            done_at=self.done_at,
+            completor=self.completor,
+            vote_count=self.vote_count,
+        )
+
+    @classmethod
+    def from_domain(cls, item: todos.TodoItem) -> TodoItem:
+        return cls(
+            todo_id=item.id,
+            next_index=item.next_index,
+            list_id=item.list_id,
+            title=item.title,
+            description=item.description,
+            creator=item.creator,
+            created_at=item.created_at,
+            done_at=item.done_at,
+            completor=item.completor,
+            vote_count=item.vote_count,
+        )
+
+
+class UserActivity(models.Model):
+    """Something a user did to a todo item.
+
+    This is kept up to date by the `user_activity` projection, and indexed so
+    that reading a user's activity only touches that user's rows.
+    """
+    class Kind(models.TextChoices):
+        CREATED = 'created'
+        UPVOTED = 'upvoted'
+        UPVOTE_REMOVED = 'upvote_removed'
+        COMPLETED = 'completed'
+
+    user_id = models.CharField(max_length=150)
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    todo_id = models.CharField(max_length=100)
+    # the index of the todo event that this activity came from
+    index = models.PositiveIntegerField()
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['todo_id', 'index'], name='unique_activity_per_event',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user_id', *USER_ACTIVITY_ORDER],
+                name='useractivity_user_order',
+            ),
+        ]
+
+
+# Search
+# ======
+
+# The FTS5 index over `TodoSearchDocument`, created in migration 0014. It
+# uses the documents as external content, and triggers keep it in sync.
+TODO_SEARCH_INDEX = 'django_back_end_todosearch'
+
+
+class TodoSearchDocument(models.Model):
+    """The searchable text of a todo item.
+
+    This is kept up to date by the `todo_search` projection. Its rows are
+    indexed in `TODO_SEARCH_INDEX` and searched with `MATCH`.
+    """
+    todo_id = models.CharField(max_length=100, unique=True)
+    list_id = models.CharField(max_length=100)
+    title = models.TextField()
+    description = models.TextField()
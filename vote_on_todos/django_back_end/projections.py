@@ -0,0 +1,266 @@
+"""Read models that are projected from the event log.
+
+Each projection folds batches of events into its read model tables, using
+the domain's `apply_event` functions. The committer can apply them to each
+event as it is stored, or they can be left to the projector
+(`manage.py run_projector`), which tails the event log and keeps a durable
+checkpoint for each projection.
+
+Projections are idempotent: applying an event that has already been applied
+leaves the read model unchanged, so replaying from an old checkpoint is safe.
+"""
+from __future__ import annotations
+
+import datetime
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Sequence
+
+import attrs
+from django.db import transaction
+from django.db.models import DateTimeField
+from django.db.models import F
+from django.db.models import Value
+from django.db.models.functions import Greatest
+
+from . import event_log
+from . import models
+from vote_on_todos.todos.domain import lists
+from vote_on_todos.todos.domain import todos
+
+
+def project_todo_lists(events: Sequence[lists.Event | todos.Event]) -> None:
+    list_events = [event for event in events if isinstance(event, lists.Event)]
+    if not list_events:
+        return
+
+    todo_lists = {
+        todo_list.list_id: todo_list.to_domain()
+        for todo_list in models.TodoList.objects.filter(
+            list_id__in={event.list_id for event in list_events},
+        )
+    }
+    for event in list_events:
+        lists.apply_event(todo_lists, event)
+
+    models.TodoList.objects.bulk_create(
+        [models.TodoList.from_domain(lst) for lst in todo_lists.values()],
+        update_conflicts=True,
+        unique_fields=['list_id'],
+        update_fields=['name', 'description', 'creator'],
+    )
+
+
+def project_todo_items(events: Sequence[lists.Event | todos.Event]) -> None:
+    todo_events = [event for event in events if isinstance(event, todos.Event)]
+    if not todo_events:
+        return
+
+    items = {
+        item.todo_id: item.to_domain()
+        for item in models.TodoItem.objects.filter(
+            todo_id__in={event.todo_id for event in todo_events},
+        )
+    }
+    stats: dict[str, _StatsChange] = {}
+    for event in todo_events:
+        item = items.get(event.todo_id)
+        if item is not None and event.index < item.next_index:
+            continue  # already applied
+        todos.apply_event(items, event)
+        stats.setdefault(
+            items[event.todo_id].list_id, _StatsChange(event.timestamp),
+        ).add(event)
+
+    models.TodoItem.objects.bulk_create(
+        [models.TodoItem.from_domain(item) for item in items.values()],
+        update_conflicts=True,
+        unique_fields=['todo_id'],
+        update_fields=[
+            'next_index', 'list_id', 'title', 'description', 'creator',
+            'created_at', 'done_at', 'completor', 'vote_count',
+        ],
+    )
+    _update_list_stats(stats)
+
+
+@attrs.define
+class _StatsChange:
+    """The change to a list's stats from some newly applied todo events."""
+    last_activity: datetime.datetime
+    open: int = 0
+    done: int = 0
+    votes: int = 0
+
+    def add(self, event: todos.Event) -> None:
+        if isinstance(event, todos.TodoCreatedV1):
+            self.open += 1
+        elif isinstance(event, todos.TodoUpvotedV1):
+            self.votes += 1
+        elif isinstance(event, todos.TodoUpvoteRemovedV1):
+            self.votes -= 1
+        elif isinstance(event, todos.TodoDoneV1):
+            self.open -= 1
+            self.done += 1
+        else:  # pragma: no cover
+            raise TypeError(f'unexpected event type: {type(event)!r}')
+
+        self.last_activity = max(self.last_activity, event.timestamp)
+
+
+def _update_list_stats(stats: dict[str, _StatsChange]) -> None:
+    # Only events that were not already applied to the todo items get here,
+    # so adjusting the counts keeps them idempotent too.
+    for list_id, change in stats.items():
+        updated = models.ListStats.objects.filter(todo_list_id=list_id).update(
+            open_count=F('open_count') + change.open,
+            done_count=F('done_count') + change.done,
+            vote_count=F('vote_count') + change.votes,
+            last_activity=Greatest(
+                'last_activity',
+                Value(change.last_activity, output_field=DateTimeField()),
+            ),
+        )
+        if not updated:
+            models.ListStats.objects.create(
+                todo_list_id=list_id,
+                open_count=change.open,
+                done_count=change.done,
+                vote_count=change.votes,
+                last_activity=change.last_activity,
+            )
+
+
+def project_user_activity(events: Sequence[lists.Event | todos.Event]) -> None:
+    kinds = models.UserActivity.Kind
+    activity = []
+    for event in events:
+        if isinstance(event, todos.TodoCreatedV1):
+            user_id, kind = event.created_by, kinds.CREATED
+        elif isinstance(event, todos.TodoUpvotedV1):
+            user_id, kind = event.upvoted_by, kinds.UPVOTED
+        elif isinstance(event, todos.TodoUpvoteRemovedV1):
+            user_id, kind = event.removed_by, kinds.UPVOTE_REMOVED
+        elif isinstance(event, todos.TodoDoneV1):
+            user_id, kind = event.recorded_by, kinds.COMPLETED
+        else:
+            continue
+
+        activity.append(
+            models.UserActivity(
+                user_id=user_id,
+                kind=kind,
+                todo_id=event.todo_id,
+                index=event.index,
+                timestamp=event.timestamp,
+            ),
+        )
+
+    # each event's activity is only recorded once
+    models.UserActivity.objects.bulk_create(activity, ignore_conflicts=True)
+
+
+def project_todo_search(events: Sequence[lists.Event | todos.Event]) -> None:
+    # the title and description of a todo are only set when it is created
+    models.TodoSearchDocument.objects.bulk_create(
+        [
+            models.TodoSearchDocument(
+                todo_id=event.todo_id,
+                list_id=event.list_id,
+                title=event.title,
+                description=event.description,
+            )
+            for event in events
+            if isinstance(event, todos.TodoCreatedV1)
+        ],
+        ignore_conflicts=True,
+    )
+
+
+@attrs.frozen
+class Projection:
+    name: str
+    apply: Callable[[Sequence[lists.Event | todos.Event]], None]
+
+
+PROJECTIONS = (
+    Projection('todo_lists', project_todo_lists),
+    Projection('todo_items', project_todo_items),
+    Projection('user_activity', project_user_activity),
+    Projection('todo_search', project_todo_search),
+)
+
+
+def get_projection(name: str) -> Projection:
+    for projection in PROJECTIONS:
+        if projection.name == name:
+            return projection
+
+    raise KeyError(name)
+
+
+def checkpoint(projection: Projection) -> int:
+    """Get the log position that a projection has been applied up to."""
+    saved = models.ProjectionCheckpoint.objects.filter(
+        name=projection.name,
+    ).first()
+    return saved.position if saved is not None else 0
+
+
+def advance_checkpoints(applied: Iterable[Projection], positions: range) -> None:
+    """Record that some projections have been applied to a range of positions.
+
+    This is for events applied as they are committed, in the transaction that
+    claimed `positions`. A checkpoint only moves if it was just before them.
+    Otherwise some earlier events were left to the projector, and it is left
+    where it is so that the projector still applies them. Applying the newer
+    events again on the way is safe, because projections are idempotent.
+    """
+    names = [projection.name for projection in applied]
+    if positions.start == 1:
+        # the log was empty, so any checkpoint there is must be at 0
+        models.ProjectionCheckpoint.objects.bulk_create(
+            [
+                models.ProjectionCheckpoint(name=name, position=positions[-1])
+                for name in names
+            ],
+            update_conflicts=True,
+            unique_fields=['name'],
+            update_fields=['position'],
+        )
+    else:
+        models.ProjectionCheckpoint.objects.filter(
+            name__in=names, position=positions.start - 1,
+        ).update(position=positions[-1])
+
+
+def lag(projection: Projection) -> int:
+    """Get the number of logged events a projection has yet to apply."""
+    return event_log.head_position() - checkpoint(projection)
+
+
+def catch_up(
+        projection: Projection, *, batch_size: int = models.CHUNK_SIZE,
+) -> int:
+    """Apply the next batch of events to a projection.
+
+    The batch and the new checkpoint are committed together, so a projector
+    that stops part way through resumes from the last complete batch.
+
+    Returns:
+        The number of events applied.
+    """
+    with transaction.atomic():
+        saved, _ = models.ProjectionCheckpoint.objects.get_or_create(
+            name=projection.name, defaults={'position': 0},
+        )
+        batch = event_log.read_after(saved.position, batch_size=batch_size)
+        if not batch:
+            return 0
+
+        projection.apply([logged.event for logged in batch])
+
+        saved.position = batch[-1].position
+        saved.save(update_fields=['position'])
+
+    return len(batch)
@@ -1,64 +1,352 @@
 from __future__ import annotations
 
-from collections import defaultdict
+import datetime
+import re
+from collections.abc import Iterable
+from collections.abc import Sequence
+from typing import Any
+
+import attrs
+from django.db import connection
+from django.db.models import Q
+from django.db.models import QuerySet
 
 from . import models
+from . import snapshots
+from .identity_map import IdentityMap
 from vote_on_todos.todos.domain import lists
 from vote_on_todos.todos.domain import todos
 
 
-class ListRepo:
-    def _get_lists(self, list_id: str | None = None) -> dict[str, lists.TodoList]:
-        qs = models.ListEvent.objects.all()
+@attrs.frozen
+class ListStats:
+    open_count: int = 0
+    done_count: int = 0
+    vote_count: int = 0
+    last_activity: datetime.datetime | None = None
 
-        if list_id is not None:
-            qs = qs.filter(list_id=list_id)
 
-        events = [
-            models.ListEvent.payload_converter.loads(
-                evt.payload, models.list_event_type(
-                    evt.event_type, evt.event_type_version,
-                ),
+@attrs.frozen
+class ListSummary:
+    todo_list: lists.TodoList
+    stats: ListStats
+
+    @property
+    def id(self) -> str:
+        return self.todo_list.id
+
+
+class ListRepo:
+    def get_lists(
+            self, *, limit: int | None = None, after: str | None = None,
+    ) -> list[lists.TodoList]:
+        """Get todo lists, in order of name.
+
+        Args:
+            limit: The maximum number of lists to get.
+            after: The id of a list; only lists sorted after it are got.
+        """
+        return [
+            todo_list.to_domain()
+            for todo_list in self._page(
+                models.TodoList.objects.all(), limit=limit, after=after,
             )
-            for evt in qs.order_by('timestamp')
         ]
 
-        return lists.get_lists(events)
+    def get_summaries(
+            self, *, limit: int | None = None, after: str | None = None,
+    ) -> list[ListSummary]:
+        """Get todo lists with their stats, in order of name.
+
+        The stats are joined to the lists, so this is a single query.
+
+        Args:
+            limit: The maximum number of lists to get.
+            after: The id of a list; only lists sorted after it are got.
+        """
+        summaries = []
+        for todo_list in self._page(
+            models.TodoList.objects.select_related('stats'),
+            limit=limit,
+            after=after,
+        ):
+            try:
+                row = todo_list.stats
+            except models.ListStats.DoesNotExist:
+                stats = ListStats()
+            else:
+                stats = ListStats(
+                    open_count=row.open_count,
+                    done_count=row.done_count,
+                    vote_count=row.vote_count,
+                    last_activity=row.last_activity,
+                )
+            summaries.append(
+                ListSummary(todo_list=todo_list.to_domain(), stats=stats),
+            )
+
+        return summaries
+
+    def _page(
+            self,
+            qs: QuerySet[models.TodoList],
+            *,
+            limit: int | None,
+            after: str | None,
+    ) -> QuerySet[models.TodoList]:
+        order = ['name', 'list_id']
 
-    def get_lists(self) -> list[lists.TodoList]:
-        return list(self._get_lists().values())
+        if after is not None:
+            cursor = models.TodoList.objects.filter(list_id=after).first()
+            if cursor is not None:
+                qs = qs.filter(_keyset_after(order, cursor))
+
+        qs = qs.order_by(*order)
+        if limit is not None:
+            qs = qs[:limit]
+
+        return qs
 
     def get_list(self, list_id: str) -> lists.TodoList:
-        return self._get_lists()[list_id]
+        """Get a list from its own stream, via its latest snapshot.
+
+        Unlike the `TodoList` read table, this never lags behind the events.
+
+        Raises:
+            KeyError: The list does not exist.
+        """
+        todo_list = snapshots.load_list(list_id)
+        if todo_list is None:
+            raise KeyError(list_id)
+        return todo_list
 
     def is_list(self, list_id: str) -> bool:
-        return list_id in self._get_lists(list_id)
+        # the stream head is written with the list's first event, so unlike
+        # the TodoList read table it never lags behind
+        return models.ListStream.objects.filter(list_id=list_id).exists()
+
+
+def _keyset_after(
+        order: Sequence[str],
+        cursor: models.TodoList | models.TodoItem | models.UserActivity,
+) -> Q:
+    """Filter for the rows that come after `cursor` when sorted by `order`."""
+    after = Q()
+    equal: dict[str, Any] = {}
+    for field in order:
+        name = field.removeprefix('-')
+        value = getattr(cursor, name)
+        lookup = 'lt' if field.startswith('-') else 'gt'
+
+        after |= Q(**equal, **{f'{name}__{lookup}': value})
+        equal[name] = value
 
+    return after
 
+
+@attrs.frozen
 class TodoRepo:
-    def _get_todos(self) -> dict[str, todos.TodoItem]:
-        qs = models.TodoEvent.objects.all()
+    identity_map: IdentityMap | None = None
+
+    def _get_ranked(
+            self,
+            list_id: str,
+            order: Sequence[str],
+            *,
+            done: bool,
+            limit: int | None,
+            after: str | None,
+    ) -> list[todos.TodoItem]:
+        qs = models.TodoItem.objects.filter(
+            list_id=list_id, done_at__isnull=not done,
+        )
+
+        if after is not None:
+            # a cursor from another list or ranking is ignored, as if absent
+            cursor = qs.filter(todo_id=after).first()
+            if cursor is not None:
+                qs = qs.filter(_keyset_after(order, cursor))
+
+        qs = qs.order_by(*order)
+        if limit is not None:
+            qs = qs[:limit]
+
+        return [item.to_domain() for item in qs]
+
+    def get_incomplete(
+            self, list_id: str, *,
+            limit: int | None = None, after: str | None = None,
+    ) -> list[todos.TodoItem]:
+        """Get the incomplete todo items on a list, most votes first.
 
-        events = [
-            models.TodoEvent.payload_converter.loads(
-                evt.payload, models.todo_event_type(
-                    evt.event_type, evt.event_type_version,
+        Args:
+            limit: The maximum number of todo items to get.
+            after: The id of a todo item; only items ranked after it are got.
+                An id that is not an incomplete item on the list is ignored.
+        """
+        return self._get_ranked(
+            list_id, models.INCOMPLETE_TODOS_ORDER,
+            done=False, limit=limit, after=after,
+        )
+
+    def get_completed(
+            self, list_id: str, *,
+            limit: int | None = None, after: str | None = None,
+    ) -> list[todos.TodoItem]:
+        """Get the completed todo items on a list, in order of completion.
+
+        Args:
+            limit: The maximum number of todo items to get.
+            after: The id of a todo item; only items ranked after it are got.
+                An id that is not a completed item on the list is ignored.
+        """
+        return self._get_ranked(
+            list_id, models.COMPLETED_TODOS_ORDER,
+            done=True, limit=limit, after=after,
+        )
+
+    def _load_todo(self, todo_id: str) -> todos.TodoItem | None:
+        try:
+            item = models.TodoItem.objects.get(todo_id=todo_id)
+        except models.TodoItem.DoesNotExist:
+            return None
+        else:
+            return item.to_domain()
+
+    def get_todo(self, todo_id: str) -> todos.TodoItem | None:
+        if self.identity_map is None:
+            return self._load_todo(todo_id)
+        return self.identity_map.get_todo(
+            'read_model', todo_id, self._load_todo,
+        )
+
+
+@attrs.frozen
+class TodoStreamRepo:
+    """Load todo items from their own event streams.
+
+    The domain services make their decisions against this, rather than the
+    read models, so that they only ever see the authoritative event history.
+    Only the events for the requested todo are loaded (since its latest
+    snapshot), using the per-todo index in the sequence table.
+    """
+    identity_map: IdentityMap | None = None
+
+    def get_todo(self, todo_id: str) -> todos.TodoItem | None:
+        if self.identity_map is None:
+            return snapshots.load_todo(todo_id)
+        return self.identity_map.get_todo(
+            'stream', todo_id, snapshots.load_todo,
+        )
+
+
+class VoteRepo:
+    def has_voted(self, todo_id: str, user_id: str) -> bool:
+        return models.TodoVote.objects.filter(
+            todo_id=todo_id, user_id=user_id,
+        ).exists()
+
+    def voted_on(self, user_id: str, todo_ids: Iterable[str]) -> set[str]:
+        """Get which of some todos a user has upvoted."""
+        return set(
+            models.TodoVote.objects.filter(
+                user_id=user_id, todo_id__in=list(todo_ids),
+            ).values_list('todo_id', flat=True),
+        )
+
+
+@attrs.frozen
+class Activity:
+    id: str
+    kind: models.UserActivity.Kind
+    timestamp: datetime.datetime
+    todo: todos.TodoItem | None
+
+
+class ActivityRepo:
+    def get_activity(
+            self,
+            user_id: str,
+            *,
+            limit: int | None = None,
+            after: str | None = None,
+    ) -> list[Activity]:
+        """Get the things a user has done, most recent first.
+
+        Args:
+            user_id: The user.
+            limit: The maximum number of activities to get.
+            after: The id of an activity; only older activities are got.
+        """
+        qs = models.UserActivity.objects.filter(user_id=user_id)
+
+        if after is not None and after.isdigit():
+            cursor = qs.filter(pk=int(after)).first()
+            if cursor is not None:
+                qs = qs.filter(_keyset_after(models.USER_ACTIVITY_ORDER, cursor))
+
+        qs = qs.order_by(*models.USER_ACTIVITY_ORDER)
+        if limit is not None:
+            qs = qs[:limit]
+
+        rows = list(qs)
+        items = models.TodoItem.objects.in_bulk({row.todo_id for row in rows})
+
+        return [
+            Activity(
+                id=str(row.pk),
+                kind=models.UserActivity.Kind(row.kind),
+                timestamp=row.timestamp,
+                todo=(
+                    items[row.todo_id].to_domain()
+                    if row.todo_id in items else None
                 ),
             )
-            for evt in qs.order_by('timestamp')
+            for row in rows
         ]
 
-        return todos.get_items(events)
 
-    def _get_lists(self) -> dict[str, list[todos.TodoItem]]:
-        todo_lists = defaultdict(list)
-        for item in self._get_todos().values():
-            todo_lists[item.list_id].append(item)
+@attrs.frozen
+class SearchResult:
+    todo_id: str
+    list_id: str
+    list_name: str | None
+    title: str
+    snippet: str
 
-        return todo_lists
 
-    def get_list(self, list_id: str) -> list[todos.TodoItem]:
-        return self._get_lists()[list_id]
+class SearchRepo:
+    def search(self, text: str, *, limit: int = 20) -> list[SearchResult]:
+        """Find todos by the words in their title and description, best first.
 
-    def get_todo(self, todo_id: str) -> todos.TodoItem | None:
-        return self._get_todos().get(todo_id)
+        Each word in `text` must match the start of a word in the todo. Matches
+        in the title count for more than matches in the description.
+
+        Args:
+            text: The words to search for.
+            limit: The maximum number of results to get.
+        """
+        words = re.findall(r'\w+', text)
+        if not words:
+            return []
+        # quoted, so that words like OR are not read as operators
+        match = ' '.join('"' + word + '"*' for word in words)
+
+        index = models.TODO_SEARCH_INDEX
+        documents = models.TodoSearchDocument._meta.db_table
+        todo_lists = models.TodoList._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT d.todo_id, d.list_id, l.name, d.title,
+                       snippet({index}, 1, '', '', '…', 16)
+                FROM {index}
+                JOIN {documents} d ON d.id = {index}.rowid
+                LEFT JOIN {todo_lists} l ON l.list_id = d.list_id
+                WHERE {index} MATCH %s
+                ORDER BY bm25({index}, 4.0, 1.0)
+                LIMIT %s
+                """,
+                [match, limit],
+            )
+            return [SearchResult(*row) for row in cursor.fetchall()]
@@ -0,0 +1,140 @@
+"""Snapshots of aggregate state.
+
+Rebuilding an aggregate from its stream is linear in the length of that
+stream, so every `SNAPSHOT_INTERVAL` events we store a copy of the projected
+state. Loading an aggregate then replays only the events after the latest
+snapshot.
+"""
+from __future__ import annotations
+
+import cattrs.preconf.json
+
+from . import models
+from vote_on_todos.todos.domain import lists
+from vote_on_todos.todos.domain import todos
+
+# Take a snapshot whenever an event with an index divisible by this is written
+# (after the rest of its batch, so the snapshot may be of a later index).
+SNAPSHOT_INTERVAL = 100
+
+# Bump this whenever the shape of `TodoItem` or `TodoList` changes (or their
+# projections start to disagree with the existing snapshots); snapshots in any
+# other version are ignored.
+SNAPSHOT_VERSION = 2
+
+_converter = cattrs.preconf.json.make_converter()
+
+
+def _latest_snapshot(
+        stream_type: models.Snapshot.StreamType, stream_id: str,
+) -> models.Snapshot | None:
+    return models.Snapshot.objects.filter(
+        stream_type=stream_type,
+        stream_id=stream_id,
+        version=SNAPSHOT_VERSION,
+    ).order_by('-index').first()
+
+
+def _save_snapshot(
+        stream_type: models.Snapshot.StreamType, stream_id: str,
+        index: int, state: str,
+) -> None:
+    models.Snapshot.objects.update_or_create(
+        stream_type=stream_type,
+        stream_id=stream_id,
+        version=SNAPSHOT_VERSION,
+        index=index,
+        defaults={'state': state},
+    )
+
+
+def discard_stale_snapshots() -> int:
+    """Delete snapshots written in an old format.
+
+    Returns:
+        The number of snapshots deleted.
+    """
+    deleted, _ = models.Snapshot.objects.exclude(
+        version=SNAPSHOT_VERSION,
+    ).delete()
+    return deleted
+
+
+# Lists
+# =====
+
+def _load_list(list_id: str) -> tuple[lists.TodoList | None, int]:
+    todo_lists: dict[str, lists.TodoList] = {}
+    index = 0
+
+    qs = models.ListEventSequence.objects.filter(
+        list_id=list_id,
+    ).select_related('event')
+
+    snapshot = _latest_snapshot(models.Snapshot.StreamType.LIST, list_id)
+    if snapshot is not None:
+        todo_lists[list_id] = _converter.loads(snapshot.state, lists.TodoList)
+        index = snapshot.index
+        qs = qs.filter(index__gt=snapshot.index)
+
+    for seq in qs.order_by('index').iterator(models.CHUNK_SIZE):
+        lists.apply_event(todo_lists, seq.to_domain())
+        index = seq.index
+
+    return todo_lists.get(list_id), index
+
+
+def load_list(list_id: str) -> lists.TodoList | None:
+    """Load a list from its latest snapshot and the events since."""
+    todo_list, _ = _load_list(list_id)
+    return todo_list
+
+
+def take_list_snapshot(list_id: str) -> None:
+    """Store a snapshot of the current state of a list."""
+    todo_list, index = _load_list(list_id)
+    if todo_list is not None:
+        _save_snapshot(
+            models.Snapshot.StreamType.LIST, list_id,
+            index, _converter.dumps(todo_list),
+        )
+
+
+# Todos
+# =====
+
+def _load_todo(todo_id: str) -> tuple[todos.TodoItem | None, int]:
+    items: dict[str, todos.TodoItem] = {}
+    index = 0
+
+    qs = models.TodoEventSequence.objects.filter(
+        todo_id=todo_id,
+    ).select_related('event')
+
+    snapshot = _latest_snapshot(models.Snapshot.StreamType.TODO, todo_id)
+    if snapshot is not None:
+        items[todo_id] = _converter.loads(snapshot.state, todos.TodoItem)
+        index = snapshot.index
+        qs = qs.filter(index__gt=snapshot.index)
+
+    for seq in qs.order_by('index').iterator(models.CHUNK_SIZE):
+        todos.apply_event(items, seq.to_domain())
+        index = seq.index
+
+    return items.get(todo_id), index
+
+
+def load_todo(todo_id: str) -> todos.TodoItem | None:
+    """Load a todo item from its latest snapshot and the events since."""
+    item, _ = _load_todo(todo_id)
+    return item
+
+
+def take_todo_snapshot(todo_id: str) -> None:
+    """Store a snapshot of the current state of a todo item."""
+    item, index = _load_todo(todo_id)
+    if item is not None:
+        _save_snapshot(
+            models.Snapshot.StreamType.TODO, todo_id,
+            index, _converter.dumps(item),
+        )
@@ -1,66 +1,411 @@
 from __future__ import annotations
 
+import functools
+import operator
+from collections.abc import Iterable
 from collections.abc import Iterator
+from collections.abc import Mapping
+from collections.abc import Sequence
 from contextlib import contextmanager
+from typing import TypeVar
 from typing import assert_never
 
+import attrs
 from django.db import IntegrityError
 from django.db import transaction
+from django.db.models import F
+from django.db.models import Q
 
+from . import event_log
 from . import models
+from . import projections
+from . import snapshots
+from .identity_map import IdentityMap
 from vote_on_todos.todos.application import unit_of_work
 from vote_on_todos.todos.domain import lists
 from vote_on_todos.todos.domain import todos
 
 
+_Stream = TypeVar('_Stream', models.ListStream, models.TodoStream)
+
+# keep each query's OR of (todo_id, user_id) pairs well within SQLite's limits
+_VOTES_PER_QUERY = 100
+
+
+@attrs.frozen
 class DjangoCommitter:
+    identity_map: IdentityMap | None = None
+    # when False, read models are left to the projector
+    project_inline: bool = True
+
+    _buffers: list[list[lists.Event | todos.Event]] = attrs.field(
+        init=False, factory=list, eq=False, repr=False,
+    )
+
     @contextmanager
     def atomic(self) -> Iterator[None]:
+        """Buffer the events handled in this block and write them as a batch."""
         with transaction.atomic():
-            yield
+            self._buffers.append([])
+            try:
+                yield
+            finally:
+                events = self._buffers.pop()
+            self.write(events)
 
     def handle(self, event: lists.Event | todos.Event) -> None:
-        if isinstance(event, lists.Event):
-            _new_list_event(event)
-        elif isinstance(event, todos.Event):
-            _new_todo_event(event)
+        if self._buffers:
+            self._buffers[-1].append(event)
         else:
-            assert_never(event)
+            self.write([event])
+
+    def write(self, events: Sequence[lists.Event | todos.Event]) -> None:
+        """Write some events now, in one transaction.
+
+        Rows are inserted with one statement per table, however many events
+        there are, rather than two statements per event.
+
+        Raises:
+            StaleState: The state has changed and writing is no longer safe.
+        """
+        if not events:
+            return
+
+        list_events: list[tuple[lists.Event, int]] = []
+        todo_events: list[tuple[todos.Event, int]] = []
+        stored: dict[int, lists.Event | todos.Event] = {}
+        with transaction.atomic():
+            positions = event_log.claim_positions(len(events))
+            for event, position in zip(events, positions, strict=True):
+                if isinstance(event, lists.Event):
+                    list_events.append((event, position))
+                elif isinstance(event, todos.Event):
+                    if self.identity_map is not None:
+                        self.identity_map.discard_todo(event.todo_id)
+                    todo_events.append((event, position))
+                else:
+                    assert_never(event)
+
+            if list_events:
+                _new_list_events(list_events)
+                stored.update(
+                    (position, event) for event, position in list_events
+                )
+            if todo_events:
+                stored.update(
+                    (position, event)
+                    for event, position in _new_todo_events(todo_events)
+                )
+
+            if self.project_inline:
+                for projection in projections.PROJECTIONS:
+                    projection.apply([stored[p] for p in sorted(stored)])
+                projections.advance_checkpoints(
+                    projections.PROJECTIONS, positions,
+                )
+
+
+def _advance_stream(
+        streams: type[_Stream],
+        stream_id: str,
+        first: int,
+        last: int,
+        **fields: int,
+) -> bool:
+    advanced = streams.objects.filter(
+        pk=stream_id, version__lt=first,
+    ).update(version=last, **fields)
+    if advanced:
+        return True
+
+    # either this is a new stream or it has already reached this index
+    try:
+        with transaction.atomic():
+            streams.objects.create(pk=stream_id, version=last, **fields)
+    except IntegrityError:
+        return False
+
+    return True
+
+
+def _advance_streams(
+        streams: type[_Stream],
+        indices: Sequence[tuple[str, int]],
+        fields: Mapping[str, dict[str, int]] | None = None,
+) -> set[str]:
+    """Move the heads of some streams forward to their new indices.
+
+    Each head is moved with a compare-and-set, which only succeeds if the
+    stream's head is currently before the first of its new indices. `fields`
+    holds any other columns to set on each stream's head.
+
+    Returns:
+        The streams which had already reached one of their new indices.
+
+    Raises:
+        StaleState: A stream's new indices are not in order.
+    """
+    fields = fields or {}
+    first: dict[str, int] = {}
+    last: dict[str, int] = {}
+    for stream_id, index in indices:
+        if stream_id in last and index <= last[stream_id]:
+            raise unit_of_work.StaleState
+        first.setdefault(stream_id, index)
+        last[stream_id] = index
+
+    stale = set()
+    starting = [stream_id for stream_id in last if first[stream_id] <= 1]
+    for stream_id in last:
+        if first[stream_id] > 1 and not _advance_stream(
+            streams, stream_id, first[stream_id], last[stream_id],
+            **fields.get(stream_id, {}),
+        ):
+            stale.add(stream_id)
+
+    if not starting:
+        return stale
+
+    # streams starting in this batch should not have heads yet, so try to
+    # insert them all at once before falling back to one at a time
+    try:
+        with transaction.atomic():
+            streams.objects.bulk_create([
+                streams(
+                    pk=stream_id, version=last[stream_id],
+                    **fields.get(stream_id, {}),
+                )
+                for stream_id in starting
+            ])
+    except IntegrityError:
+        for stream_id in starting:
+            if not _advance_stream(
+                streams, stream_id, first[stream_id], last[stream_id],
+                **fields.get(stream_id, {}),
+            ):
+                stale.add(stream_id)
+
+    return stale
+
+
+def _new_list_events(events: Sequence[tuple[lists.Event, int]]) -> None:
+    if _advance_streams(
+        models.ListStream,
+        [(event.list_id, event.index) for event, _ in events],
+    ):
+        raise unit_of_work.StaleState
+
+    new_events = []
+    for event, position in events:
+        codec = models.LIST_CODECS.for_event(event)
+        new_events.append(
+            models.ListEvent(
+                event_type=codec.event_type,
+                event_type_version=codec.event_type_version,
+                timestamp=event.timestamp,
+                list_id=event.list_id,
+                payload=codec.encode(event),
+                position=position,
+            ),
+        )
+    models.ListEvent.objects.bulk_create(new_events)
+
+    try:
+        models.ListEventSequence.objects.bulk_create(
+            models.ListEventSequence(
+                event=new_event,
+                list_id=event.list_id,
+                index=event.index,
+            )
+            for new_event, (event, _) in zip(new_events, events, strict=True)
+        )
+    except IntegrityError as e:
+        raise unit_of_work.StaleState from e
+
+    for stream_id in {
+        event.list_id for event, _ in events
+        if event.index % snapshots.SNAPSHOT_INTERVAL == 0
+    }:
+        snapshots.take_list_snapshot(stream_id)
+
+
+# Note [Votes commute]
+# ~~~~~~~~~~~~~~~~~~~~
+# Every todo event is decided against the todo's state at some index, and takes
+# the next index in its stream. If another event took that index first, the
+# decision may no longer be valid, and we raise StaleState.
+#
+# But votes from different users do not affect each other: if two users upvote
+# the same todo at once, it does not matter which vote comes first. So when
+# only votes have been added to a stream since a vote was decided, the vote is
+# moved to the end of the stream instead of being rejected. The stream's
+# barrier is the index of its latest event that is not a vote, and a vote
+# decided before the barrier (for example, before the todo was completed) is
+# still stale. Whether each user has voted is then enforced by the TodoVote
+# table rather than by the order of the stream.
+
+_VOTE_EVENTS = (todos.TodoUpvotedV1, todos.TodoUpvoteRemovedV1)
+
 
+def _advance_todo_streams(
+        events: Sequence[tuple[todos.Event, int]],
+) -> list[tuple[todos.Event, int]]:
+    """Move the todo streams' heads past some new events.
 
-def _new_list_event(event: lists.Event) -> None:
-    event_type, event_type_version = models.LIST_EVENT_TYPES[type(event)]
-    new_event = models.ListEvent.objects.create(
-        event_type=event_type,
-        event_type_version=event_type_version,
-        timestamp=event.timestamp,
-        list_id=event.list_id,
-        payload=models.ListEvent.payload_converter.dumps(event),
+    See Note [Votes commute].
+
+    Returns:
+        The events, with any votes that were moved given their new indices.
+    """
+    barriers = {
+        event.todo_id: {'barrier': event.index}
+        for event, _ in events
+        if not isinstance(event, _VOTE_EVENTS)
+    }
+    stale = _advance_streams(
+        models.TodoStream,
+        [(event.todo_id, event.index) for event, _ in events],
+        barriers,
     )
+    if not stale:
+        return list(events)
+
+    moved: dict[str, Iterator[int]] = {}
+    for todo_id in stale:
+        stream_events = [
+            event for event, _ in events if event.todo_id == todo_id
+        ]
+        if todo_id in barriers:
+            raise unit_of_work.StaleState
+
+        count = len(stream_events)
+        if not models.TodoStream.objects.filter(
+            pk=todo_id, barrier__lt=stream_events[0].index,
+        ).update(version=F('version') + count):
+            raise unit_of_work.StaleState
+
+        head = models.TodoStream.objects.get(pk=todo_id).version
+        moved[todo_id] = iter(range(head - count + 1, head + 1))
+
+    return [
+        (
+            attrs.evolve(event, index=next(moved[event.todo_id]))
+            if event.todo_id in moved else event,
+            position,
+        )
+        for event, position in events
+    ]
+
+
+def _update_votes(events: Sequence[tuple[todos.Event, int]]) -> None:
+    """Record each user's current votes.
+
+    Raises:
+        StaleState: A user upvoted a todo twice, or removed an upvote that
+            they had not made.
+    """
+    votes = [
+        (event.todo_id, _voter(event), isinstance(event, todos.TodoUpvotedV1))
+        for event, _ in events
+        if isinstance(event, _VOTE_EVENTS)
+    ]
+    if not votes:
+        return
+
+    keys = list({(todo_id, user_id): None for todo_id, user_id, _ in votes})
+    existing: set[tuple[str, str]] = set()
+    for chunk in _chunks(keys):
+        existing.update(
+            models.TodoVote.objects.filter(_match_votes(chunk)).values_list(
+                'todo_id', 'user_id',
+            ),
+        )
+
+    voted = {key: key in existing for key in keys}
+    for todo_id, user_id, upvote in votes:
+        if voted[todo_id, user_id] == upvote:
+            raise unit_of_work.StaleState
+        voted[todo_id, user_id] = upvote
+
+    removed = [
+        key for key, vote in voted.items() if key in existing and not vote
+    ]
+    for chunk in _chunks(removed):
+        models.TodoVote.objects.filter(_match_votes(chunk)).delete()
+
     try:
-        models.ListEventSequence.objects.create(
-            event=new_event,
-            list_id=event.list_id,
-            index=event.index,
+        models.TodoVote.objects.bulk_create(
+            models.TodoVote(todo_id=todo_id, user_id=user_id)
+            for (todo_id, user_id), vote in voted.items()
+            if vote and (todo_id, user_id) not in existing
         )
     except IntegrityError as e:
         raise unit_of_work.StaleState from e
 
 
-def _new_todo_event(event: todos.Event) -> None:
-    event_type, event_type_version = models.TODO_EVENT_TYPES[type(event)]
-    new_event = models.TodoEvent.objects.create(
-        event_type=event_type,
-        event_type_version=event_type_version,
-        timestamp=event.timestamp,
-        todo_id=event.todo_id,
-        payload=models.TodoEvent.payload_converter.dumps(event),
+def _chunks(
+        keys: Sequence[tuple[str, str]],
+) -> Iterator[Sequence[tuple[str, str]]]:
+    for i in range(0, len(keys), _VOTES_PER_QUERY):
+        yield keys[i:i + _VOTES_PER_QUERY]
+
+
+def _match_votes(keys: Iterable[tuple[str, str]]) -> Q:
+    return functools.reduce(
+        operator.or_,
+        (Q(todo_id=todo_id, user_id=user_id) for todo_id, user_id in keys),
     )
+
+
+def _voter(event: todos.TodoUpvotedV1 | todos.TodoUpvoteRemovedV1) -> str:
+    if isinstance(event, todos.TodoUpvotedV1):
+        return event.upvoted_by
+    else:
+        return event.removed_by
+
+
+def _new_todo_events(
+        events: Sequence[tuple[todos.Event, int]],
+) -> list[tuple[todos.Event, int]]:
+    """Store some new todo events.
+
+    Returns:
+        The events as they were stored. See Note [Votes commute].
+    """
+    events = _advance_todo_streams(events)
+    _update_votes(events)
+
+    new_events = []
+    for event, position in events:
+        codec = models.TODO_CODECS.for_event(event)
+        new_events.append(
+            models.TodoEvent(
+                event_type=codec.event_type,
+                event_type_version=codec.event_type_version,
+                timestamp=event.timestamp,
+                todo_id=event.todo_id,
+                payload=codec.encode(event),
+                position=position,
+            ),
+        )
+    models.TodoEvent.objects.bulk_create(new_events)
+
     try:
-        models.TodoEventSequence.objects.create(
-            event=new_event,
-            todo_id=event.todo_id,
-            index=event.index,
+        models.TodoEventSequence.objects.bulk_create(
+            models.TodoEventSequence(
+                event=new_event,
+                todo_id=event.todo_id,
+                index=event.index,
+            )
+            for new_event, (event, _) in zip(new_events, events, strict=True)
         )
     except IntegrityError as e:
         raise unit_of_work.StaleState from e
+
+    for stream_id in {
+        event.todo_id for event, _ in events
+        if event.index % snapshots.SNAPSHOT_INTERVAL == 0
+    }:
+        snapshots.take_todo_snapshot(stream_id)
+
+    return events
@@ -0,0 +1,86 @@
+"""Reading todo items to import from CSV and JSON Lines files."""
+from __future__ import annotations
+
+import csv
+import json
+from collections.abc import Iterable
+from typing import Any
+
+import attrs
+
+from vote_on_todos.todos.domain import todos
+
+FORMATS = ('csv', 'jsonl')
+
+
+@attrs.frozen
+class InvalidImport(Exception):
+    line: int
+    reason: str
+
+    def __str__(self) -> str:
+        return f'line {self.line}: {self.reason}'
+
+
+def read_todos(lines: Iterable[str], format: str) -> list[todos.TodoDraft]:
+    """Read the todo items in a file.
+
+    CSV files need a header row with a `title` column, and may also have a
+    `description` column. JSON Lines files have an object with a `title` and
+    optionally a `description` on each line.
+
+    Raises:
+        InvalidImport: The file is not in the format or has a todo without a
+            title.
+        ValueError: The format is not one of `FORMATS`.
+    """
+    if format == 'csv':
+        return _read_csv(lines)
+    elif format == 'jsonl':
+        return _read_jsonl(lines)
+    else:
+        raise ValueError(f'unknown format: {format}')
+
+
+def _read_csv(lines: Iterable[str]) -> list[todos.TodoDraft]:
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None or 'title' not in reader.fieldnames:
+        raise InvalidImport(1, 'the header has no title column')
+
+    try:
+        return [
+            _draft(reader.line_num, row.get('title'), row.get('description'))
+            for row in reader
+        ]
+    except csv.Error as e:
+        # the DictReader only counts the lines of the rows it has returned
+        raise InvalidImport(reader.reader.line_num, str(e)) from e
+
+
+def _read_jsonl(lines: Iterable[str]) -> list[todos.TodoDraft]:
+    drafts = []
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            todo = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise InvalidImport(line_num, e.msg) from e
+        if not isinstance(todo, dict):
+            raise InvalidImport(line_num, 'not a JSON object')
+
+        drafts.append(
+            _draft(line_num, todo.get('title'), todo.get('description')),
+        )
+
+    return drafts
+
+
+def _draft(line_num: int, title: Any, description: Any) -> todos.TodoDraft:
+    if not isinstance(title, str) or not title.strip():
+        raise InvalidImport(line_num, 'the todo has no title')
+    if description is not None and not isinstance(description, str):
+        raise InvalidImport(line_num, 'the description is not a string')
+
+    return todos.TodoDraft(title=title.strip(), description=description or '')
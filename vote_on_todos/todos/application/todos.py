@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import datetime
+import enum
+from collections.abc import Iterable
 
 import attrs
 
@@ -16,6 +18,7 @@ class ListDoesNotExist(Exception):
 class NewTodo:
     committer: unit_of_work.Committer
     lists: todos.ListQueries
+    retry: unit_of_work.RetryPolicy = unit_of_work.NO_RETRY
 
     def create_new_todo(
         self,
@@ -30,22 +33,70 @@ class NewTodo:
 
         Raises:
             ListDoesNotExist: The list does not exist.
+            StaleState: Committing conflicted on every attempt.
         """
-        with unit_of_work.commit_on_success(self.committer) as new_events:
-            domain = todos.NewTodo(lists=self.lists)
-
-            try:
-                new_event = domain.create_new_todo(
-                    title,
-                    description=description,
-                    list_id=list_id,
-                    created_by=created_by,
-                    created_at=created_at,
-                )
-            except todos.ListDoesNotExist as e:
-                raise ListDoesNotExist from e
-            else:
-                new_events.append(new_event)
+        def attempt() -> None:
+            with unit_of_work.commit_on_success(self.committer) as new_events:
+                domain = todos.NewTodo(lists=self.lists)
+
+                try:
+                    new_event = domain.create_new_todo(
+                        title,
+                        description=description,
+                        list_id=list_id,
+                        created_by=created_by,
+                        created_at=created_at,
+                    )
+                except todos.ListDoesNotExist as e:
+                    raise ListDoesNotExist from e
+                else:
+                    new_events.append(new_event)
+
+        self.retry.run(attempt)
+
+
+@attrs.frozen
+class ImportTodos:
+    committer: unit_of_work.Committer
+    lists: todos.ListQueries
+    batch_size: int = 500
+    """The number of todos to commit in each unit of work."""
+
+    def import_todos(
+        self,
+        drafts: Iterable[todos.TodoDraft],
+        *,
+        list_id: str,
+        created_by: str,
+        created_at: datetime.datetime,
+    ) -> int:
+        """Create many todo items in a list.
+
+        The todos are committed in batches, so if committing a batch fails the
+        batches before it stay committed.
+
+        Returns:
+            The number of todo items created.
+
+        Raises:
+            ListDoesNotExist: The list does not exist.
+        """
+        domain = todos.NewTodo(lists=self.lists)
+        try:
+            events = domain.create_new_todos(
+                drafts,
+                list_id=list_id,
+                created_by=created_by,
+                created_at=created_at,
+            )
+        except todos.ListDoesNotExist as e:
+            raise ListDoesNotExist from e
+
+        for start in range(0, len(events), self.batch_size):
+            with unit_of_work.commit_on_success(self.committer) as new_events:
+                new_events.extend(events[start:start + self.batch_size])
+
+        return len(events)
 
 
 class TodoDoesNotExist(Exception):
@@ -64,6 +115,8 @@ class NotUpvoted(Exception):
 class Upvote:
     committer: unit_of_work.Committer
     _todos: todos.TodoQueries
+    _votes: todos.VoteQueries
+    retry: unit_of_work.RetryPolicy = unit_of_work.NO_RETRY
 
     def upvote(
         self, *,
@@ -75,22 +128,26 @@ class Upvote:
         Raises:
             TodoDoesNotExist: The todo item does not exist.
             AlreadyUpvoted: This todo item has already been upvoted by this user.
+            StaleState: Committing conflicted on every attempt.
         """
-        with unit_of_work.commit_on_success(self.committer) as new_events:
-            domain = todos.Voting(todos=self._todos)
-
-            try:
-                new_event = domain.upvote(
-                    todo_id,
-                    user_id=user_id,
-                    upvote_at=upvote_at,
-                )
-            except todos.TodoDoesNotExist as e:
-                raise TodoDoesNotExist from e
-            except todos.AlreadyUpvoted as e:
-                raise AlreadyUpvoted from e
-            else:
-                new_events.append(new_event)
+        def attempt() -> None:
+            with unit_of_work.commit_on_success(self.committer) as new_events:
+                domain = todos.Voting(todos=self._todos, votes=self._votes)
+
+                try:
+                    new_event = domain.upvote(
+                        todo_id,
+                        user_id=user_id,
+                        upvote_at=upvote_at,
+                    )
+                except todos.TodoDoesNotExist as e:
+                    raise TodoDoesNotExist from e
+                except todos.AlreadyUpvoted as e:
+                    raise AlreadyUpvoted from e
+                else:
+                    new_events.append(new_event)
+
+        self.retry.run(attempt)
 
     def remove_upvote(
         self, *,
@@ -102,22 +159,26 @@ class Upvote:
         Raises:
             TodoDoesNotExist: The todo item does not exist.
             NotUpvoted: This todo item has not been upvoted by this user.
+            StaleState: Committing conflicted on every attempt.
         """
-        with unit_of_work.commit_on_success(self.committer) as new_events:
-            domain = todos.Voting(todos=self._todos)
-
-            try:
-                new_event = domain.remove_upvote(
-                    todo_id,
-                    user_id=user_id,
-                    remove_at=remove_at,
-                )
-            except todos.TodoDoesNotExist as e:
-                raise TodoDoesNotExist from e
-            except todos.NotUpvoted as e:
-                raise NotUpvoted from e
-            else:
-                new_events.append(new_event)
+        def attempt() -> None:
+            with unit_of_work.commit_on_success(self.committer) as new_events:
+                domain = todos.Voting(todos=self._todos, votes=self._votes)
+
+                try:
+                    new_event = domain.remove_upvote(
+                        todo_id,
+                        user_id=user_id,
+                        remove_at=remove_at,
+                    )
+                except todos.TodoDoesNotExist as e:
+                    raise TodoDoesNotExist from e
+                except todos.NotUpvoted as e:
+                    raise NotUpvoted from e
+                else:
+                    new_events.append(new_event)
+
+        self.retry.run(attempt)
 
 
 class AlreadyDone(Exception):
@@ -128,6 +189,7 @@ class AlreadyDone(Exception):
 class Complete:
     committer: unit_of_work.Committer
     _todos: todos.TodoQueries
+    retry: unit_of_work.RetryPolicy = unit_of_work.NO_RETRY
 
     def mark_done(
         self, *,
@@ -139,19 +201,149 @@ class Complete:
         Raises:
             TodoDoesNotExist: The todo item does not exist.
             AlreadyDone: This todo item has already been marked complete.
+            StaleState: Committing conflicted on every attempt.
         """
-        with unit_of_work.commit_on_success(self.committer) as new_events:
-            domain = todos.Completion(todos=self._todos)
-
-            try:
-                new_event = domain.mark_done(
-                    todo_id=todo_id,
-                    user_id=user_id,
-                    record_at=record_at,
-                )
-            except todos.TodoDoesNotExist as e:
-                raise TodoDoesNotExist from e
-            except todos.AlreadyDone as e:
-                raise AlreadyDone from e
-            else:
-                new_events.append(new_event)
+        def attempt() -> None:
+            with unit_of_work.commit_on_success(self.committer) as new_events:
+                domain = todos.Completion(todos=self._todos)
+
+                try:
+                    new_event = domain.mark_done(
+                        todo_id=todo_id,
+                        user_id=user_id,
+                        record_at=record_at,
+                    )
+                except todos.TodoDoesNotExist as e:
+                    raise TodoDoesNotExist from e
+                except todos.AlreadyDone as e:
+                    raise AlreadyDone from e
+                else:
+                    new_events.append(new_event)
+
+        self.retry.run(attempt)
+
+
+class Action(enum.Enum):
+    UPVOTE = 'upvote'
+    REMOVE_UPVOTE = 'remove_upvote'
+    COMPLETE = 'complete'
+
+
+@attrs.frozen
+class Operation:
+    action: Action
+    todo_id: str
+
+
+class Outcome(enum.Enum):
+    OK = 'ok'
+    TODO_DOES_NOT_EXIST = 'todo_does_not_exist'
+    ALREADY_UPVOTED = 'already_upvoted'
+    NOT_UPVOTED = 'not_upvoted'
+    ALREADY_DONE = 'already_done'
+
+
+@attrs.define
+class _BatchTodos:
+    """The todo items touched by a batch, each loaded at most once.
+
+    The batch's new events are applied to these copies, so each operation sees
+    the effect of the ones before it.
+    """
+    queries: todos.TodoQueries
+    votes: todos.VoteQueries
+    _items: dict[str, todos.TodoItem] = attrs.field(factory=dict)
+    _loaded: set[str] = attrs.field(factory=set)
+    # the votes the batch has added or removed so far
+    _voted: dict[tuple[str, str], bool] = attrs.field(factory=dict)
+
+    def get_todo(self, todo_id: str) -> todos.TodoItem | None:
+        if todo_id not in self._loaded:
+            self._loaded.add(todo_id)
+            todo = self.queries.get_todo(todo_id)
+            if todo is not None:
+                # a copy, as other readers may share the loaded item
+                self._items[todo_id] = attrs.evolve(todo)
+        return self._items.get(todo_id)
+
+    def has_voted(self, todo_id: str, user_id: str) -> bool:
+        try:
+            return self._voted[todo_id, user_id]
+        except KeyError:
+            return self.votes.has_voted(todo_id, user_id)
+
+    def apply(self, event: todos.Event) -> None:
+        todos.apply_event(self._items, event)
+        if isinstance(event, todos.TodoUpvotedV1):
+            self._voted[event.todo_id, event.upvoted_by] = True
+        elif isinstance(event, todos.TodoUpvoteRemovedV1):
+            self._voted[event.todo_id, event.removed_by] = False
+
+
+@attrs.frozen
+class Batch:
+    committer: unit_of_work.Committer
+    _todos: todos.TodoQueries
+    _votes: todos.VoteQueries
+    retry: unit_of_work.RetryPolicy = unit_of_work.NO_RETRY
+
+    def apply(
+        self,
+        operations: Iterable[Operation],
+        *,
+        user_id: str,
+        at: datetime.datetime,
+    ) -> list[Outcome]:
+        """Upvote, remove upvotes from and complete todo items together.
+
+        Each todo item is loaded once, and all the operations that succeed are
+        committed in a single unit of work. An operation that cannot be applied
+        does not stop the others: its outcome says why.
+
+        Returns:
+            The outcome of each operation, in order.
+
+        Raises:
+            StaleState: Committing conflicted on every attempt.
+        """
+        # every attempt goes through all of the operations
+        operations = list(operations)
+
+        def attempt() -> list[Outcome]:
+            batch_todos = _BatchTodos(self._todos, self._votes)
+            voting = todos.Voting(todos=batch_todos, votes=batch_todos)
+            completion = todos.Completion(todos=batch_todos)
+
+            outcomes = []
+            with unit_of_work.commit_on_success(self.committer) as new_events:
+                for operation in operations:
+                    try:
+                        new_event: todos.Event
+                        if operation.action is Action.UPVOTE:
+                            new_event = voting.upvote(
+                                operation.todo_id, user_id=user_id, upvote_at=at,
+                            )
+                        elif operation.action is Action.REMOVE_UPVOTE:
+                            new_event = voting.remove_upvote(
+                                operation.todo_id, user_id=user_id, remove_at=at,
+                            )
+                        else:
+                            new_event = completion.mark_done(
+                                operation.todo_id, user_id=user_id, record_at=at,
+                            )
+                    except todos.TodoDoesNotExist:
+                        outcomes.append(Outcome.TODO_DOES_NOT_EXIST)
+                    except todos.AlreadyUpvoted:
+                        outcomes.append(Outcome.ALREADY_UPVOTED)
+                    except todos.NotUpvoted:
+                        outcomes.append(Outcome.NOT_UPVOTED)
+                    except todos.AlreadyDone:
+                        outcomes.append(Outcome.ALREADY_DONE)
+                    else:
+                        batch_todos.apply(new_event)
+                        new_events.append(new_event)
+                        outcomes.append(Outcome.OK)
+
+            return outcomes
+
+        return self.retry.run(attempt)
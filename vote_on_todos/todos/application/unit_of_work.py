@@ -1,8 +1,16 @@
 from __future__ import annotations
 
+import random
+import threading
+import time
+from collections.abc import Callable
 from collections.abc import Iterator
 from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Protocol
+from typing import TypeVar
+
+import attrs
 
 from vote_on_todos.todos.domain import lists
 from vote_on_todos.todos.domain import todos
@@ -40,3 +48,104 @@ class Committer(Protocol):
             StaleState: The state has changed and handling is no longer safe.
         """
         ...
+
+
+_T = TypeVar('_T')
+
+
+@attrs.define
+class RetryStats:
+    """Counts of the conflicts seen by a retry policy."""
+    # units of work that raised StaleState
+    conflicts: int = 0
+    # units of work that were run again after a conflict
+    retries: int = 0
+    # units of work that were given up on after the last attempt
+    exhausted: int = 0
+
+    _lock: threading.Lock = attrs.field(
+        factory=threading.Lock, repr=False, eq=False,
+    )
+
+    def record(
+            self, *, conflicts: int = 0, retries: int = 0, exhausted: int = 0,
+    ) -> None:
+        with self._lock:
+            self.conflicts += conflicts
+            self.retries += retries
+            self.exhausted += exhausted
+
+
+_scoped_stats: ContextVar[RetryStats | None] = ContextVar(
+    'retry_stats', default=None,
+)
+
+
+@contextmanager
+def retry_scope() -> Iterator[RetryStats]:
+    """Also count the conflicts seen in this context on their own.
+
+    Retry policies are shared between threads, so their own stats mix the
+    conflicts of every caller together.
+    """
+    stats = RetryStats()
+    token = _scoped_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _scoped_stats.reset(token)
+
+
+@attrs.frozen
+class RetryPolicy:
+    """Re-run a unit of work when committing it raises `StaleState`.
+
+    Each attempt re-reads the state and makes its decision again, so a retry
+    either succeeds against the new state or fails with a domain error (for
+    example, the todo was completed in the meantime). Between attempts the
+    policy sleeps for a random time of up to `base_delay * 2 ** (attempt - 1)`
+    seconds, capped at `max_delay`, so that writers colliding on the same
+    stream spread out instead of colliding again.
+    """
+    max_attempts: int = 1
+    base_delay: float = 0.005
+    max_delay: float = 0.1
+
+    stats: RetryStats = attrs.field(factory=RetryStats, eq=False)
+
+    _sleep: Callable[[float], None] = time.sleep
+    _random: Callable[[], float] = random.random
+
+    def delay(self, attempt: int) -> float:
+        """Get the time to wait after a failed attempt, in seconds."""
+        return self._random() * min(
+            self.max_delay, self.base_delay * 2.0 ** (attempt - 1),
+        )
+
+    def run(self, unit_of_work: Callable[[], _T]) -> _T:
+        """Run a unit of work, retrying it on conflicts.
+
+        Raises:
+            StaleState: The last attempt still conflicted.
+        """
+        attempt = 1
+        while True:
+            try:
+                return unit_of_work()
+            except StaleState:
+                if attempt >= self.max_attempts:
+                    self._record(conflicts=1, exhausted=1)
+                    raise
+                self._record(conflicts=1, retries=1)
+
+            self._sleep(self.delay(attempt))
+            attempt += 1
+
+    def _record(self, **counts: int) -> None:
+        self.stats.record(**counts)
+        scoped = _scoped_stats.get()
+        if scoped is not None:
+            scoped.record(**counts)
+
+
+NO_RETRY = RetryPolicy()
@@ -3,7 +3,6 @@ from __future__ import annotations
 import abc
 import datetime
 import uuid
-from collections.abc import Sequence
 from typing import TypeAlias
 
 import attrs
@@ -60,17 +59,14 @@ class TodoList:
     creator: UserId
 
 
-def get_lists(events: Sequence[Event]) -> dict[ListId, TodoList]:
-    lists = {}
-    for event in events:
-        if isinstance(event, ListCreatedV1):
-            lists[event.list_id] = TodoList(
-                id=event.list_id,
-                name=event.name,
-                description=event.description,
-                creator=event.created_by,
-            )
-        else:  # pragma: no cover
-            raise TypeError(f'unexpected event type: {type(event)!r}')
-
-    return lists
+def apply_event(lists: dict[ListId, TodoList], event: Event) -> None:
+    """Apply a single event to some projected lists, in place."""
+    if isinstance(event, ListCreatedV1):
+        lists[event.list_id] = TodoList(
+            id=event.list_id,
+            name=event.name,
+            description=event.description,
+            creator=event.created_by,
+        )
+    else:  # pragma: no cover
+        raise TypeError(f'unexpected event type: {type(event)!r}')
@@ -3,7 +3,7 @@ from __future__ import annotations
 import abc
 import datetime
 import uuid
-from collections.abc import Sequence
+from collections.abc import Iterable
 from typing import Protocol
 from typing import TypeAlias
 
@@ -60,11 +60,22 @@ class TodoQueries(Protocol):
     def get_todo(self, todo_id: TodoId) -> TodoItem | None: ...
 
 
+class VoteQueries(Protocol):
+    def has_voted(self, todo_id: TodoId, user_id: UserId) -> bool: ...
+
+
 @attrs.frozen
 class ListDoesNotExist(Exception):
     list_id: ListId
 
 
+@attrs.frozen
+class TodoDraft:
+    """The details of a todo item that is yet to be created."""
+    title: str
+    description: str = ''
+
+
 @attrs.frozen
 class NewTodo:
     lists: ListQueries
@@ -81,6 +92,50 @@ class NewTodo:
         if not self.lists.is_list(list_id):
             raise ListDoesNotExist(list_id)
 
+        return self._new_todo(
+            title,
+            description=description,
+            list_id=list_id,
+            created_by=created_by,
+            created_at=created_at,
+        )
+
+    def create_new_todos(
+            self,
+            drafts: Iterable[TodoDraft],
+            *,
+            list_id: ListId,
+            created_by: str,
+            created_at: datetime.datetime,
+    ) -> list[TodoCreatedV1]:
+        """Create several todo items in the same list.
+
+        The list is only checked once. Each todo is created a microsecond after
+        the one before it, so that they keep their order when ranked.
+        """
+        if not self.lists.is_list(list_id):
+            raise ListDoesNotExist(list_id)
+
+        return [
+            self._new_todo(
+                draft.title,
+                description=draft.description,
+                list_id=list_id,
+                created_by=created_by,
+                created_at=created_at + datetime.timedelta(microseconds=i),
+            )
+            for i, draft in enumerate(drafts)
+        ]
+
+    def _new_todo(
+            self,
+            title: str,
+            *,
+            description: str,
+            list_id: ListId,
+            created_by: str,
+            created_at: datetime.datetime,
+    ) -> TodoCreatedV1:
         return TodoCreatedV1(
             timestamp=created_at,
             index=1,
@@ -107,6 +162,7 @@ class NotUpvoted(Exception):
 @attrs.frozen
 class Voting:
     todos: TodoQueries
+    votes: VoteQueries
 
     def upvote(
             self,
@@ -119,7 +175,7 @@ class Voting:
 
         if todo is None:
             raise TodoDoesNotExist
-        elif user_id in todo.upvotes:
+        elif self.votes.has_voted(todo_id, user_id):
             raise AlreadyUpvoted
 
         return TodoUpvotedV1(
@@ -140,7 +196,7 @@ class Voting:
 
         if todo is None:
             raise TodoDoesNotExist
-        elif user_id not in todo.upvotes:
+        elif not self.votes.has_voted(todo_id, user_id):
             raise NotUpvoted
 
         return TodoUpvoteRemovedV1(
@@ -197,33 +253,38 @@ class TodoItem:
     done_at: datetime.datetime | None = None
     completor: UserId | None = None
 
-    upvotes: set[UserId] = attrs.field(factory=set)
+    vote_count: int = 0
 
 
-def get_items(events: Sequence[Event]) -> dict[TodoId, TodoItem]:
+def get_items(events: Iterable[Event]) -> dict[TodoId, TodoItem]:
     items: dict[TodoId, TodoItem] = {}
     for event in events:
-        if isinstance(event, TodoCreatedV1):
-            items[event.todo_id] = TodoItem(
-                id=event.todo_id,
-                next_index=event.index + 1,
-                list_id=event.list_id,
-                title=event.title,
-                description=event.description,
-                creator=event.created_by,
-                created_at=event.timestamp,
-            )
-        elif isinstance(event, TodoUpvotedV1):
-            items[event.todo_id].upvotes.add(event.upvoted_by)
-            items[event.todo_id].next_index = event.index + 1
-        elif isinstance(event, TodoUpvoteRemovedV1):
-            items[event.todo_id].upvotes.remove(event.removed_by)
-            items[event.todo_id].next_index = event.index + 1
-        elif isinstance(event, TodoDoneV1):
-            items[event.todo_id].done_at = event.timestamp
-            items[event.todo_id].completor = event.recorded_by
-            items[event.todo_id].next_index = event.index + 1
-        else:  # pragma: no cover
-            raise TypeError(f'unexpected event type: {type(event)!r}')
+        apply_event(items, event)
 
     return items
+
+
+def apply_event(items: dict[TodoId, TodoItem], event: Event) -> None:
+    """Apply a single event to some projected todo items, in place."""
+    if isinstance(event, TodoCreatedV1):
+        items[event.todo_id] = TodoItem(
+            id=event.todo_id,
+            next_index=event.index + 1,
+            list_id=event.list_id,
+            title=event.title,
+            description=event.description,
+            creator=event.created_by,
+            created_at=event.timestamp,
+        )
+    elif isinstance(event, TodoUpvotedV1):
+        items[event.todo_id].vote_count += 1
+        items[event.todo_id].next_index = event.index + 1
+    elif isinstance(event, TodoUpvoteRemovedV1):
+        items[event.todo_id].vote_count -= 1
+        items[event.todo_id].next_index = event.index + 1
+    elif isinstance(event, TodoDoneV1):
+        items[event.todo_id].done_at = event.timestamp
+        items[event.todo_id].completor = event.recorded_by
+        items[event.todo_id].next_index = event.index + 1
+    else:  # pragma: no cover
+        raise TypeError(f'unexpected event type: {type(event)!r}')
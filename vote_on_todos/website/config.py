@@ -1,15 +1,40 @@
 from __future__ import annotations
 
+import functools
+
+from django.conf import settings
+
+from vote_on_todos.django_back_end import group_commit
+from vote_on_todos.django_back_end import identity_map
 from vote_on_todos.django_back_end import queries
 from vote_on_todos.django_back_end import unit_of_work
 from vote_on_todos.todos.application.lists import NewList
+from vote_on_todos.todos.application.todos import Batch
 from vote_on_todos.todos.application.todos import Complete
+from vote_on_todos.todos.application.todos import ImportTodos
 from vote_on_todos.todos.application.todos import NewTodo
 from vote_on_todos.todos.application.todos import Upvote
+from vote_on_todos.todos.application.unit_of_work import RetryPolicy
+
+
+@functools.cache
+def get_commit_group() -> group_commit.CommitGroup:
+    return group_commit.CommitGroup(window=settings.GROUP_COMMIT_WINDOW)
 
 
-def get_committer() -> unit_of_work.DjangoCommitter:
-    return unit_of_work.DjangoCommitter()
+def get_committer() -> (
+        unit_of_work.DjangoCommitter | group_commit.GroupCommitter
+):
+    committer = unit_of_work.DjangoCommitter(
+        identity_map=identity_map.current(),
+        project_inline=settings.PROJECT_READ_MODELS_INLINE,
+    )
+    if not settings.GROUP_COMMIT:
+        return committer
+
+    return group_commit.GroupCommitter(
+        group=get_commit_group(), committer=committer,
+    )
 
 
 def get_list_queries() -> queries.ListRepo:
@@ -17,7 +42,32 @@ def get_list_queries() -> queries.ListRepo:
 
 
 def get_todo_queries() -> queries.TodoRepo:
-    return queries.TodoRepo()
+    return queries.TodoRepo(identity_map=identity_map.current())
+
+
+def get_todo_stream_queries() -> queries.TodoStreamRepo:
+    return queries.TodoStreamRepo(identity_map=identity_map.current())
+
+
+def get_vote_queries() -> queries.VoteRepo:
+    return queries.VoteRepo()
+
+
+def get_activity_queries() -> queries.ActivityRepo:
+    return queries.ActivityRepo()
+
+
+def get_search_queries() -> queries.SearchRepo:
+    return queries.SearchRepo()
+
+
+@functools.cache
+def get_retry_policy() -> RetryPolicy:
+    """Get the retry policy shared by every request in this process.
+
+    Its stats count the conflicts and retries since the process started.
+    """
+    return RetryPolicy(max_attempts=settings.STALE_STATE_MAX_ATTEMPTS)
 
 
 def get_new_list_service() -> NewList:
@@ -28,18 +78,38 @@ def get_new_todo_service() -> NewTodo:
     return NewTodo(
         lists=get_list_queries(),
         committer=get_committer(),
+        retry=get_retry_policy(),
+    )
+
+
+def get_import_todos_service() -> ImportTodos:
+    return ImportTodos(
+        lists=get_list_queries(),
+        committer=get_committer(),
     )
 
 
 def get_upvote_service() -> Upvote:
     return Upvote(
-        todos=get_todo_queries(),
+        todos=get_todo_stream_queries(),
+        votes=get_vote_queries(),
         committer=get_committer(),
+        retry=get_retry_policy(),
     )
 
 
 def get_complete_service() -> Complete:
     return Complete(
-        todos=get_todo_queries(),
+        todos=get_todo_stream_queries(),
+        committer=get_committer(),
+        retry=get_retry_policy(),
+    )
+
+
+def get_batch_service() -> Batch:
+    return Batch(
+        todos=get_todo_stream_queries(),
+        votes=get_vote_queries(),
         committer=get_committer(),
+        retry=get_retry_policy(),
     )
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+
+from django import http
+
+from vote_on_todos.django_back_end import identity_map
+from vote_on_todos.todos.application import unit_of_work
+
+logger = logging.getLogger(__name__)
+
+
+def identity_map_middleware(
+        get_response: Callable[[http.HttpRequest], http.HttpResponse],
+) -> Callable[[http.HttpRequest], http.HttpResponse]:
+    """Share one identity map between the repositories used in a request."""
+
+    def middleware(request: http.HttpRequest) -> http.HttpResponse:
+        with identity_map.scope() as loaded:
+            response = get_response(request)
+
+        logger.debug(
+            'identity map for %s saved %d of %d loads',
+            request.path, loaded.hits, loaded.hits + loaded.misses,
+        )
+
+        return response
+
+    return middleware
+
+
+def retry_stats_middleware(
+        get_response: Callable[[http.HttpRequest], http.HttpResponse],
+) -> Callable[[http.HttpRequest], http.HttpResponse]:
+    """Log the conflicts that each request ran into, if there were any."""
+
+    def middleware(request: http.HttpRequest) -> http.HttpResponse:
+        with unit_of_work.retry_scope() as stats:
+            response = get_response(request)
+
+        if stats.conflicts:
+            logger.debug(
+                'conflicts in %s: %d in total, %d retried, %d given up',
+                request.path, stats.conflicts, stats.retries, stats.exhausted,
+            )
+
+        return response
+
+    return middleware
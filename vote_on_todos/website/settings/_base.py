@@ -28,6 +28,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'vote_on_todos.website.middleware.identity_map_middleware',
+    'vote_on_todos.website.middleware.retry_stats_middleware',
 ]
 
 ROOT_URLCONF = 'vote_on_todos.website.urls'
@@ -101,6 +103,34 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Pagination
+
+PAGE_SIZE = 50
+
+
+# Projections
+
+# Update the read models in the same transaction as each event. Turn this off
+# to leave them to `manage.py run_projector`, in which case reads may briefly
+# lag behind writes.
+PROJECT_READ_MODELS_INLINE = True
+
+
+# Conflicts
+
+# How many times to try a vote, completion or new todo when it conflicts with
+# a concurrent change to the same todo.
+STALE_STATE_MAX_ATTEMPTS = 5
+
+# Commit concurrent requests in the same transaction, waiting up to
+# GROUP_COMMIT_WINDOW seconds for them to join.
+GROUP_COMMIT = False
+GROUP_COMMIT_WINDOW = 0.002
+
+# The most operations that one request to the batch API can apply.
+BATCH_MAX_OPERATIONS = 100
+
+
 # Static files
 
 STATIC_URL = 'static/'
@@ -11,10 +11,17 @@ urlpatterns = [
     path('accounts/signup/', views.Signup.as_view(), name='signup'),
     path('accounts/login/', auth_views.LoginView.as_view(), name='login'),
     path('accounts/logout/', auth_views.LogoutView.as_view(), name='logout'),
+    path('api/todos/batch/', views.TodoBatch.as_view(), name='todo-batch'),
+    path('activity/', views.MyActivity.as_view(), name='activity'),
     path('lists/', views.Lists.as_view(), name='lists'),
     path('lists/<list_id>/', views.List.as_view(), name='list'),
+    path('search/', views.Search.as_view(), name='search'),
     path('new-list/', views.NewList.as_view(), name='new-list'),
     path('new-todo/<list_id>/', views.NewTodo.as_view(), name='new-todo'),
+    path(
+        'import-todos/<list_id>/', views.ImportTodos.as_view(),
+        name='import-todos',
+    ),
     path('todo/<todo_id>/upvote/', views.UpvoteTodo.as_view(), name='upvote'),
     path(
         'todo/<todo_id>/remove-upvote/', views.RemoveUpvoteFromTodo.as_view(),
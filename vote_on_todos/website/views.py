@@ -1,12 +1,18 @@
 from __future__ import annotations
 
 import datetime
+import json
+import time
 from typing import Any
+from typing import Protocol
+from typing import TypeVar
 
 import django.contrib.auth.forms
 import django.urls
 from django import forms
 from django import http
+from django import shortcuts
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import models as auth_models
 from django.contrib.auth import password_validation
@@ -17,7 +23,10 @@ from django.views import generic
 from django.views.decorators.debug import sensitive_post_parameters
 
 from . import config
+from vote_on_todos.todos.application import imports
 from vote_on_todos.todos.application import todos as todo_services
+from vote_on_todos.todos.application import unit_of_work
+from vote_on_todos.todos.domain import lists
 
 
 # Note [User identification is naive]
@@ -26,16 +35,100 @@ from vote_on_todos.todos.application import todos as todo_services
 # might change their name) but is a compromise for simplicity for now.
 
 
+class _HasId(Protocol):
+    @property
+    def id(self) -> str: ...
+
+
+_T = TypeVar('_T', bound=_HasId)
+
+# shown when a change still conflicts after retrying
+_BUSY_MESSAGE = 'Lots of people are changing that todo right now, please try again 🙏'
+
+
+def _get_list_or_404(list_id: str) -> lists.TodoList:
+    try:
+        return config.get_list_queries().get_list(list_id)
+    except KeyError:
+        raise http.Http404('No such todo list') from None
+
+
+def _paginate(
+        request: http.HttpRequest, items: list[_T], cursor_param: str,
+) -> tuple[list[_T], str | None]:
+    """Get a page of items, and the URL of the next page (if there is one).
+
+    `items` should have been fetched with a limit of one more than the page
+    size, so we can tell whether there is another page after this one.
+    """
+    if len(items) <= settings.PAGE_SIZE:
+        return items, None
+
+    page = items[:settings.PAGE_SIZE]
+    query = request.GET.copy()
+    query[cursor_param] = page[-1].id
+
+    return page, f'?{query.urlencode()}'
+
+
 class Lists(LoginRequiredMixin, generic.TemplateView):
     template_name = 'lists.html'
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         queries = config.get_list_queries()
 
+        summaries, next_page_url = _paginate(
+            self.request,
+            queries.get_summaries(
+                limit=settings.PAGE_SIZE + 1,
+                after=self.request.GET.get('after'),
+            ),
+            'after',
+        )
+
         context = {
-            'todo_lists': sorted(
-                queries.get_lists(), key=lambda lst: lst.name,
+            'summaries': summaries,
+            'next_page_url': next_page_url,
+        }
+
+        return super().get_context_data(**kwargs) | context
+
+
+class MyActivity(LoginRequiredMixin, generic.TemplateView):
+    template_name = 'activity.html'
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        queries = config.get_activity_queries()
+
+        activity, next_page_url = _paginate(
+            self.request,
+            queries.get_activity(
+                # See Note [User identification is naive]
+                self.request.user.username,  # type: ignore[arg-type]
+                limit=settings.PAGE_SIZE + 1,
+                after=self.request.GET.get('after'),
             ),
+            'after',
+        )
+
+        context = {
+            'activity': activity,
+            'next_page_url': next_page_url,
+        }
+
+        return super().get_context_data(**kwargs) | context
+
+
+class Search(LoginRequiredMixin, generic.TemplateView):
+    template_name = 'search.html'
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        queries = config.get_search_queries()
+
+        text = self.request.GET.get('q', '')
+        context = {
+            'query': text,
+            'results': queries.search(text, limit=settings.PAGE_SIZE),
         }
 
         return super().get_context_data(**kwargs) | context
@@ -77,23 +170,42 @@ class List(LoginRequiredMixin, generic.TemplateView):
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         list_id = kwargs['list_id']
 
-        list_queries = config.get_list_queries()
+        todo_list = _get_list_or_404(list_id)
         todo_queries = config.get_todo_queries()
 
-        all_todos = todo_queries.get_list(list_id)
-        incomplete_todos = [todo for todo in all_todos if todo.done_at is None]
-        completed_todos = [todo for todo in all_todos if todo.done_at is not None]
-
-        context = {
-            'list': list_queries.get_list(list_id),
-            'incomplete_todos': sorted(
-                incomplete_todos,
-                key=lambda todo: (-len(todo.upvotes), todo.created_at),
+        incomplete_todos, next_page_url = _paginate(
+            self.request,
+            todo_queries.get_incomplete(
+                list_id,
+                limit=settings.PAGE_SIZE + 1,
+                after=self.request.GET.get('after'),
             ),
-            'completed_todos': sorted(
-                completed_todos,
-                key=lambda todo: (todo.done_at, todo.created_at),
+            'after',
+        )
+        completed_todos, next_completed_page_url = _paginate(
+            self.request,
+            todo_queries.get_completed(
+                list_id,
+                limit=settings.PAGE_SIZE + 1,
+                after=self.request.GET.get('completed_after'),
             ),
+            'completed_after',
+        )
+
+        # only incomplete todos can be voted on
+        voted_todo_ids = config.get_vote_queries().voted_on(
+            # See Note [User identification is naive]
+            self.request.user.username,  # type: ignore[arg-type]
+            [todo.id for todo in incomplete_todos],
+        )
+
+        context = {
+            'list': todo_list,
+            'incomplete_todos': incomplete_todos,
+            'voted_todo_ids': voted_todo_ids,
+            'next_page_url': next_page_url,
+            'completed_todos': completed_todos,
+            'next_completed_page_url': next_completed_page_url,
         }
 
         return super().get_context_data(**kwargs) | context
@@ -116,10 +228,8 @@ class NewTodo(LoginRequiredMixin, generic.FormView):  # type: ignore[type-arg]
         self.list_id = kwargs['list_id']
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
-        list_queries = config.get_list_queries()
-
         context = {
-            'list': list_queries.get_list(self.list_id),
+            'list': _get_list_or_404(self.list_id),
         }
 
         return super().get_context_data(**kwargs) | context
@@ -129,14 +239,20 @@ class NewTodo(LoginRequiredMixin, generic.FormView):  # type: ignore[type-arg]
         description = form.cleaned_data['description']
 
         application = config.get_new_todo_service()
-        application.create_new_todo(
-            title=title,
-            list_id=self.list_id,
-            description=description,
-            # See Note [User identification is naive]
-            created_by=self.request.user.username,  # type: ignore[arg-type]
-            created_at=datetime.datetime.now(datetime.UTC),
-        )
+        try:
+            application.create_new_todo(
+                title=title,
+                list_id=self.list_id,
+                description=description,
+                # See Note [User identification is naive]
+                created_by=self.request.user.username,  # type: ignore[arg-type]
+                created_at=datetime.datetime.now(datetime.UTC),
+            )
+        except todo_services.ListDoesNotExist:
+            raise http.Http404('No such todo list') from None
+        except unit_of_work.StaleState:  # pragma: no cover
+            messages.error(self.request, _BUSY_MESSAGE)
+            return self.form_invalid(form)
 
         messages.success(self.request, f'New todo created: {title}')
 
@@ -146,6 +262,109 @@ class NewTodo(LoginRequiredMixin, generic.FormView):  # type: ignore[type-arg]
         return django.urls.reverse('list', kwargs={'list_id': self.list_id})
 
 
+class ImportTodosForm(forms.Form):
+    file = forms.FileField()
+    file_format = forms.ChoiceField(
+        choices=[(file_format, file_format) for file_format in imports.FORMATS],
+    )
+
+
+class ImportTodos(LoginRequiredMixin, generic.FormView):  # type: ignore[type-arg]
+    # TypeError: type 'FormView' is not subscriptable
+
+    form_class = ImportTodosForm
+    template_name = 'import-todos.html'
+
+    def setup(self, request: http.HttpRequest, *args: Any, **kwargs: Any) -> None:
+        super().setup(request, *args, **kwargs)
+
+        self.list_id = kwargs['list_id']
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = {
+            'list': _get_list_or_404(self.list_id),
+        }
+
+        return super().get_context_data(**kwargs) | context
+
+    def form_valid(self, form: ImportTodosForm) -> http.HttpResponse:
+        try:
+            drafts = imports.read_todos(
+                form.cleaned_data['file'].read().decode().splitlines(
+                    keepends=True,
+                ),
+                form.cleaned_data['file_format'],
+            )
+        except UnicodeDecodeError:
+            form.add_error('file', 'The file is not UTF-8 text.')
+            return self.form_invalid(form)
+        except imports.InvalidImport as e:
+            form.add_error('file', f'The file is not valid: {e}.')
+            return self.form_invalid(form)
+
+        application = config.get_import_todos_service()
+        start = time.perf_counter()
+        try:
+            count = application.import_todos(
+                drafts,
+                list_id=self.list_id,
+                # See Note [User identification is naive]
+                created_by=self.request.user.username,  # type: ignore[arg-type]
+                created_at=datetime.datetime.now(datetime.UTC),
+            )
+        except todo_services.ListDoesNotExist:
+            raise http.Http404('No such todo list') from None
+        elapsed = time.perf_counter() - start
+
+        messages.success(
+            self.request,
+            f'Imported {count} todos ({count / elapsed:,.0f} todos/s)',
+        )
+
+        return super().form_valid(form)
+
+    def get_success_url(self) -> str:
+        return django.urls.reverse('list', kwargs={'list_id': self.list_id})
+
+
+# Note [Todo row fragments]
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~
+# The upvote, remove upvote and complete forms redirect back to the list, which
+# costs a second request that renders every row again. So the list page
+# submits those forms with JavaScript instead, sending an `X-Fragment: todo-row`
+# header, and swaps in the re-rendered row of the todo that it gets back. If
+# something went wrong the view redirects as usual. The script does not follow
+# the redirect, since that would use up the flash message with the error, but
+# reloads the list, which shows it. Without JavaScript the forms are submitted
+# normally.
+
+def _todo_row_or(
+        request: http.HttpRequest, todo_id: str, redirect: HttpResponse,
+) -> HttpResponse:
+    """Render a todo's row, if that is what was asked for.
+
+    See Note [Todo row fragments].
+    """
+    if request.headers.get('X-Fragment') != 'todo-row':
+        return redirect
+
+    todo = config.get_todo_stream_queries().get_todo(todo_id)
+    if todo is None:  # pragma: no cover
+        return redirect
+
+    # See Note [User identification is naive]
+    voted = config.get_vote_queries().has_voted(
+        todo_id, request.user.username,  # type: ignore[arg-type]
+    )
+    response = shortcuts.render(
+        request,
+        'partials/todo-row.html',
+        {'todo': todo, 'voted_todo_ids': {todo.id} if voted else set()},
+    )
+    response['X-Fragment'] = 'todo-row'
+    return response
+
+
 class UpvoteTodo(LoginRequiredMixin, generic.FormView):  # type: ignore[type-arg]
     # TypeError: type 'FormView' is not subscriptable
 
@@ -180,8 +399,12 @@ class UpvoteTodo(LoginRequiredMixin, generic.FormView):  # type: ignore[type-arg
             pass  # nothing to do
         except todo_services.TodoDoesNotExist:  # pragma: no cover
             messages.error(self.request, "That todo doesn't exist anymore 🤔")
+            return super().form_valid(form)
+        except unit_of_work.StaleState:  # pragma: no cover
+            messages.error(self.request, _BUSY_MESSAGE)
+            return super().form_valid(form)
 
-        return super().form_valid(form)
+        return _todo_row_or(self.request, self.todo_id, super().form_valid(form))
 
 
 class RemoveUpvoteFromTodo(LoginRequiredMixin, generic.FormView):  # type: ignore[type-arg]
@@ -218,8 +441,12 @@ class RemoveUpvoteFromTodo(LoginRequiredMixin, generic.FormView):  # type: ignor
             pass  # nothing to do
         except todo_services.TodoDoesNotExist:  # pragma: no cover
             messages.error(self.request, "That todo doesn't exist anymore 🤔")
+            return super().form_valid(form)
+        except unit_of_work.StaleState:  # pragma: no cover
+            messages.error(self.request, _BUSY_MESSAGE)
+            return super().form_valid(form)
 
-        return super().form_valid(form)
+        return _todo_row_or(self.request, self.todo_id, super().form_valid(form))
 
 
 class CompleteTodo(LoginRequiredMixin, generic.FormView):  # type: ignore[type-arg]
@@ -246,8 +473,12 @@ class CompleteTodo(LoginRequiredMixin, generic.FormView):  # type: ignore[type-a
             pass  # nothing to do
         except todo_services.TodoDoesNotExist:  # pragma: no cover
             messages.error(self.request, "That todo doesn't exist anymore 🤔")
+            return super().form_valid(form)
+        except unit_of_work.StaleState:  # pragma: no cover
+            messages.error(self.request, _BUSY_MESSAGE)
+            return super().form_valid(form)
 
-        return super().form_valid(form)
+        return _todo_row_or(self.request, self.todo_id, super().form_valid(form))
 
     def get_success_url(self) -> str:
         queries = config.get_todo_queries()
@@ -259,6 +490,83 @@ class CompleteTodo(LoginRequiredMixin, generic.FormView):  # type: ignore[type-a
         else:  # pragma: no cover
             return django.urls.reverse('lists')
 
+
+class TodoBatch(LoginRequiredMixin, generic.View):
+    """Apply many votes and completions in one request.
+
+    The request body is a JSON object like::
+
+        {"operations": [{"action": "upvote", "todo_id": "..."}, ...]}
+
+    where the action is `upvote`, `remove_upvote` or `complete`. The response
+    has the outcome of each operation, in order, under `results`.
+    """
+    # answer with 403 rather than redirecting to the login page
+    raise_exception = True
+
+    def post(
+            self, request: http.HttpRequest, *args: Any, **kwargs: Any,
+    ) -> HttpResponse:
+        try:
+            operations = _read_operations(request.body)
+        except ValueError as e:
+            return http.JsonResponse({'error': str(e)}, status=400)
+
+        application = config.get_batch_service()
+        try:
+            outcomes = application.apply(
+                operations,
+                # See Note [User identification is naive]
+                user_id=request.user.username,  # type: ignore[arg-type]
+                at=datetime.datetime.now(datetime.UTC),
+            )
+        except unit_of_work.StaleState:  # pragma: no cover
+            return http.JsonResponse({'error': _BUSY_MESSAGE}, status=503)
+
+        return http.JsonResponse({
+            'results': [
+                {
+                    'action': operation.action.value,
+                    'todo_id': operation.todo_id,
+                    'outcome': outcome.value,
+                }
+                for operation, outcome in zip(operations, outcomes, strict=True)
+            ],
+        })
+
+
+def _read_operations(body: bytes) -> list[todo_services.Operation]:
+    try:
+        data = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise ValueError(f'the body is not valid JSON: {e}') from e
+
+    if not isinstance(data, dict) or not isinstance(data.get('operations'), list):
+        raise ValueError('the body must be an object with a list of operations')
+    if len(data['operations']) > settings.BATCH_MAX_OPERATIONS:
+        raise ValueError(
+            f'at most {settings.BATCH_MAX_OPERATIONS} operations are allowed',
+        )
+
+    operations = []
+    for i, operation in enumerate(data['operations']):
+        try:
+            operations.append(
+                todo_services.Operation(
+                    action=todo_services.Action(operation['action']),
+                    todo_id=str(operation['todo_id']),
+                ),
+            )
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(
+                f'operation {i} must have an action (one of '
+                f'{", ".join(action.value for action in todo_services.Action)}) '
+                f'and a todo_id',
+            ) from None
+
+    return operations
+
+
 # Auth
 # ====
 